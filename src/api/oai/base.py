@@ -7,6 +7,7 @@ from urllib.parse import (
 from datetime import datetime
 
 from dateutil import parser as date_parser
+from django.db.models import Q
 from django.views.generic.list import BaseListView
 from django.views.generic.base import View, TemplateResponseMixin
 from django.utils.timezone import make_aware, utc
@@ -72,8 +73,11 @@ class OAIPaginationMixin(View):
     The resumptionToken is a query parameter that allows a consumer of the OAI
     interface to resume consuming elements of a listed query when the bounds
     of such list are larger than the maximum number of records allowed per
-    response. This is achieved by encoding the page number details in the
-    querystring as the resumptionToken itself.
+    response. This is achieved by encoding the datestamp and primary key of
+    the last record returned in the querystring as the resumptionToken
+    itself. The next page starts after that record (keyset pagination), so
+    deep pages are as cheap as the first one and records published while
+    harvesting don't shift the following pages.
     Furthermore, any filters provided as queryparams need to be encoded
     into the resumptionToken as per the spec, it is not mandatory for the
     consumer to provide filters on subsequent queries for the same list. This
@@ -81,7 +85,8 @@ class OAIPaginationMixin(View):
     the self.request.GET member in order to inject those querystring filters.
     """
 
-    page_kwarg = "token_page"
+    # The field records are ordered by, along with their primary key
+    keyset_field = "date_published"
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -100,20 +105,42 @@ class OAIPaginationMixin(View):
                 self.request.GET[key] = value
         return super().dispatch(*args, **kwargs)
 
+    def paginate_queryset(self, queryset, page_size):
+        """Returns the page of records following the resumptionToken keyset"""
+        queryset = queryset.order_by(self.keyset_field, "pk")
+        if self.keyset:
+            datestamp, pk = self.keyset
+            queryset = queryset.filter(
+                Q(**{"{}__gt".format(self.keyset_field): datestamp})
+                | Q(**{self.keyset_field: datestamp, "pk__gt": pk})
+            )
+        # One extra record tells us whether there is a next page
+        records = list(queryset[: page_size + 1])
+        has_next = len(records) > page_size
+        return None, None, records[:page_size], has_next
+
     def get_context_data(self, **kwargs):
-        self.kwargs["token_page"] = self.page
         context = super().get_context_data(**kwargs)
-        if context["is_paginated"] and context["page_obj"].has_next():
+        if context["is_paginated"]:
             context["resumption_token"] = self.encode_token(context)
-            total_items = context["paginator"].count
-            if total_items == 0:
-                raise exceptions.OAINoRecordsMatch()
-            context["total"] = total_items
+            context["total"] = self.get_total()
         return context
 
+    def get_total(self):
+        """Counts the records of the list, once per harvest"""
+        if "total" in self._decoded_token:
+            try:
+                return int(self._decoded_token["total"])
+            except ValueError:
+                raise exceptions.OAIBadToken()
+        return self.object_list.count()
+
     def get_token_context(self, context):
+        last_record = context["object_list"][-1]
         return {
-            "page": context["page_obj"].next_page_number(),
+            "after_datestamp": getattr(last_record, self.keyset_field).isoformat(),
+            "after_pk": last_record.pk,
+            "total": self.get_total(),
         }
 
     def encode_token(self, context):
@@ -135,10 +162,17 @@ class OAIPaginationMixin(View):
                 raise exceptions.OAIBadToken()
 
     @property
-    def page(self):
-        if self._decoded_token:
-            return int(self._decoded_token.get("page", 1))
-        return None
+    def keyset(self):
+        """The datestamp and primary key of the last record already returned"""
+        if "after_pk" not in self._decoded_token:
+            return None
+        try:
+            return (
+                date_parser.parse(self._decoded_token["after_datestamp"]),
+                int(self._decoded_token["after_pk"]),
+            )
+        except (KeyError, ValueError, OverflowError):
+            raise exceptions.OAIBadToken()
 
 
 class OAIDateFilterMixin(OAIPaginationMixin):
@@ -0,0 +1,164 @@
+"""
+Stored OAI-PMH records of articles.
+
+Rendering the metadata of every article listed is most of the cost of an OAI
+harvest, so records are stored as ArticleOAIRecord rows and only rendered
+again when the last modified date of the article, or of its galleys, authors,
+files and issues, changes. Journal settings used by the records carry no last
+modified date, so records are also rendered again after MAX_RECORD_AGE.
+"""
+
+__copyright__ = "Copyright 2025 Open Library of Humanities"
+__author__ = "Open Library of Humanities"
+__license__ = "AGPL v3"
+__maintainer__ = "Open Library of Humanities"
+
+from datetime import timedelta
+from xml.dom import minidom
+
+from django.db import connections, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from submission import models as submission_models
+from utils.logger import get_logger
+from utils.sitemaps import annotate_article_lastmod
+
+logger = get_logger(__name__)
+
+RecordFormat = submission_models.ArticleOAIRecord.RecordFormat
+
+MAX_RECORD_AGE = timedelta(days=1)
+
+RECORD_TEMPLATES = {
+    RecordFormat.OAI_DC: "apis/OAI_record.xml",
+    RecordFormat.STUB: "apis/OAI_record_jats_stub.xml",
+}
+
+# The stored record served for each OAI metadataPrefix
+METADATA_PREFIX_FORMATS = {
+    "oai_dc": RecordFormat.OAI_DC,
+    "jats": RecordFormat.STUB,
+}
+
+
+class RecordRequest:
+    """Stands in for a request to the journal of the article being rendered
+
+    Records don't depend on the site they are harvested from, which lets
+    {% journal_url %} build the same links for every request.
+    """
+
+    repository = None
+
+    def __init__(self, journal):
+        self.journal = journal
+
+
+def get_galley_jats(article):
+    """Returns the JATS of the render galley of an article, if there is one
+    The XML declaration and doctype are stripped, so the JATS can be embedded
+    in another document.
+    """
+    render_galley = article.get_render_galley
+    try:
+        if render_galley:
+            with open(render_galley.file.get_file_path(article), "r") as galley:
+                contents = galley.read()
+            if "DTD JATS" in contents:
+                return minidom.parseString(contents).documentElement.toxml()
+    except Exception as e:
+        # A broad catch that lets us serve a stub if anything goes wrong
+        logger.warning(
+            "Unable to read the JATS galley of article {}: {}".format(article.pk, e)
+        )
+    return None
+
+
+def render_record(article, record_format):
+    if record_format == RecordFormat.JATS:
+        return get_galley_jats(article) or ""
+    return render_to_string(
+        RECORD_TEMPLATES[record_format],
+        {
+            "article": article,
+            "journal": article.journal,
+            "request": RecordRequest(article.journal),
+        },
+    )
+
+
+def get_records(articles, record_format):
+    """Returns the stored records of articles, rendering the stale ones
+    :param articles: An iterable of Article
+    :param record_format: An ArticleOAIRecord.RecordFormat
+    :return: A dict mapping the pk of each article to its rendered record
+    """
+    articles = list(articles)
+    if not articles:
+        return {}
+    pks = [article.pk for article in articles]
+    last_modified = dict(
+        annotate_article_lastmod(
+            submission_models.Article.objects.filter(pk__in=pks),
+        ).values_list("pk", "sitemap_lastmod")
+    )
+    stored = {
+        record.article_id: record
+        for record in submission_models.ArticleOAIRecord.objects.filter(
+            article_id__in=pks,
+            record_format=record_format,
+        )
+    }
+
+    oldest_fresh = timezone.now() - MAX_RECORD_AGE
+    documents = {}
+    rendered = []
+    for article in articles:
+        record = stored.get(article.pk)
+        if (
+            record is None
+            or record.source_last_modified != last_modified.get(article.pk)
+            or record.date_rendered < oldest_fresh
+        ):
+            record = submission_models.ArticleOAIRecord(
+                article=article,
+                record_format=record_format,
+                document=render_record(article, record_format),
+                source_last_modified=last_modified.get(article.pk),
+            )
+            rendered.append(record)
+        documents[article.pk] = record.document
+
+    if rendered:
+        store_records(rendered, record_format)
+        logger.debug("Rendered {} {} OAI records".format(len(rendered), record_format))
+    return documents
+
+
+def store_records(records, record_format):
+    """Stores rendered records, replacing any stored for the same articles"""
+    ArticleOAIRecord = submission_models.ArticleOAIRecord
+    features = connections[ArticleOAIRecord.objects.db].features
+    if features.supports_update_conflicts_with_target:
+        ArticleOAIRecord.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=["article", "record_format"],
+            update_fields=["document", "source_last_modified", "date_rendered"],
+        )
+        return
+
+    # Backends such as MySQL can't upsert on the unique fields
+    with transaction.atomic():
+        ArticleOAIRecord.objects.filter(
+            article_id__in=[record.article_id for record in records],
+            record_format=record_format,
+        ).delete()
+        # A concurrent request may have stored the same records meanwhile
+        ArticleOAIRecord.objects.bulk_create(records, ignore_conflicts=True)
+
+
+def get_record(article, record_format):
+    """Returns the stored record of a single article"""
+    return get_records([article], record_format)[article.pk]
@@ -5,14 +5,13 @@ A django implementation of the OAI-PMH interface
 from django.utils import timezone
 from django.views.generic.base import TemplateView
 
-from api.oai import exceptions
+from api.oai import exceptions, records
 from api.oai.base import OAIPagedModelView, metadata_formats
 from identifiers.models import Identifier
 from submission import models as submission_models
 from repository import models as repo_models
 from utils.upgrade import shared
 from journal import models as journal_models
-from xml.dom import minidom
 
 # We default `verb` to ListRecords for backwards compatibility.
 DEFAULT_ENDPOINT = "ListRecords"
@@ -45,8 +44,10 @@ def oai_view_factory(request, *args, **kwargs):
 class OAIListRecords(OAIPagedModelView):
     # default is OAI_DC
     template_name = "apis/OAI_ListRecords.xml"
-    queryset = submission_models.Article.objects.all()
+    queryset = submission_models.Article.objects.select_related("journal")
     paginate_by = 50
+    # Whether the metadata of each record is listed, as well as its header
+    include_metadata = True
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -113,6 +114,11 @@ class OAIListRecords(OAIPagedModelView):
         context["metadataPrefix"] = self.request.GET.get(
             "metadataPrefix", DEFAULT_METADATA_PREFIX
         )
+        record_format = records.METADATA_PREFIX_FORMATS.get(context["metadataPrefix"])
+        if self.include_metadata and record_format:
+            documents = records.get_records(context["object_list"], record_format)
+            for article in context["object_list"]:
+                article.oai_record = documents[article.pk]
         return context
 
 
@@ -127,9 +133,20 @@ class OAIGetRecord(TemplateView):
         context["metadataPrefix"] = self.request.GET.get(
             "metadataPrefix", DEFAULT_METADATA_PREFIX
         )
-        context["jats"], context["stub"] = self.get_jats(context["article"])
+        context["record"] = self.get_record(
+            context["article"],
+            context["metadataPrefix"],
+        )
+        if context["metadataPrefix"] == "jats":
+            context["jats"], context["stub"] = self.get_jats(context["article"])
         return context
 
+    def get_record(self, article, metadata_prefix):
+        record_format = records.METADATA_PREFIX_FORMATS.get(metadata_prefix)
+        if record_format:
+            return records.get_record(article, record_format)
+        return None
+
     def get_jats(self, article):
         """
         Fetches either JATS from the article or a stub
@@ -137,23 +154,9 @@ class OAIGetRecord(TemplateView):
         @return: JATS XML or a metadata stub, True or False for whether this is
         a stub (False = full JATS, True = stub only)
         """
-        render_galley = article.get_render_galley
-
-        # check if this is a JATS XML file
-        try:
-            if render_galley:
-                with open(render_galley.file.get_file_path(article), "r") as galley:
-                    contents = galley.read()
-
-                    if "DTD JATS" in contents:
-                        # assume this is a JATS XML file
-                        # we need to strip the XML header, though
-                        domified_xml = minidom.parseString(contents)
-                        return domified_xml.documentElement.toxml("utf-8"), False
-        except:
-            # a broad catch that lets us generate a stub if anything goes wrong
-            pass
-
+        jats = records.get_record(article, records.RecordFormat.JATS)
+        if jats:
+            return jats, False
         return None, True
 
     def get_article(self):
@@ -186,6 +189,7 @@ class OAIGetRecord(TemplateView):
 
 class OAIListIdentifiers(OAIListRecords):
     template_name = "apis/OAI_ListIdentifiers.xml"
+    include_metadata = False
 
 
 class OAIListMetadataFormats(TemplateView):
@@ -313,6 +317,10 @@ class OAIGetPreprintRecord(OAIGetRecord):
         context["is_preprints"] = self.request.repository
         return context
 
+    def get_record(self, article, metadata_prefix):
+        # Preprint records are rendered by the template on each request
+        return None
+
     def get_jats(self, article):
         return None, True
 
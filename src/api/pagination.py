@@ -0,0 +1,47 @@
+__copyright__ = "Copyright 2025 Open Library of Humanities"
+__author__ = "Open Library of Humanities"
+__license__ = "AGPL v3"
+__maintainer__ = "Open Library of Humanities"
+
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class PrimaryKeyCursorPagination(CursorPagination):
+    """Paginates by primary key, so each page costs the same at any depth"""
+
+    ordering = "pk"
+    page_size_query_param = "limit"
+
+
+class LimitOffsetOrCursorPagination(LimitOffsetPagination):
+    """Limit/offset pagination, with an opt-in cursor mode for harvesting
+
+    Requests with ?pagination=cursor, or a cursor from a previous page, are
+    paginated with PrimaryKeyCursorPagination. The next and previous links of
+    a cursor page keep the other query parameters of the request.
+    """
+
+    cursor_pagination_class = PrimaryKeyCursorPagination
+    cursor_query_param = PrimaryKeyCursorPagination.cursor_query_param
+    mode_query_param = "pagination"
+
+    def __init__(self):
+        super().__init__()
+        self.cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
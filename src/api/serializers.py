@@ -3,6 +3,7 @@ import uuid
 from rest_framework import serializers, validators
 
 from django.db import transaction
+from django.db.models import Prefetch
 from django.shortcuts import reverse
 
 from core import models as core_models, logic as core_logic
@@ -13,6 +14,82 @@ from identifiers import models as identifier_models
 from events import logic as event_logic
 
 
+class SparseFieldsetMixin:
+    """Serializes only the fields listed in a `fields` query parameter
+
+    e.g. ?fields=pk,title. The related objects needed by each field are
+    declared in get_eager_loading, so views only load those of the requested
+    fields.
+    """
+
+    fields_query_param = "fields"
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        if request is None:
+            return None
+        requested = request.query_params.get(cls.fields_query_param)
+        if not requested:
+            return None
+        return {name.strip() for name in requested.split(",") if name.strip()}
+
+    @classmethod
+    def get_eager_loading(cls):
+        """Returns the select_related and prefetch_related lookups per field
+        :return: A dict of {field name: (select_related, prefetch_related)}
+        """
+        return {}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, request=None):
+        requested = cls.get_requested_fields(request)
+        select_related, prefetch_related = [], []
+        for name, (select, prefetch) in cls.get_eager_loading().items():
+            if requested is None or name in requested:
+                select_related.extend(select)
+                prefetch_related.extend(prefetch)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    def _is_top_level(self):
+        if self.parent is None:
+            return True
+        return (
+            isinstance(self.parent, serializers.ListSerializer)
+            and self.parent.parent is None
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.get_requested_fields(self.context.get("request"))
+        if requested is None or not self._is_top_level():
+            return fields
+        return {name: field for name, field in fields.items() if name in requested}
+
+
+def frozen_author_prefetch(lookup="frozenauthor_set"):
+    """Prefetches frozen authors with the affiliations they are serialized with"""
+    return Prefetch(
+        lookup,
+        queryset=submission_models.FrozenAuthor.objects.prefetch_related(
+            affiliation_prefetch(),
+        ),
+    )
+
+
+def affiliation_prefetch(lookup="controlledaffiliation_set"):
+    return Prefetch(
+        lookup,
+        queryset=core_models.ControlledAffiliation.objects.select_related(
+            "organization__ror_display",
+            "organization__custom_label",
+        ).prefetch_related("organization__locations__country"),
+    )
+
+
 class LicenceSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
         model = submission_models.Licence
@@ -66,7 +143,7 @@ class GalleySerializer(serializers.HyperlinkedModelSerializer):
         fields = ("label", "type", "path")
 
 
-class ArticleSerializer(serializers.HyperlinkedModelSerializer):
+class ArticleSerializer(SparseFieldsetMixin, serializers.HyperlinkedModelSerializer):
     class Meta:
         model = submission_models.Article
         fields = (
@@ -103,6 +180,18 @@ class ArticleSerializer(serializers.HyperlinkedModelSerializer):
     )
     galleys = GalleySerializer(source="galley_set", many=True)
 
+    @classmethod
+    def get_eager_loading(cls):
+        return {
+            "license": (["license"], []),
+            "keywords": ([], ["keywords"]),
+            "section": (["section"], []),
+            "frozenauthors": ([], [frozen_author_prefetch()]),
+            "render_galley": (["render_galley__article__journal"], []),
+            # Galleys are linked back to their article, for Galley.path
+            "galleys": (["journal"], ["galley_set"]),
+        }
+
 
 class PreprintSubjectSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
@@ -215,7 +304,7 @@ class PreprintSupplementaryFileSerializer(serializers.ModelSerializer):
         )
 
 
-class IssueSerializer(serializers.HyperlinkedModelSerializer):
+class IssueSerializer(SparseFieldsetMixin, serializers.HyperlinkedModelSerializer):
     class Meta:
         model = journal_models.Issue
         fields = (
@@ -236,6 +325,22 @@ class IssueSerializer(serializers.HyperlinkedModelSerializer):
         source="issue_type.code",
     )
 
+    @classmethod
+    def get_eager_loading(cls):
+        return {
+            "issue_type": (["issue_type"], []),
+            # Articles are only serialized as links
+            "articles": (
+                [],
+                [
+                    Prefetch(
+                        "articles",
+                        queryset=submission_models.Article.objects.only("pk"),
+                    )
+                ],
+            ),
+        }
+
 
 class JournalSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
@@ -365,7 +470,7 @@ class RepositoryFieldAnswerSerializer(serializers.ModelSerializer):
     )
 
 
-class PreprintSerializer(serializers.ModelSerializer):
+class PreprintSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = repository_models.Preprint
         fields = (
@@ -417,6 +522,50 @@ class PreprintSerializer(serializers.ModelSerializer):
         read_only=True,
     )
 
+    @classmethod
+    def get_eager_loading(cls):
+        return {
+            "license": (["license"], []),
+            "keywords": ([], ["keywords"]),
+            "authors": (
+                [],
+                [
+                    Prefetch(
+                        "preprintauthor_set",
+                        queryset=repository_models.PreprintAuthor.objects.prefetch_related(
+                            affiliation_prefetch("account__controlledaffiliation_set"),
+                        ),
+                    )
+                ],
+            ),
+            "subject": ([], ["subject"]),
+            # Versions are linked back to their preprint, for their download url
+            "versions": (
+                ["repository"],
+                [
+                    Prefetch(
+                        "preprintversion_set",
+                        queryset=repository_models.PreprintVersion.objects.select_related(
+                            "file"
+                        ),
+                    )
+                ],
+            ),
+            "supplementary_files": ([], ["preprintsupplementaryfile_set"]),
+            "additional_field_answers": (
+                [],
+                [
+                    Prefetch(
+                        "repositoryfieldanswer_set",
+                        queryset=repository_models.RepositoryFieldAnswer.objects.select_related(
+                            "field"
+                        ),
+                    )
+                ],
+            ),
+            "owner": (["owner"], []),
+        }
+
 
 class PreprintCreateSerializer(serializers.ModelSerializer):
     @transaction.atomic
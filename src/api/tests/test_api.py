@@ -1,10 +1,14 @@
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework.test import APIClient
 
 from utils.testing import helpers
 from core import models as core_models
+from submission import models as submission_models
 
 
 class TestAPI(TestCase):
@@ -89,3 +93,64 @@ class TestAPI(TestCase):
                 journal_manager_role,
             )
         )
+
+
+class TestArticleAPI(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.press = helpers.create_press()
+        cls.journal, _ = helpers.create_journals()
+        cls.articles = [
+            helpers.create_article(
+                cls.journal,
+                with_author=True,
+                title="Article {}".format(i),
+                stage=submission_models.STAGE_PUBLISHED,
+                date_published=timezone.now() - timezone.timedelta(days=1),
+            )
+            for i in range(3)
+        ]
+        cls.api_client = APIClient()
+
+    def get_articles(self, **params):
+        url = self.journal.site_url(reverse("article-list"))
+        return self.api_client.get(
+            url,
+            params,
+            SERVER_NAME=self.journal.domain,
+        ).json()
+
+    @override_settings(URL_CONFIG="domain")
+    def test_sparse_fieldset(self):
+        response = self.get_articles(fields="pk,title")
+        self.assertEqual(
+            set(response["results"][0].keys()),
+            {"pk", "title"},
+        )
+
+    @override_settings(URL_CONFIG="domain")
+    def test_cursor_pagination(self):
+        first_page = self.get_articles(pagination="cursor", limit=2, fields="pk")
+        self.assertEqual(
+            [article["pk"] for article in first_page["results"]],
+            [article.pk for article in self.articles[:2]],
+        )
+        self.assertNotIn("count", first_page)
+
+        second_page = self.api_client.get(
+            first_page["next"],
+            SERVER_NAME=self.journal.domain,
+        ).json()
+        self.assertEqual(
+            [article["pk"] for article in second_page["results"]],
+            [self.articles[2].pk],
+        )
+
+    @override_settings(URL_CONFIG="domain")
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.get_articles(limit=1)
+        with CaptureQueriesContext(connection) as one_article:
+            self.get_articles(limit=1)
+        with CaptureQueriesContext(connection) as three_articles:
+            self.get_articles(limit=3)
+        self.assertEqual(len(one_article), len(three_articles))
@@ -3,15 +3,18 @@ __author__ = "Mauro Sanchez"
 __license__ = "AGPL v3"
 __maintainer__ = "Birkbeck Centre for Technology and Publishing"
 
-from urllib.parse import unquote_plus
+from urllib.parse import parse_qsl, unquote, unquote_plus
+from django.db import connection
 from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
 from django.utils.http import urlencode
 from django.utils import timezone
 
 from freezegun import freeze_time
+import mock
 from xml.etree import ElementTree as ET
 
+from api.oai import records
 from api.oai.base import OAIPaginationMixin
 from api.tests.test_oai_data import (
     LIST_RECORDS_DATA_DC,
@@ -274,7 +277,6 @@ class TestOAIViews(TestCase):
         expected = {
             "metadataPrefix": "jats",
             "custom-param": "custom-value",
-            "page": 2,
         }
         expected_encoded = urlencode(expected)
         for i in range(1, 102):
@@ -297,3 +299,90 @@ class TestOAIViews(TestCase):
             expected_encoded in unquote_plus(response.context["resumption_token"]),
             "Query parameter has not been encoded into resumption_token",
         )
+
+    @override_settings(URL_CONFIG="domain")
+    @freeze_time(FROZEN_DATETIME_1990)
+    def test_oai_resumption_token_keyset(self):
+        for i in range(1, 102):
+            helpers.create_submission(
+                journal_id=self.journal.pk,
+                stage=sm_models.STAGE_PUBLISHED,
+                date_published="1986-07-12T17:00:00.000+0200",
+                authors=[self.author],
+            )
+
+        path = reverse("OAI_list_records")
+        query_params = dict(verb="ListIdentifiers", metadataPrefix="oai_dc")
+        harvested = []
+        while True:
+            response = self.client.get(path, query_params, SERVER_NAME="testserver")
+            harvested.extend(article.pk for article in response.context["object_list"])
+            token = response.context.get("resumption_token")
+            if not token:
+                break
+            self.assertEqual(response.context["total"], 102)
+            self.assertNotIn("page", dict(parse_qsl(unquote(token))))
+            query_params = dict(verb="ListIdentifiers", resumptionToken=unquote(token))
+
+        self.assertEqual(len(harvested), 102)
+        self.assertCountEqual(
+            harvested,
+            sm_models.Article.objects.filter(
+                stage=sm_models.STAGE_PUBLISHED,
+            ).values_list("pk", flat=True),
+        )
+
+    @override_settings(URL_CONFIG="domain")
+    @freeze_time(FROZEN_DATETIME_2012)
+    def test_records_are_stored_until_article_modified(self):
+        path = reverse("OAI_list_records")
+        query_params = dict(verb="ListRecords", metadataPrefix="oai_dc")
+        self.client.get(path, query_params, SERVER_NAME="testserver")
+        record = sm_models.ArticleOAIRecord.objects.get(
+            article=self.article,
+            record_format=sm_models.ArticleOAIRecord.RecordFormat.OAI_DC,
+        )
+        self.assertIn("<dc:title>", record.document)
+
+        sm_models.ArticleOAIRecord.objects.filter(pk=record.pk).update(
+            document="<record>stored</record>",
+        )
+        response = self.client.get(path, query_params, SERVER_NAME="testserver")
+        self.assertIn("<record>stored</record>", response.content.decode())
+
+        with freeze_time(FROZEN_DATETIME_2012 + timezone.timedelta(minutes=1)):
+            self.article.title = "A modified title"
+            self.article.save()
+            response = self.client.get(path, query_params, SERVER_NAME="testserver")
+        self.assertNotIn("<record>stored</record>", response.content.decode())
+        self.assertIn("A modified title", response.content.decode())
+
+    @override_settings(URL_CONFIG="domain")
+    def test_records_are_replaced_without_upsert_support(self):
+        record_format = sm_models.ArticleOAIRecord.RecordFormat.OAI_DC
+        sm_models.ArticleOAIRecord.objects.create(
+            article=self.article,
+            record_format=record_format,
+            document="<record>stale</record>",
+        )
+        with mock.patch.object(
+            connection.features,
+            "supports_update_conflicts_with_target",
+            False,
+        ):
+            records.store_records(
+                [
+                    sm_models.ArticleOAIRecord(
+                        article=self.article,
+                        record_format=record_format,
+                        document="<record>rendered</record>",
+                    )
+                ],
+                record_format,
+            )
+
+        record = sm_models.ArticleOAIRecord.objects.get(
+            article=self.article,
+            record_format=record_format,
+        )
+        self.assertEqual(record.document, "<record>rendered</record>")
@@ -17,7 +17,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework import permissions
 from rest_framework.response import Response
 
-from api import serializers, permissions as api_permissions
+from api import pagination, serializers, permissions as api_permissions
 from core import models as core_models
 from submission import models as submission_models
 from journal import models as journal_models
@@ -99,6 +99,7 @@ class IssueViewSet(viewsets.ModelViewSet):
     """
 
     serializer_class = serializers.IssueSerializer
+    pagination_class = pagination.LimitOffsetOrCursorPagination
     http_method_names = ["get"]
 
     def get_queryset(self):
@@ -109,7 +110,7 @@ class IssueViewSet(viewsets.ModelViewSet):
         else:
             queryset = journal_models.Issue.objects.all()
 
-        return queryset
+        return self.serializer_class.setup_eager_loading(queryset, self.request)
 
 
 class LicenceViewSet(viewsets.ModelViewSet):
@@ -145,6 +146,7 @@ class ArticleViewSet(viewsets.ModelViewSet):
     """
 
     serializer_class = serializers.ArticleSerializer
+    pagination_class = pagination.LimitOffsetOrCursorPagination
     http_method_names = ["get"]
 
     def get_queryset(self):
@@ -160,7 +162,7 @@ class ArticleViewSet(viewsets.ModelViewSet):
                 date_published__lte=timezone.now(),
             )
 
-        return queryset
+        return self.serializer_class.setup_eager_loading(queryset, self.request)
 
 
 class PreprintViewSet(viewsets.ModelViewSet):
@@ -169,6 +171,7 @@ class PreprintViewSet(viewsets.ModelViewSet):
     """
 
     serializer_class = serializers.PreprintSerializer
+    pagination_class = pagination.LimitOffsetOrCursorPagination
     http_method_names = ["get", "post", "delete", "put"]
     permission_classes = [api_permissions.IsRepositoryManager]
 
@@ -239,7 +242,10 @@ class PreprintViewSet(viewsets.ModelViewSet):
                 subject__name__in=subjects,
             )
 
-        return preprints
+        return serializers.PreprintSerializer.setup_eager_loading(
+            preprints,
+            self.request,
+        )
 
 
 class PublishedPreprintViewSet(PreprintViewSet):
@@ -290,7 +296,10 @@ class UserPreprintsViewSet(PreprintViewSet):
         stage_filter = self.request.GET.get("stage")
         if stage_filter:
             preprints = preprints.filter(stage=stage_filter)
-        return preprints
+        return serializers.PreprintSerializer.setup_eager_loading(
+            preprints,
+            self.request,
+        )
 
 
 class PreprintLicenses(viewsets.ModelViewSet):
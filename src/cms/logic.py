@@ -7,14 +7,17 @@ import os
 import json
 import glob
 import json
-import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup, Comment, NavigableString, Tag
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from django.core.files.base import ContentFile
+from django.db import connections
+from django.test import Client
 
 from cms import models as models
 from journal import models as journal_models
@@ -32,6 +35,8 @@ SITE_SEARCH_PATH = os.path.join(
     settings.SITE_SEARCH_DIR,
 )
 
+SITE_SEARCH_REQUEST_TIMEOUT = 30
+
 
 def add_search_index_document(docs, url, name, text):
     """
@@ -195,33 +200,65 @@ def normalize_url(url):
     return remove_fragment(url).rstrip("/")
 
 
-def get_page(url, fetched_urls):
+def fetch_page(url, previous=None, in_process=False):
     """
-    Gets a new page using requests
+    Gets a page, conditionally when it was crawled before
 
+    :param url: The URL of the page
+    :param previous: The crawl record of the page from the previous run
+    :param in_process: Renders the page with Django's test client instead of
+        requesting it over HTTP
     :type url: str
-    :type fetched_urls: set[str]
-    :rtype: tuple[BeautifulSoup | None, set[str]]
-    """
-    time.sleep(0.1)
-    try:
-        fetched_urls.add(normalize_url(url))
-        headers = {"Accept": "text/html; charset=utf-8"}
-        response = requests.get(url, headers=headers)
-    except requests.exceptions.ConnectionError:
-        logger.warn(f"Could not access {url}")
-        logger.warn("Please run server to index site search")
-        return None, fetched_urls
+    :type previous: dict | None
+    :type in_process: bool
+    :return: A tuple of (status code, html, headers)
+    :rtype: tuple[int | None, str | None, dict]
+    """
+    headers = {"Accept": "text/html; charset=utf-8"}
+    if previous and previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+    if previous and previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+
+    if in_process:
+        parsed = urlparse(url)
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+        response = Client().get(
+            path,
+            follow=True,
+            secure=parsed.scheme == "https",
+            headers=headers,
+            HTTP_HOST=parsed.netloc,
+        )
+        response_headers = response.headers
+        text = response.content.decode(response.charset or "utf-8", "replace")
+    else:
+        try:
+            response = requests.get(
+                url,
+                headers=headers,
+                timeout=SITE_SEARCH_REQUEST_TIMEOUT,
+            )
+        except requests.exceptions.RequestException:
+            logger.warning(f"Could not access {url}")
+            logger.warning("Please run server to index site search")
+            return None, None, {}
+        response_headers = response.headers
+        text = response.text
+
+    if response.status_code == 304:
+        return response.status_code, None, response_headers
 
     if response.status_code != 200:
-        logger.warn(f"Could not access {url}")
-        return None, fetched_urls
+        logger.warning(f"Could not access {url}")
+        return response.status_code, None, response_headers
 
-    if "text/html" not in response.headers["Content-Type"]:
-        return None, fetched_urls
+    if "text/html" not in response_headers.get("Content-Type", ""):
+        return response.status_code, None, response_headers
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    return soup, fetched_urls
+    return response.status_code, text, response_headers
 
 
 def get_name(html):
@@ -256,7 +293,7 @@ def get_body(html):
     return body
 
 
-@cache(900)
+@cache(900, depends_on=["press.Press"])
 def get_base(press):
     """
     Gets and caches the site base
@@ -324,56 +361,193 @@ def decompose_non_content_page_regions(body):
             element.decompose()
 
 
-def add_searchable_page(press, docs, fetched_urls, url):
+def extract_searchable_page(url, html):
     """
-    Adds a searchable page to the index and recurses
-    over indexable anchor links found on that page
+    Extracts the index documents of a page and the links found on it
 
-    :type press: press_models.Press
-    :type docs: list[dict]
-    :type fetched_urls: set[str]
     :type url: str
-    :rtype: tuple[list[dict], set[str]]
+    :type html: str
+    :return: A tuple of (docs, links), where docs have no ids yet
+    :rtype: tuple[list[dict], list[str]]
     """
-    html, fetched_urls = get_page(url, fetched_urls)
+    soup = BeautifulSoup(html, "html.parser")
+    body = get_body(soup)
+    if not body:
+        return [], []
+
+    links = [
+        urljoin(url, anchor.get("href", "").strip()) for anchor in body.find_all("a")
+    ]
+
+    name = get_name(soup)
+    decompose_non_content_page_regions(body)
+
+    docs = add_searchable_page_parts([], url, body)
+    docs = add_search_index_document(docs, url, name, body.get_text())
+    for doc in docs:
+        del doc["id"]
+    return docs, links
+
+
+def crawl_page(url, previous=None, in_process=False):
+    """
+    Fetches and indexes a page, reusing the previous crawl record of the page
+    when the server reports it as not modified or its html is unchanged
+
+    :type url: str
+    :type previous: dict | None
+    :type in_process: bool
+    :rtype: dict | None
+    """
+    status, html, headers = fetch_page(url, previous, in_process=in_process)
+    if status == 304 and previous:
+        return previous
     if not html:
-        return docs, fetched_urls
+        return None
+
+    page = {
+        "url": url,
+        "last_modified": headers.get("Last-Modified"),
+        "etag": headers.get("ETag"),
+        "fingerprint": sha1(html.encode("utf-8")).hexdigest(),
+    }
+    if previous and previous.get("fingerprint") == page["fingerprint"]:
+        page["docs"], page["links"] = previous["docs"], previous["links"]
+    else:
+        page["docs"], page["links"] = extract_searchable_page(url, html)
+    return page
 
-    body = get_body(html)
-    if not body:
-        return docs, fetched_urls
-
-    for anchor in body.find_all("a"):
-        href = anchor.get("href", "").strip()
-        deeper_url = urljoin(url, href)
-        if url_in_scope(press, deeper_url) and url_is_new(fetched_urls, deeper_url):
-            docs, fetched_urls = add_searchable_page(
-                press, docs, fetched_urls, deeper_url
+
+def crawl_press_site(press, previous_pages=None, workers=1, in_process=False):
+    """
+    Crawls the press site breadth first, fetching each level of links with a
+    pool of worker threads
+
+    :param press: The press whose site is indexed
+    :param previous_pages: The crawl records of the previous run, by URL
+    :param workers: The number of pages fetched concurrently
+    :param in_process: Renders pages with Django's test client
+    :type press: press_models.Press
+    :type previous_pages: dict[str, dict] | None
+    :type workers: int
+    :type in_process: bool
+    :return: The crawl record of each page found, by normalized URL
+    :rtype: dict[str, dict]
+    """
+    previous_pages = previous_pages or {}
+    base = get_base(press)
+    pages = {}
+    fetched_urls = {normalize_url(base)}
+    to_crawl = [base]
+
+    def crawl(url):
+        try:
+            return crawl_page(
+                url,
+                previous_pages.get(normalize_url(url)),
+                in_process=in_process,
             )
+        finally:
+            if in_process and workers > 1:
+                # Each worker thread opens its own connections
+                connections.close_all()
 
-    name = get_name(html)
-    decompose_non_content_page_regions(body)
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while to_crawl:
+            if executor:
+                crawled = executor.map(crawl, to_crawl)
+            else:
+                crawled = map(crawl, to_crawl)
+            next_to_crawl = []
+            for url, page in zip(to_crawl, crawled):
+                if page is None:
+                    continue
+                pages[normalize_url(url)] = page
+                for deeper_url in page["links"]:
+                    if url_in_scope(press, deeper_url) and url_is_new(
+                        fetched_urls, deeper_url
+                    ):
+                        fetched_urls.add(normalize_url(deeper_url))
+                        next_to_crawl.append(deeper_url)
+            to_crawl = next_to_crawl
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return pages
+
+
+def merge_search_documents(pages):
+    """
+    Combines the documents of each crawled page into the MiniSearch index data
+
+    :type pages: dict[str, dict]
+    :rtype: list[dict]
+    """
+    docs = []
+    for page in pages.values():
+        for doc in page["docs"]:
+            docs = add_search_index_document(docs, doc["url"], doc["name"], doc["text"])
+    return docs
+
+
+def get_search_pages_filepath(press):
+    return os.path.join(SITE_SEARCH_PATH, f"_press_{press.pk}_pages.json")
+
+
+def load_crawled_pages(press):
+    """
+    Loads the crawl records saved by the previous run
+
+    :type press: press_models.Press
+    :rtype: dict[str, dict]
+    """
+    try:
+        with open(get_search_pages_filepath(press), "r") as pages_file:
+            return json.load(pages_file)
+    except (FileNotFoundError, ValueError):
+        return {}
 
-    docs = add_searchable_page_parts(docs, url, body)
 
-    rest_of_body = body.get_text()
-    docs = add_search_index_document(docs, url, name, rest_of_body)
-    return docs, fetched_urls
+def save_crawled_pages(press, pages):
+    os.makedirs(SITE_SEARCH_PATH, exist_ok=True)
+    with open(get_search_pages_filepath(press), "w") as pages_file:
+        json.dump(pages, pages_file, separators=(",", ":"))
 
 
-def get_press_site_search_data(press):
+def get_press_site_search_data(press, workers=1, in_process=False):
     """
     Generates data for press-level site search index
     to be used by MiniSearch
 
+    Only pages that changed since the previous run are indexed again; the
+    documents of other pages are reused from the saved crawl records.
+
     :type press: press_models.Press
+    :type workers: int
+    :type in_process: bool
     :rtype: list[dict]
     """
-    docs = []
-    fetched_urls = set()
-    base = get_base(press)
-    docs, fetched_urls = add_searchable_page(press, docs, fetched_urls, base)
+    previous_pages = load_crawled_pages(press)
+    pages = crawl_press_site(
+        press,
+        previous_pages,
+        workers=workers,
+        in_process=in_process,
+    )
+    reindexed = sum(
+        1
+        for key, page in pages.items()
+        if previous_pages.get(key, {}).get("fingerprint") != page["fingerprint"]
+    )
+    logger.info(
+        f"Crawled {len(pages)} pages, {reindexed} new or changed, "
+        f"{len(set(previous_pages) - set(pages))} removed"
+    )
+    save_crawled_pages(press, pages)
 
+    docs = merge_search_documents(pages)
     if not len(docs) > 0:
         logger.error("Search data store is empty")
 
@@ -388,26 +562,36 @@ def get_search_docs_filepath(press):
     return os.path.join(SITE_SEARCH_PATH, f"_press_{press.pk}_documents.json")
 
 
-def update_search_data(press):
+def update_search_data(press, workers=1, in_process=False):
     docs_filename = get_search_docs_filename(press)
     docs_file, created = models.MediaFile.objects.get_or_create(label=docs_filename)
-    if not created:
-        docs_file.unlink()
 
-    documents = get_press_site_search_data(press)
+    documents = get_press_site_search_data(
+        press,
+        workers=workers,
+        in_process=in_process,
+    )
     docs_json = json.dumps(documents, separators=(",", ":"))
 
+    if not created:
+        if docs_file.file and os.path.exists(docs_file.file.path):
+            with open(docs_file.file.path, "r") as existing_file:
+                if existing_file.read() == docs_json:
+                    # Leaves the file, and any cached copies of it, untouched
+                    return docs_file
+        docs_file.unlink()
+
     content_file = ContentFile(docs_json.encode("utf-8"))
     docs_file.file.save(docs_filename, content_file, save=True)
     return docs_file
 
 
 def delete_search_data(press):
-    path = get_search_docs_filepath(press)
     files_deleted = []
-    if os.path.exists(path):
-        os.unlink(path)
-        files_deleted.append(path)
+    for path in (get_search_docs_filepath(press), get_search_pages_filepath(press)):
+        if os.path.exists(path):
+            os.unlink(path)
+            files_deleted.append(path)
     if settings.IN_TEST_RUNNER:
         if os.listdir(SITE_SEARCH_PATH):
             logger.warning(f"Left-over test files: {os.listdir(SITE_SEARCH_PATH)}")
@@ -417,7 +601,7 @@ def delete_search_data(press):
     return files_deleted
 
 
-@cache(900)
+@cache(900, depends_on=["cms.MediaFile"])
 def get_search_data_url(press):
     docs_filename = get_search_docs_filename(press)
     try:
@@ -12,11 +12,28 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--press_id", type=int)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of pages fetched concurrently.",
+        )
+        parser.add_argument(
+            "--in_process",
+            action="store_true",
+            default=False,
+            help="Render pages with Django's test client instead of "
+            "requesting them from the running site over HTTP.",
+        )
 
     def handle(self, *args, **options):
         if options["press_id"]:
             press = press_models.Press.objects.get(pk=options["press_id"])
         else:
             press = press_models.Press.objects.first()
-        documents = cms_logic.update_search_data(press)
+        documents = cms_logic.update_search_data(
+            press,
+            workers=options["workers"],
+            in_process=options["in_process"],
+        )
         logger.debug(self.style.SUCCESS(f"Successfully updated {documents}"))
@@ -190,6 +190,86 @@ class TestSiteSearch(TestCase):
             cms_logic.url_in_scope(self.press, "https://www.wikipedia.org")
         )
 
+    def fake_site(self, site):
+        def fetch_page(url, previous=None, in_process=False):
+            return 200, site.get(url), {}
+
+        return fetch_page
+
+    @patch("cms.logic.url_in_scope", return_value=True)
+    @patch("cms.logic.get_base", return_value="https://press.example.org/")
+    @patch("cms.logic.fetch_page")
+    def test_crawl_press_site(self, fetch_page, get_base, url_in_scope):
+        fetch_page.side_effect = self.fake_site(
+            {
+                "https://press.example.org/": """
+                    <html><body><h1>Home</h1>
+                    <a href="/about/">About</a><a href="/news/#latest">News</a>
+                    </body></html>
+                """,
+                "https://press.example.org/about/": """
+                    <html><body><h1>About</h1><p>Who we are</p>
+                    <a href="/">Home</a></body></html>
+                """,
+                "https://press.example.org/news/#latest": """
+                    <html><body><h1>News</h1><p>Latest news</p></body></html>
+                """,
+            }
+        )
+        pages = cms_logic.crawl_press_site(self.press, workers=2)
+        self.assertEqual(
+            set(pages),
+            {
+                "https://press.example.org",
+                "https://press.example.org/about",
+                "https://press.example.org/news",
+            },
+        )
+        self.assertEqual(fetch_page.call_count, 3)
+
+        docs = cms_logic.merge_search_documents(pages)
+        self.assertEqual([doc["id"] for doc in docs], list(range(len(docs))))
+        self.assertTrue(any("Who we are" in doc["text"] for doc in docs))
+
+    @patch("cms.logic.url_in_scope", return_value=True)
+    @patch("cms.logic.get_base", return_value="https://press.example.org/")
+    @patch("cms.logic.fetch_page")
+    def test_crawl_press_site_reuses_unchanged_pages(
+        self,
+        fetch_page,
+        get_base,
+        url_in_scope,
+    ):
+        site = {
+            "https://press.example.org/": """
+                <html><body><h1>Home</h1><a href="/about/">About</a></body></html>
+            """,
+            "https://press.example.org/about/": """
+                <html><body><h1>About</h1><p>Who we are</p></body></html>
+            """,
+        }
+        fetch_page.side_effect = self.fake_site(site)
+        previous_pages = cms_logic.crawl_press_site(self.press)
+
+        site["https://press.example.org/about/"] = """
+            <html><body><h1>About</h1><p>What we do</p></body></html>
+        """
+        with patch(
+            "cms.logic.extract_searchable_page",
+            wraps=cms_logic.extract_searchable_page,
+        ) as extract:
+            pages = cms_logic.crawl_press_site(self.press, previous_pages)
+        extract.assert_called_once()
+
+        docs = cms_logic.merge_search_documents(pages)
+        text = " ".join(doc["text"] for doc in docs)
+        self.assertIn("What we do", text)
+        self.assertNotIn("Who we are", text)
+
+        fetch_page.side_effect = None
+        fetch_page.return_value = (304, None, {})
+        self.assertEqual(cms_logic.crawl_press_site(self.press, pages), pages)
+
     @patch("cms.logic.update_search_data")
     def test_generate_command(self, update_search_data):
         update_search_data.return_value = []
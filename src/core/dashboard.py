@@ -0,0 +1,292 @@
+"""
+Cached counters for the workflow dashboard.
+
+Every per-stage and per-role count shown on the dashboard is computed with
+conditional aggregation, one query per table, and cached per journal and user.
+Cached counts are evicted when a workflow event fires for the journal, by
+bumping a version counter stored in the cache backend.
+"""
+
+__copyright__ = "Copyright 2025 Open Library of Humanities"
+__author__ = "Open Library of Humanities"
+__license__ = "AGPL v3"
+__maintainer__ = "Open Library of Humanities"
+
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Q
+
+from copyediting import models as copyedit_models
+from events import logic as event_logic
+from production import models as production_models
+from proofing import models as proofing_models
+from review import models as review_models
+from submission import models as submission_models
+
+CACHE_PREFIX = "dashboard_statistics"
+# Upper bound on the age of the counts, for changes made outside the workflow
+CACHE_TIMEOUT = 300
+
+# Events that don't move articles through the workflow of a journal
+NON_WORKFLOW_EVENTS = {
+    event_logic.Events.ON_ARTICLE_ACCESS,
+    event_logic.Events.ON_ACCESS_REQUEST,
+    event_logic.Events.ON_ACCESS_REQUEST_COMPLETE,
+    event_logic.Events.ON_REVIEW_SECURITY_OVERRIDE,
+}
+WORKFLOW_EVENTS = [
+    event_name
+    for name, event_name in vars(event_logic.Events).items()
+    if name.startswith("ON_")
+    and not name.startswith("ON_PREPRINT")
+    and event_name not in NON_WORKFLOW_EVENTS
+]
+
+
+def _version_key(journal_id):
+    return "{}:version:{}".format(CACHE_PREFIX, journal_id)
+
+
+def _new_version():
+    # Seeded from the clock so an evicted version key is never reused
+    return int(time.time() * 1000)
+
+
+def _get_version(journal_id):
+    key = _version_key(journal_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_journal(journal_id):
+    """Evicts the cached dashboard counts of every user of a journal"""
+    key = _version_key(journal_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), timeout=None)
+
+
+def invalidate_on_event(**kwargs):
+    """Event hook evicting the counts of the journal an event was raised for"""
+    journal_id = None
+    request = kwargs.get("request")
+    if getattr(request, "journal", None) is not None:
+        journal_id = request.journal.pk
+    else:
+        for name in ("article", "task_obj"):
+            journal_id = getattr(kwargs.get(name), "journal_id", None)
+            if journal_id:
+                break
+    if journal_id:
+        invalidate_journal(journal_id)
+
+
+def count_articles(journal, user):
+    """Counts the articles of a journal per stage, and the user's submissions"""
+    user_is_author = Exists(
+        submission_models.FrozenAuthor.objects.filter(
+            article=OuterRef("pk"),
+            author=user,
+        )
+    )
+    return (
+        submission_models.Article.objects.filter(journal=journal)
+        .annotate(user_is_author=user_is_author)
+        .aggregate(
+            unassigned_articles_count=Count(
+                "pk",
+                filter=Q(stage=submission_models.STAGE_UNASSIGNED),
+            ),
+            assigned_articles_count=Count(
+                "pk",
+                filter=Q(
+                    stage__in=[
+                        submission_models.STAGE_ASSIGNED,
+                        submission_models.STAGE_UNDER_REVIEW,
+                        submission_models.STAGE_UNDER_REVISION,
+                    ]
+                ),
+            ),
+            editing_articles_count=Count(
+                "pk",
+                filter=Q(
+                    stage__in=[
+                        submission_models.STAGE_EDITOR_COPYEDITING,
+                        submission_models.STAGE_AUTHOR_COPYEDITING,
+                        submission_models.STAGE_FINAL_COPYEDITING,
+                    ]
+                ),
+            ),
+            production_articles_count=Count(
+                "pk",
+                filter=Q(stage=submission_models.STAGE_TYPESETTING),
+            ),
+            proofing_articles_count=Count(
+                "pk",
+                filter=Q(stage=submission_models.STAGE_PROOFING),
+            ),
+            prepub_articles_count=Count(
+                "pk",
+                filter=Q(stage=submission_models.STAGE_READY_FOR_PUBLICATION),
+            ),
+            active_submission_count=Count(
+                "pk",
+                filter=Q(user_is_author=True)
+                & ~Q(stage=submission_models.STAGE_UNSUBMITTED),
+            ),
+            in_progress_submission_count=Count(
+                "pk",
+                filter=Q(owner=user, stage=submission_models.STAGE_UNSUBMITTED),
+            ),
+        )
+    )
+
+
+def count_reviews(journal, user):
+    return review_models.ReviewAssignment.objects.filter(
+        reviewer=user,
+        article__journal=journal,
+    ).aggregate(
+        assigned_articles_for_user_review_count=Count(
+            "pk",
+            filter=Q(
+                is_complete=False,
+                article__stage=submission_models.STAGE_UNDER_REVIEW,
+                date_accepted__isnull=True,
+            ),
+        ),
+        assigned_articles_for_user_review_accepted_count=Count(
+            "pk",
+            filter=Q(
+                is_complete=False,
+                article__stage=submission_models.STAGE_UNDER_REVIEW,
+                date_accepted__isnull=False,
+            ),
+        ),
+        assigned_articles_for_user_review_completed_count=Count(
+            "pk",
+            filter=Q(is_complete=True, date_declined__isnull=True),
+        ),
+    )
+
+
+def count_copyedits(journal, user):
+    return copyedit_models.CopyeditAssignment.objects.filter(
+        copyeditor=user,
+        article__journal=journal,
+    ).aggregate(
+        copyeditor_requests=Count(
+            "pk",
+            filter=Q(decision__isnull=True, copyedit_reopened__isnull=True),
+        ),
+        copyeditor_accepted_requests=Count(
+            "pk",
+            filter=Q(decision="accept", copyeditor_completed__isnull=True)
+            | Q(
+                decision="accept",
+                copyeditor_completed__isnull=False,
+                copyedit_reopened__isnull=False,
+                copyedit_reopened_complete__isnull=True,
+            ),
+        ),
+        copyeditor_completed_requests=Count(
+            "pk",
+            filter=Q(copyeditor_completed__isnull=False),
+        ),
+    )
+
+
+def count_typeset_tasks(journal, user):
+    return production_models.TypesetTask.active_objects.filter(
+        typesetter=user,
+        assignment__article__journal=journal,
+    ).aggregate(
+        typeset_tasks=Count(
+            "pk",
+            filter=Q(accepted__isnull=True, completed__isnull=True),
+        ),
+        typeset_in_progress_tasks=Count(
+            "pk",
+            filter=Q(accepted__isnull=False, completed__isnull=True),
+        ),
+        typeset_completed_tasks=Count(
+            "pk",
+            filter=Q(accepted__isnull=False, completed__isnull=False),
+        ),
+    )
+
+
+def count_proofing_tasks(journal, user):
+    counts = proofing_models.ProofingTask.active_objects.filter(
+        proofreader=user,
+        cancelled=False,
+        round__assignment__article__journal=journal,
+    ).aggregate(
+        new_proofing=Count(
+            "pk",
+            filter=Q(completed__isnull=True, accepted__isnull=True),
+        ),
+        active_proofing=Count(
+            "pk",
+            filter=Q(completed__isnull=True, accepted__isnull=False),
+        ),
+        completed_proofing=Count("pk", filter=Q(completed__isnull=False)),
+    )
+    counts.update(
+        proofing_models.TypesetterProofingTask.active_objects.filter(
+            typesetter=user,
+            cancelled=False,
+            proofing_task__round__assignment__article__journal=journal,
+        ).aggregate(
+            new_proofing_typesetting=Count(
+                "pk",
+                filter=Q(completed__isnull=True, accepted__isnull=True),
+            ),
+            active_proofing_typesetting=Count(
+                "pk",
+                filter=Q(completed__isnull=True, accepted__isnull=False),
+            ),
+            completed_proofing_typesetting=Count(
+                "pk",
+                filter=Q(completed__isnull=False),
+            ),
+        )
+    )
+    return counts
+
+
+def compute_statistics(journal, user):
+    statistics = {}
+    for count in (
+        count_articles,
+        count_reviews,
+        count_copyedits,
+        count_typeset_tasks,
+        count_proofing_tasks,
+    ):
+        statistics.update(count(journal, user))
+    return statistics
+
+
+def get_statistics(journal, user):
+    """Returns the dashboard counts of a user, from the cache when fresh
+    :param journal: The Journal of the dashboard
+    :param user: The Account viewing the dashboard
+    :return: A dict mapping the names of the counts to their values
+    """
+    key = "{}:{}:{}:{}".format(
+        CACHE_PREFIX,
+        journal.pk,
+        _get_version(journal.pk),
+        user.pk,
+    )
+    statistics = cache.get(key)
+    if statistics is None:
+        statistics = compute_statistics(journal, user)
+        cache.set(key, statistics, CACHE_TIMEOUT)
+    return statistics
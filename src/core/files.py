@@ -12,9 +12,12 @@ from lxml import etree
 import shutil
 import magic
 import hashlib
+import threading
+import zipfile
 
 from bs4 import BeautifulSoup
 from django.conf import settings
+from django.core.cache import caches
 from django.contrib import messages
 from django.http import Http404
 from django.http import StreamingHttpResponse, HttpResponseRedirect, HttpResponse
@@ -36,6 +39,8 @@ logger = get_logger(__name__)
 
 TEMP_DIR = os.path.join(settings.BASE_DIR, "files", "temp")
 
+_xsl_transforms = threading.local()
+
 EDITABLE_FORMAT = (
     "application/rtf",
     "application/x-rtf",
@@ -68,6 +73,18 @@ PDF_MIMETYPES = {
 
 
 MIMETYPES_WITH_FIGURES = XML_MIMETYPES + HTML_MIMETYPES
+
+# Formats stored without recompression when zipped
+COMPRESSED_MIMETYPES = {
+    "application/epub+zip",
+    "application/gzip",
+    "application/vnd.oasis.opendocument.text",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/x-7z-compressed",
+    "application/zip",
+} | PDF_MIMETYPES
+UNCOMPRESSED_MEDIA_MIMETYPES = {"image/bmp", "image/svg+xml", "image/tiff"}
+ZIP_CHUNK_SIZE = 64 * 1024
 CROSSREF_XSL = "NLM.JATS2Crossref.v3.1.1.xsl"
 
 
@@ -347,7 +364,7 @@ def render_xml(file_to_render, article, xsl_path=None, recover=False):
     :param file_to_render: the file object to retrieve and render
     :param article: the associated article
     :param xsl_path: optional path to a custom xsl file
-    :return: a transform of the file to through the XSLT processor
+    :return: the output of the XSLT processor, as a string
     """
 
     path = os.path.join(
@@ -379,7 +396,73 @@ def render_xml(file_to_render, article, xsl_path=None, recover=False):
         xsl_path = settings.BUILTIN_XSL_PATH
         logger.debug("Rendering engine using {}".format(xsl_path))
 
-    return transform_with_xsl(path, xsl_path, recover=recover)
+    render_cache = get_xml_render_cache()
+    if render_cache is None:
+        return str(transform_with_xsl(path, xsl_path, recover=recover))
+
+    cache_key = get_xml_render_cache_key(file_to_render, path, xsl_path, recover)
+    rendered = render_cache.get(cache_key)
+    if rendered is None:
+        rendered = str(transform_with_xsl(path, xsl_path, recover=recover))
+        render_cache.set(cache_key, rendered, settings.XML_RENDER_CACHE_TIMEOUT)
+    return rendered
+
+
+def get_xml_render_cache():
+    """Returns the cache backend storing rendered XML or None if disabled
+
+    Rendered documents are large, so they are only cached when
+    XML_RENDER_CACHE names a backend in CACHES, rather than in the default
+    per-process cache.
+    """
+    if not settings.XML_RENDER_CACHE:
+        return None
+    return caches[settings.XML_RENDER_CACHE]
+
+
+def get_xml_render_cache_key(file_to_render, xml_path, xsl_path, recover):
+    """Keys a rendered XML file on the state of its XML and XSL files
+
+    The modification time and size of both files on disk are part of the key,
+    so replacing either one, or switching stylesheet, misses the cache.
+    """
+    xml_stat = os.stat(xml_path)
+    xsl_stat = os.stat(xsl_path)
+    raw_key = ":".join(
+        str(part)
+        for part in (
+            file_to_render.pk,
+            file_to_render.last_modified,
+            xml_path,
+            xml_stat.st_mtime_ns,
+            xml_stat.st_size,
+            xsl_path,
+            xsl_stat.st_mtime_ns,
+            xsl_stat.st_size,
+            recover,
+        )
+    )
+    return "xml_render:{}".format(hashlib.sha1(raw_key.encode("utf-8")).hexdigest())
+
+
+def get_xsl_transform(xsl_path):
+    """Returns a compiled XSLT for the given file, compiling it at most once
+
+    Compiled stylesheets are kept per thread, as lxml does not support running
+    one XSLT object from several threads at once, and are recompiled when the
+    file on disk changes.
+    """
+    xsl_stat = os.stat(xsl_path)
+    revision = (xsl_stat.st_mtime_ns, xsl_stat.st_size)
+    compiled = getattr(_xsl_transforms, "by_path", None)
+    if compiled is None:
+        compiled = _xsl_transforms.by_path = {}
+
+    cached = compiled.get(xsl_path)
+    if cached is None or cached[0] != revision:
+        cached = (revision, etree.XSLT(etree.parse(xsl_path)))
+        compiled[xsl_path] = cached
+    return cached[1]
 
 
 def transform_with_xsl(xml_path, xsl_path, recover=False):
@@ -392,7 +475,7 @@ def transform_with_xsl(xml_path, xsl_path, recover=False):
             xml_dom = etree.parse(xml_path, parser=parser)
         else:
             raise
-    xsl_transform = etree.XSLT(etree.parse(xsl_path))
+    xsl_transform = get_xsl_transform(xsl_path)
     try:
         transformed_dom = xsl_transform(xml_dom)
         return transformed_dom
@@ -847,37 +930,137 @@ def file_children(file):
     return children
 
 
-def zip_article_files(files, article_folders=False):
+def get_article_zip_entries(files, article_folders=False):
     """
-    Zips up files that are related to an article.
+    Lists the paths and archive names of files that are related to an article.
     :param files: A list or queryset of File objects that have article_ids
     :param article_folders: Boolean, if true splits files into folders with
     article name.
-    :return: strings path of the zip file, zip file name
+    :return: A list of (path, archive name, mime type) tuples
     """
-    file_name = "{0}.zip".format(uuid4())
-
-    # Copy files into a temp dir
-    _dir = os.path.join(settings.BASE_DIR, "files/temp", str(uuid4()))
-    os.makedirs(_dir, 0o775)
-
+    entries = []
+    seen = set()
     for file in files:
         if file.article_id:
+            arcname = str(file.uuid_filename)
             if article_folders:
                 folder_name = "{id} - {title}".format(
                     id=file.article_id, title=strip_tags(file.article.title)
                 )
-                article_dir = os.path.join(_dir, folder_name)
-                if not os.path.exists(article_dir):
-                    os.makedirs(article_dir, 0o775)
-                shutil.copy(file.self_article_path(), article_dir)
+                arcname = "{0}/{1}".format(folder_name.replace("/", "-"), arcname)
+            if arcname not in seen:
+                seen.add(arcname)
+                entries.append((file.self_article_path(), arcname, file.mime_type))
+    return entries
+
+
+def is_compressed_mime_type(mime_type):
+    """Checks if a format is already compressed and gains nothing from zipping"""
+    if not mime_type:
+        return False
+    return (
+        mime_type in COMPRESSED_MIMETYPES
+        or mime_type.startswith(("image/", "audio/", "video/"))
+        and mime_type not in UNCOMPRESSED_MEDIA_MIMETYPES
+    )
+
+
+class _ZipStream(object):
+    """A write only file object collecting the output of a ZipFile
+
+    ZipFile falls back to writing data descriptors when its file object
+    cannot seek, so an archive can be produced in a single pass.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def iter_zip(entries, chunk_size=ZIP_CHUNK_SIZE):
+    """Yields a zip archive of the given files as it is being written
+
+    Source files are read straight into the archive. Formats that are already
+    compressed are stored as they are, everything else is deflated.
+    :param entries: An iterable of (path, archive name, mime type) tuples
+    :param chunk_size: The number of bytes read from a source file at a time
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, mode="w", allowZip64=True) as archive:
+        for path, arcname, mime_type in entries:
+            try:
+                info = zipfile.ZipInfo.from_file(path, arcname)
+            except FileNotFoundError:
+                logger.error("Skipping {}, the file was not found".format(path))
+                continue
+            if is_compressed_mime_type(mime_type):
+                info.compress_type = zipfile.ZIP_STORED
             else:
-                shutil.copy(file.self_article_path(), _dir)
+                info.compress_type = zipfile.ZIP_DEFLATED
+
+            with open(path, "rb") as source, archive.open(info, "w") as target:
+                for chunk in iter(lambda: source.read(chunk_size), b""):
+                    target.write(chunk)
+                    if len(stream.buffer) >= chunk_size:
+                        yield stream.pop()
+            yield stream.pop()
+    yield stream.pop()
+
+
+def serve_zip(entries, file_name):
+    """Streams a zip archive of the given files without a temporary copy
+    :param entries: An iterable of (path, archive name, mime type) tuples
+    :param file_name: The name of the zip file offered to the browser
+    :return: A StreamingHttpResponse
+    """
+    filename, extension = os.path.splitext(file_name)
+    response = StreamingHttpResponse(iter_zip(entries), content_type="application/zip")
+    response["Content-Disposition"] = 'attachment; filename="{0}{1}"'.format(
+        slugify(filename), extension
+    )
+    return response
 
-    zip_path = "{dir}.zip".format(dir=_dir)
 
-    shutil.make_archive(_dir, "zip", _dir)
-    shutil.rmtree(_dir)
+def serve_article_files_zip(files, article_folders=False, file_name=None):
+    """Streams a zip of files that are related to an article
+    :param files: A list or queryset of File objects that have article_ids
+    :param article_folders: Boolean, if true splits files into folders with
+    article name.
+    :param file_name: Optional name of the zip file, a UUID by default.
+    :return: A StreamingHttpResponse
+    """
+    return serve_zip(
+        get_article_zip_entries(files, article_folders=article_folders),
+        file_name or "{0}.zip".format(uuid4()),
+    )
+
+
+def zip_article_files(files, article_folders=False):
+    """
+    Zips up files that are related to an article.
+    :param files: A list or queryset of File objects that have article_ids
+    :param article_folders: Boolean, if true splits files into folders with
+    article name.
+    :return: strings path of the zip file, zip file name
+    """
+    file_name = "{0}.zip".format(uuid4())
+    zip_path = os.path.join(settings.BASE_DIR, "files/temp", file_name)
+    os.makedirs(os.path.dirname(zip_path), 0o775, exist_ok=True)
+
+    with open(zip_path, "wb") as zip_file:
+        for chunk in iter_zip(get_article_zip_entries(files, article_folders)):
+            zip_file.write(chunk)
     return zip_path, file_name
 
 
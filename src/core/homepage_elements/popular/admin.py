@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from core.homepage_elements.popular import models
+
+
+class PopularArticleAdmin(admin.ModelAdmin):
+    list_display = ("article", "rank", "access_count", "window", "journal", "refreshed")
+    list_filter = ("journal", "window")
+    search_fields = ("article__pk", "article__title")
+    raw_id_fields = ("article",)
+
+
+admin_list = [
+    (models.PopularArticle, PopularArticleAdmin),
+]
+
+[admin.site.register(*t) for t in admin_list]
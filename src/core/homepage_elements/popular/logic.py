@@ -1,11 +1,26 @@
 from datetime import timedelta
 
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from django.db.models import Count
 from django.utils import timezone
 
+from core import models as core_models
+from journal import models as journal_models
+from metrics import logic as metrics_logic
 from submission import models as sm
 from utils import setting_handler
-from core.homepage_elements.popular import plugin_settings
+from core.homepage_elements.popular import models, plugin_settings
+
+WINDOW_DAYS = {
+    "weekly": 7,
+    "monthly": 30,
+    "yearly": 365,
+}
+
+# Rankings hold at least this many articles, so that raising the number of
+# articles displayed does not have to wait for the next refresh
+MIN_RANKING_SIZE = 25
 
 
 def get_popular_article_settings(journal):
@@ -40,20 +55,47 @@ def get_popular_article_settings(journal):
     return most_popular, num_most_popular, most_popular_time
 
 
+def get_window(time):
+    return time if time in WINDOW_DAYS else "yearly"
+
+
 def calc_start_date(time):
     date_time = timezone.now()
+    return date_time - timedelta(days=WINDOW_DAYS[get_window(time)])
 
-    if time == "weekly":
-        delta = 7
-    elif time == "monthly":
-        delta = 30
-    else:
-        delta = 365
 
-    return date_time - timedelta(days=delta)
+def get_most_popular_articles(journal, number, time):
+    """Returns the most accessed published articles of a journal
 
+    Articles are read from the precomputed ranking when it has been built for
+    the journal and window, and counted from the accesses otherwise.
+    """
+    ranking = list(
+        models.PopularArticle.objects.filter(
+            journal=journal,
+            window=get_window(time),
+            article__stage=sm.STAGE_PUBLISHED,
+        )
+        .select_related("article")
+        .order_by("rank")[:number]
+    )
+    if (
+        ranking
+        or models.PopularArticle.objects.filter(
+            journal=journal,
+            window=get_window(time),
+        ).exists()
+    ):
+        articles = []
+        for entry in ranking:
+            entry.article.access_count = entry.access_count
+            articles.append(entry.article)
+        return articles
 
-def get_most_popular_articles(journal, number, time):
+    return count_most_popular_articles(journal, number, time)
+
+
+def count_most_popular_articles(journal, number, time):
     start_date = calc_start_date(time)
 
     articles = (
@@ -67,3 +109,100 @@ def get_most_popular_articles(journal, number, time):
     )
 
     return articles
+
+
+def get_journals_displaying_popular_articles():
+    return journal_models.Journal.objects.filter(
+        pk__in=core_models.HomepageElement.objects.filter(
+            name=plugin_settings.PLUGIN_NAME,
+            content_type=ContentType.objects.get_for_model(journal_models.Journal),
+            active=True,
+        ).values("object_id"),
+    )
+
+
+def refresh_ranking(journal, time, size):
+    """Rebuilds the ranking of a journal for a time window
+
+    Counts are read from the daily access rollup, so the cost depends on the
+    number of articles accessed rather than the number of accesses. Only the
+    entries that changed since the last refresh are written.
+    :param journal: A Journal
+    :param time: The time window, e.g. "weekly"
+    :param size: The number of articles ranked
+    :return: The number of entries created, updated or deleted
+    """
+    window = get_window(time)
+    counts = metrics_logic.get_access_counts_since(
+        calc_start_date(window),
+        journal=journal,
+        stage=sm.STAGE_PUBLISHED,
+    )
+    titles = dict(
+        sm.Article.objects.filter(pk__in=counts).values_list("pk", "title"),
+    )
+    ranked_ids = sorted(
+        (article_id for article_id, count in counts.items() if count),
+        key=lambda article_id: (-counts[article_id], titles.get(article_id) or ""),
+    )[:size]
+
+    refreshed = timezone.now()
+    with transaction.atomic():
+        existing = {
+            entry.article_id: entry
+            for entry in models.PopularArticle.objects.select_for_update().filter(
+                journal=journal,
+                window=window,
+            )
+        }
+        to_update, to_create = [], []
+        for rank, article_id in enumerate(ranked_ids, start=1):
+            entry = existing.pop(article_id, None)
+            if entry is None:
+                to_create.append(
+                    models.PopularArticle(
+                        journal=journal,
+                        window=window,
+                        article_id=article_id,
+                        rank=rank,
+                        access_count=counts[article_id],
+                        refreshed=refreshed,
+                    )
+                )
+            elif entry.rank != rank or entry.access_count != counts[article_id]:
+                entry.rank = rank
+                entry.access_count = counts[article_id]
+                entry.refreshed = refreshed
+                to_update.append(entry)
+
+        models.PopularArticle.objects.filter(
+            pk__in=[entry.pk for entry in existing.values()],
+        ).delete()
+        models.PopularArticle.objects.bulk_update(
+            to_update,
+            ["rank", "access_count", "refreshed"],
+            batch_size=1000,
+        )
+        models.PopularArticle.objects.bulk_create(to_create, batch_size=1000)
+
+    return len(existing) + len(to_update) + len(to_create)
+
+
+def refresh_rankings(journals=None):
+    """Refreshes the ranking of each journal for its configured window
+    :param journals: A Journal queryset, defaulting to the journals that
+        display the popular articles element
+    :return: The number of ranking entries changed
+    """
+    if journals is None:
+        journals = get_journals_displaying_popular_articles()
+
+    changed = 0
+    for journal in journals:
+        _most_popular, number, time = get_popular_article_settings(journal)
+        changed += refresh_ranking(
+            journal,
+            time,
+            size=max(int(number or 0), MIN_RANKING_SIZE),
+        )
+    return changed
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.homepage_elements.popular import logic
+from journal import models as journal_models
+
+
+class Command(BaseCommand):
+    """
+    Refreshes the precomputed rankings read by the Popular Articles homepage
+    element.
+    """
+
+    help = "Refreshes the most popular article rankings of journals."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--journal_code",
+            type=str,
+            help="Only refresh the ranking of this journal.",
+        )
+
+    def handle(self, *args, **options):
+        journals = None
+        if options["journal_code"]:
+            journals = journal_models.Journal.objects.filter(
+                code=options["journal_code"],
+            )
+        changed = logic.refresh_rankings(journals)
+        self.stdout.write(
+            self.style.SUCCESS("Updated {0} ranking entries.".format(changed))
+        )
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.29 on 2026-10-18 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("journal", "0068_issue_cached_display_title_a11y_and_more"),
+        ("submission", "0089_merge_20260226_1524"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PopularArticle",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "window",
+                    models.CharField(
+                        choices=[
+                            ("weekly", "Weekly"),
+                            ("monthly", "Monthly"),
+                            ("yearly", "Yearly"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("rank", models.PositiveIntegerField()),
+                ("access_count", models.PositiveIntegerField(default=0)),
+                (
+                    "refreshed",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "article",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="submission.article",
+                    ),
+                ),
+                (
+                    "journal",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="journal.journal",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("journal", "window", "rank"),
+                "unique_together": {("journal", "window", "article")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="populararticle",
+            index=models.Index(
+                fields=["journal", "window", "rank"], name="popular_ranking_idx"
+            ),
+        ),
+    ]
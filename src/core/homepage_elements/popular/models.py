@@ -0,0 +1,49 @@
+from django.db import models
+from django.utils import timezone
+
+
+def window_choices():
+    return (
+        ("weekly", "Weekly"),
+        ("monthly", "Monthly"),
+        ("yearly", "Yearly"),
+    )
+
+
+class PopularArticle(models.Model):
+    """An entry in the precomputed ranking of a journal's most read articles
+
+    Rankings are kept per journal and time window by the
+    refresh_popular_articles command.
+    """
+
+    journal = models.ForeignKey(
+        "journal.Journal",
+        on_delete=models.CASCADE,
+    )
+    window = models.CharField(max_length=10, choices=window_choices())
+    article = models.ForeignKey(
+        "submission.Article",
+        on_delete=models.CASCADE,
+    )
+    rank = models.PositiveIntegerField()
+    access_count = models.PositiveIntegerField(default=0)
+    refreshed = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ("journal", "window", "rank")
+        unique_together = ("journal", "window", "article")
+        indexes = [
+            models.Index(
+                fields=["journal", "window", "rank"],
+                name="popular_ranking_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return "{0} #{1} ({2}): {3}".format(
+            self.journal,
+            self.rank,
+            self.window,
+            self.article_id,
+        )
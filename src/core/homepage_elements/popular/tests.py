@@ -0,0 +1,94 @@
+__copyright__ = "Copyright 2025 Open Library of Humanities"
+__author__ = "Open Library of Humanities"
+__license__ = "AGPL v3"
+__maintainer__ = "Open Library of Humanities"
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.homepage_elements.popular import logic, models
+from metrics import logic as metrics_logic
+from metrics.models import ArticleAccess
+from submission import models as sm_models
+from utils.testing.helpers import create_article, create_journals
+
+
+class TestPopularArticleRanking(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.journal_one, cls.journal_two = create_journals()
+        cls.article_one = create_article(cls.journal_one, title="Article One")
+        cls.article_two = create_article(cls.journal_one, title="Article Two")
+        cls.unpublished = create_article(cls.journal_one, title="Unpublished")
+        for article in (cls.article_one, cls.article_two):
+            article.stage = sm_models.STAGE_PUBLISHED
+            article.save()
+
+        now = timezone.now()
+        cls.create_accesses(cls.article_one, 2, now - timedelta(days=2))
+        cls.create_accesses(cls.article_two, 3, now - timedelta(days=2))
+        cls.create_accesses(cls.article_one, 4, now - timedelta(days=20))
+        cls.create_accesses(cls.unpublished, 10, now - timedelta(days=1))
+
+    @staticmethod
+    def create_accesses(article, number, accessed):
+        for _ in range(number):
+            ArticleAccess.objects.create(
+                article=article,
+                type="view",
+                identifier="test",
+                accessed=accessed,
+            )
+
+    def test_refresh_ranking_matches_live_counts(self):
+        metrics_logic.rollup_article_accesses()
+        # Accesses above the rollup watermark are counted too
+        self.create_accesses(self.article_one, 2, timezone.now())
+
+        for time in ("weekly", "monthly"):
+            logic.refresh_ranking(self.journal_one, time, size=10)
+            live = [
+                (article.pk, article.access_count)
+                for article in logic.count_most_popular_articles(
+                    self.journal_one, 10, time
+                )
+            ]
+            ranked = [
+                (article.pk, article.access_count)
+                for article in logic.get_most_popular_articles(
+                    self.journal_one, 10, time
+                )
+            ]
+            self.assertEqual(ranked, live)
+
+    def test_refresh_ranking_only_writes_changes(self):
+        logic.refresh_ranking(self.journal_one, "weekly", size=10)
+        self.assertEqual(
+            logic.refresh_ranking(self.journal_one, "weekly", size=10),
+            0,
+        )
+
+        self.create_accesses(self.article_one, 5, timezone.now())
+        self.assertEqual(
+            logic.refresh_ranking(self.journal_one, "weekly", size=1),
+            2,
+        )
+        self.assertEqual(
+            list(
+                models.PopularArticle.objects.filter(
+                    journal=self.journal_one,
+                    window="weekly",
+                ).values_list("article", "rank", "access_count")
+            ),
+            [(self.article_one.pk, 1, 7)],
+        )
+
+    def test_get_most_popular_articles_without_ranking(self):
+        articles = logic.get_most_popular_articles(self.journal_one, 2, "weekly")
+        self.assertEqual(
+            [article.pk for article in articles],
+            [self.article_two.pk, self.article_one.pk],
+        )
+        self.assertFalse(models.PopularArticle.objects.exists())
@@ -405,11 +405,21 @@ urlpatterns = [
         journal_views.sitemap,
         name="journal_sitemap",
     ),
+    re_path(
+        r"^issue/(?P<issue_id>\d+)_sitemap_(?P<page>\d+).xml$",
+        journal_views.sitemap,
+        name="journal_sitemap_page",
+    ),
     re_path(
         r"^subject/(?P<subject_id>\d+)_sitemap.xml$",
         repository_views.sitemap,
         name="repository_sitemap",
     ),
+    re_path(
+        r"^subject/(?P<subject_id>\d+)_sitemap_(?P<page>\d+).xml$",
+        repository_views.sitemap,
+        name="repository_sitemap_page",
+    ),
     re_path(
         r"^download/file/(?P<file_id>\d+)/$",
         journal_views.download_journal_file,
@@ -108,6 +108,7 @@ INSTALLED_APPS += plugin_installed_apps.load_plugin_apps(BASE_DIR)
 INSTALLED_APPS += plugin_installed_apps.load_homepage_element_apps(BASE_DIR)
 
 MIDDLEWARE = (
+    "utils.middleware.RequestInstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -159,9 +160,14 @@ TEMPLATES = [
                 "django.template.context_processors.i18n",
             ],
             "loaders": [
-                "utils.template_override_middleware.Loader",
-                "django.template.loaders.filesystem.Loader",
-                "django.template.loaders.app_directories.Loader",
+                (
+                    "utils.template_override_middleware.CachedLoader",
+                    [
+                        "utils.template_override_middleware.Loader",
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
             ],
             "builtins": [
                 "core.templatetags.fqdn",
@@ -464,6 +470,25 @@ MAILGUN_SERVER_NAME = ""
 MAILGUN_REQUIRE_TLS = False
 ENABLE_ENHANCED_MAILGUN_FEATURES = False  # Enables email tracking
 
+# CronTasks, such as scheduled emails, are run by CronMiddleware during
+# requests. Disable it when running the run_cron_worker command instead.
+ENABLE_CRON_MIDDLEWARE = True
+# Seconds before a CronTask that raised an exception is run again. The delay
+# doubles after each failed attempt, and tasks that have failed
+# CRON_TASK_MAX_ATTEMPTS times are no longer run.
+CRON_TASK_RETRY_DELAY = 10 * 60
+CRON_TASK_MAX_ATTEMPTS = 5
+
+# When enabled, emails are stored in an outbox during the request and sent
+# by the send_queued_emails command, installed by install_cron. Failed sends
+# are retried after EMAIL_OUTBOX_RETRY_DELAY seconds, doubling each time.
+# Emails claimed by a worker that stopped before sending them are retried after
+# EMAIL_OUTBOX_CLAIM_TIMEOUT seconds.
+ENABLE_EMAIL_OUTBOX = False
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 10 * 60
+
 
 DATE_FORMT = "Y-m-d"
 DATETIME_FORMAT = "Y-m-d H:i"
@@ -471,6 +496,9 @@ DATETIME_FORMAT = "Y-m-d H:i"
 AUTH_USER_MODEL = "core.Account"
 
 PLUGIN_HOOKS = {}
+# Renders of a plugin hook slower than this many seconds are logged, along
+# with the counters of the hook (see core.plugin_hooks). None disables it.
+SLOW_HOOK_THRESHOLD = 0.5
 
 NOTIFY_FUNCS = []
 
@@ -484,6 +512,11 @@ ORCID_CLIENT_ID = ""
 SESSION_ENGINE = "utils.sessions.janeway_db"
 SESSION_COOKIE_NAME = "JANEWAYSESSID"
 
+# Signed cookie identifying readers in COUNTER metrics, see
+# core.middleware.CounterCookieMiddleware
+COUNTER_TRACKING_COOKIE_NAME = "janeway_counter"
+COUNTER_TRACKING_COOKIE_AGE = 60 * 60 * 24 * 14
+
 S3_ACCESS_KEY = ""
 S3_SECRET_KEY = ""
 S3_BUCKET_NAME = ""
@@ -517,6 +550,41 @@ SILENT_IMPORT_CACHE = False
 # Default timeout for outgoing HTTP connections
 HTTP_TIMEOUT_SECONDS = 5
 
+# Resolved settings returned by utils.setting_handler.get_setting are cached
+# in-process and in the default cache backend, and invalidated via a version
+# counter per journal whenever a SettingValue changes. Disabled under the
+# test runner, since rolled back test transactions do not invalidate it.
+# Invalidation only reaches the processes sharing the default cache backend.
+# With the default per-process LocMemCache, other workers serve an edited
+# setting until SETTINGS_CACHE_TIMEOUT expires, so only raise the timeout
+# when CACHES points at a shared backend such as Memcached or Redis.
+ENABLE_SETTINGS_CACHE = not IN_TEST_RUNNER
+SETTINGS_CACHE_TIMEOUT = 60
+
+# Resolve the site serving each request from an in-memory table of domains
+# and path codes, recompiled when a Journal, Repository, Press or DomainAlias
+# changes. Disabled under the test runner for the same reason as above.
+# As with settings, changes made by other processes are only noticed through
+# a shared cache backend, so the table is also recompiled after
+# SITE_RESOLUTION_TABLE_TIMEOUT seconds.
+ENABLE_SITE_RESOLUTION_TABLE = not IN_TEST_RUNNER
+SITE_RESOLUTION_TABLE_TIMEOUT = 30
+
+# When enabled, article accesses are appended to spool files instead of being
+# written to the database during the request. The flush_article_accesses
+# command deduplicates and bulk inserts them, and is installed by install_cron.
+BUFFER_ARTICLE_ACCESSES = False
+ARTICLE_ACCESS_SPOOL_DIR = os.path.join(BASE_DIR, "files", "access_spool")
+
+# When enabled, the SQL queries, template render time and plugin hook time
+# of every request are logged as a `request_metrics` line. Requests taking
+# longer than SLOW_REQUEST_THRESHOLD seconds also log their slowest queries to
+# the janeway.slow_requests logger. With REQUEST_INSTRUMENTATION_SERVER_TIMING
+# the metrics are also returned to staff users in a Server-Timing header.
+ENABLE_REQUEST_INSTRUMENTATION = False
+REQUEST_INSTRUMENTATION_SERVER_TIMING = False
+SLOW_REQUEST_THRESHOLD = 2.0
+
 # New XML galleys will be associated with this stylesheet by default when they
 # are first uploaded
 DEFAULT_XSL_FILE_LABEL = "Janeway default (1.6.0)"
@@ -527,6 +595,14 @@ DEFAULT_XSL_FILE_LABEL = "Janeway default (1.6.0)"
 FORCE_BUILTIN_XSL = False
 BUILTIN_XSL_PATH = os.path.join(BASE_DIR, "transform/xsl/default.xsl")
 
+# Rendered XML galleys are stored in this cache backend, keyed on the state of
+# the XML and XSL files on disk. Disabled by default, since the default cache
+# is held in the memory of each process. To enable it, add a backend to CACHES
+# (e.g. a FileBasedCache, which also keeps renders across restarts) and set
+# this to its alias.
+XML_RENDER_CACHE = None
+XML_RENDER_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
 # Skip migrations by default on sqlite for faster execution
 if IN_TEST_RUNNER and "--keepdb" not in COMMAND:
     from collections.abc import Mapping
@@ -16,7 +16,7 @@ from django.conf import settings
 from django.contrib.auth import logout
 from django.contrib import messages
 from django.template.loader import get_template
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from django.http import JsonResponse
 from django.forms.models import model_to_dict
 from django.shortcuts import reverse
@@ -28,6 +28,8 @@ from django.core.exceptions import ValidationError
 from core import forms, models, files, plugin_installed_apps
 from utils.function_cache import cache
 from review import models as review_models
+from production import models as production_models
+from proofing import models as proofing_models
 from utils import render_template, notify_helpers, setting_handler
 from submission import models as submission_models
 from comms import models as comms_models
@@ -264,21 +266,18 @@ def settings_for_context(request):
         return {}
 
 
-@cache(600)
+@cache(600, depends_on=["core.SettingValue"])
 def cached_settings_for_context(journal, language):
     setting_groups = ["general", "metadata", "crosscheck", "article", "news", "styling"]
-    _dict = {group: {} for group in setting_groups}
-
-    for group in setting_groups:
-        settings = models.Setting.objects.filter(group__name=group)
-
-        for setting in settings:
-            _dict[group][setting.name] = setting_handler.get_setting(
-                group,
-                setting.name,
-                journal,
-            ).processed_value
-    return _dict
+    resolved = setting_handler.get_settings_for_groups(setting_groups, journal)
+
+    return {
+        group: {
+            name: setting_value.processed_value
+            for name, setting_value in group_settings.items()
+        }
+        for group, group_settings in resolved.items()
+    }
 
 
 def process_setting_list(settings_to_get, type, journal):
@@ -1318,3 +1317,56 @@ def resolve_alt_text_target(request):
         obj = content_type.get_object_for_this_type(pk=object_id)
 
     return content_type, object_id, file_path, obj
+
+
+def get_kanban_articles(journal):
+    """Groups the articles of a journal in the workflow by kanban column
+
+    All columns are loaded in a single query, with each article annotated with
+    whether it has a production and a proofing assignment.
+    :param journal: A Journal object
+    :return: A dict of lists of articles, keyed by column
+    """
+    columns = {
+        "unassigned_articles": {submission_models.STAGE_UNASSIGNED},
+        "in_review": {
+            submission_models.STAGE_ASSIGNED,
+            submission_models.STAGE_UNDER_REVIEW,
+            submission_models.STAGE_UNDER_REVISION,
+        },
+        "copyediting": {submission_models.STAGE_ACCEPTED}
+        | set(submission_models.COPYEDITING_STAGES),
+        "production": {submission_models.STAGE_TYPESETTING},
+        "proofing": {submission_models.STAGE_PROOFING},
+        "typesetting": {submission_models.STAGE_TYPESETTING_PLUGIN},
+        "prepubs": {submission_models.STAGE_READY_FOR_PUBLICATION},
+    }
+    column_by_stage = {
+        stage: column for column, stages in columns.items() for stage in stages
+    }
+
+    articles = (
+        submission_models.Article.objects.filter(
+            journal=journal,
+            stage__in=column_by_stage,
+        )
+        .select_related("correspondence_author")
+        .annotate(
+            has_production_assignment=Exists(
+                production_models.ProductionAssignment.objects.filter(
+                    article=OuterRef("pk"),
+                )
+            ),
+            has_proofing_assignment=Exists(
+                proofing_models.ProofingAssignment.objects.filter(
+                    article=OuterRef("pk"),
+                )
+            ),
+        )
+        .order_by("-date_submitted")
+    )
+
+    grouped = {column: [] for column in columns}
+    for article in articles:
+        grouped[column_by_stage[article.stage]].append(article)
+    return grouped
@@ -20,13 +20,15 @@ from press import models as press_models
 from utils import setting_handler
 from utils.logger import get_logger
 from utils.middleware import BaseMiddleware
-from core import models as core_models
+from core import models as core_models, site_resolution
 from journal import models as journal_models
 from repository import models as repository_models
 from cms import logic as cms_logic
 
 logger = get_logger(__name__)
 
+COUNTER_TRACKING_SALT = "core.middleware.CounterCookieMiddleware"
+
 
 def get_site_resources(request):
     """Attempts to match the relevant resources for the request url
@@ -35,8 +37,40 @@ def get_site_resources(request):
     :param request: A Django HttpRequest
     :return: press.models.Press,journal.models.Journal,HttpResponseRedirect
     """
+    redirect_obj = None
+    if settings.ENABLE_SITE_RESOLUTION_TABLE:
+        journal, repository, press, alias, site_path = (
+            site_resolution.get_table().resolve(request)
+        )
+    else:
+        journal, repository, press, alias, site_path = query_site_resources(request)
+
+    # Match a Domain Alias
+    if alias and alias.redirect:
+        logger.debug("Matched a redirect: %s" % alias.redirect_url)
+        redirect_obj = redirect(alias.build_redirect_url(path=request.path))
+    elif alias:
+        journal = alias.journal
+        press = journal.press if journal else alias.press
+
+    #  Couldn't match any resources
+    if not press and not redirect_obj:
+        logger.warning(
+            "Couldn't match a resource for %s, redirecting to default: %s"
+            "" % (request.path, settings.DEFAULT_HOST)
+        )
+        redirect_obj = redirect(settings.DEFAULT_HOST)
+
+    return journal, repository, press, redirect_obj, site_path
+
+
+def query_site_resources(request):
+    """Matches the site objects for the request url against the database
+    :param request: A Django HttpRequest
+    :return: A tuple of (journal, repository, press, alias, site_path)
+    """
     # Match a journal
-    journal = repository = press = redirect_obj = site_path = None
+    journal = repository = press = alias = site_path = None
     journal, site_path = journal_models.Journal.get_by_request(request)
     if journal:
         press = journal.press
@@ -52,22 +86,8 @@ def get_site_resources(request):
     # Match a Domain Alias
     if not press:
         alias, site_path = core_models.DomainAlias.get_by_request(request)
-        if alias and alias.redirect:
-            logger.debug("Matched a redirect: %s" % alias.redirect_url)
-            redirect_obj = redirect(alias.build_redirect_url(path=request.path))
-        elif alias:
-            journal = alias.journal
-            press = journal.press if journal else alias.press
 
-    #  Couldn't match any resources
-    if not press and not redirect_obj:
-        logger.warning(
-            "Couldn't match a resource for %s, redirecting to default: %s"
-            "" % (request.path, settings.DEFAULT_HOST)
-        )
-        redirect_obj = redirect(settings.DEFAULT_HOST)
-
-    return journal, repository, press, redirect_obj, site_path
+    return journal, repository, press, alias, site_path
 
 
 class SiteSettingsMiddleware(BaseMiddleware):
@@ -171,18 +191,48 @@ class MaintenanceModeMiddleware(BaseMiddleware):
 
 
 class CounterCookieMiddleware(BaseMiddleware):
+    """Identifies readers for COUNTER reporting with a signed cookie
+
+    The identifier is kept out of the session, so anonymous readers do not
+    cause a session to be written. Identifiers previously stored in the
+    session of a reader are carried over to the cookie.
+    """
+
+    @staticmethod
+    def process_request(request):
+        tracking_id = request.get_signed_cookie(
+            settings.COUNTER_TRACKING_COOKIE_NAME,
+            default=None,
+            salt=COUNTER_TRACKING_SALT,
+        )
+        request.counter_tracking_is_new = tracking_id is None
+        if tracking_id is None:
+            session = getattr(request, "session", None)
+            if session is not None:
+                tracking_id = session.get("counter_tracking")
+        request.counter_tracking_id = tracking_id or str(uuid4())
+
     @staticmethod
     def process_response(request, response):
         try:
-            if not request.session.get("counter_tracking", None):
-                request.session["counter_tracking"] = str(uuid4())
-            elif (
-                request.session.get("counter_tracking", None)
-                and request.resolver_match.url_name == "article_view"
-            ):
-                request.session.modified = True
+            url_name = request.resolver_match.url_name
         except AttributeError:
-            pass
+            url_name = None
+
+        tracking_id = getattr(request, "counter_tracking_id", None)
+        if tracking_id and (
+            request.counter_tracking_is_new or url_name == "article_view"
+        ):
+            # Article views extend the lifetime of the identifier
+            response.set_signed_cookie(
+                settings.COUNTER_TRACKING_COOKIE_NAME,
+                tracking_id,
+                salt=COUNTER_TRACKING_SALT,
+                max_age=settings.COUNTER_TRACKING_COOKIE_AGE,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
 
         return response
 
@@ -21,12 +21,14 @@ from django.core.paginator import EmptyPage, Paginator
 from django.contrib.postgres.lookups import SearchLookup as PGSearchLookup
 from django.contrib.postgres.search import (
     SearchVector as DjangoSearchVector,
+    SearchVectorCombinable,
     SearchVectorField,
 )
 from django.core import validators
 from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.db import (
     connection,
+    connections,
     IntegrityError,
     models,
     OperationalError,
@@ -34,7 +36,8 @@ from django.db import (
     transaction,
 )
 from django.db.backends.utils import truncate_name
-from django.db.models import fields, Q, Manager
+from django.db.models import fields, Func, Q, Manager, Value
+from django.db.models.query import RawQuerySet
 from django.db.models.fields.related import ForeignObjectRel, ManyToManyField
 from django.db.models.functions import Coalesce, Greatest
 from django.core.validators import (
@@ -292,8 +295,20 @@ def create_m2m_ordered_through_manager(related_manager, rel):
 
         def get_queryset(self, *args, **kwargs):
             """Here is where we can finally apply our ordering logic"""
-            qs = super().get_queryset(*args, **kwargs)
-            return self._apply_ordering(qs)
+            try:
+                # Prefetched objects are ordered by get_prefetch_queryset
+                return self.instance._prefetched_objects_cache[self.prefetch_cache_name]
+            except (AttributeError, KeyError):
+                qs = super().get_queryset(*args, **kwargs)
+                return self._apply_ordering(qs)
+
+        def get_prefetch_queryset(self, instances, queryset=None):
+            if queryset is None:
+                queryset = self.model._default_manager.get_queryset()
+            return super().get_prefetch_queryset(
+                instances,
+                self._apply_ordering(queryset),
+            )
 
         def add(self, *objs):
             with allow_m2m_operation(rel.through):
@@ -522,8 +537,65 @@ SearchVectorField.register_lookup(SearchLookup)
 models.CharField.register_lookup(SearchLookup)
 
 
+class SearchResultsQuerySet(RawQuerySet):
+    """A RawQuerySet of search results that is counted and sliced in SQL
+
+    Relevance sorted search results can't be expressed as a QuerySet, but
+    paginating them should not load every result. count() runs a COUNT(*) over
+    the search query and slicing adds LIMIT and OFFSET clauses to it, which is
+    all a Paginator needs.
+    """
+
+    def count(self):
+        if self._result_cache is not None:
+            return len(self._result_cache)
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM ({}) AS search_results".format(self.raw_query),
+                self.params,
+            )
+            return cursor.fetchone()[0]
+
+    def __getitem__(self, k):
+        if self._result_cache is not None:
+            return self._result_cache[k]
+        if isinstance(k, int):
+            if k < 0:
+                raise ValueError("Negative indexing is not supported.")
+            try:
+                return self[k : k + 1][0]
+            except IndexError:
+                raise IndexError("list index out of range")
+        if not isinstance(k, slice) or k.step is not None:
+            return super().__getitem__(k)
+
+        start, stop = k.start or 0, k.stop
+        if start < 0 or (stop is not None and stop < 0):
+            raise ValueError("Negative indexing is not supported.")
+        if stop is not None and stop <= start:
+            return []
+        sql = "SELECT * FROM ({}) AS search_results".format(self.raw_query)
+        params = list(self.params)
+        if stop is not None:
+            sql += " LIMIT %s"
+            params.append(stop - start)
+        sql += " OFFSET %s"
+        params.append(start)
+        results = SearchResultsQuerySet(
+            sql,
+            model=self.model,
+            params=params,
+            translations=self.translations,
+            using=self._db,
+        )
+        results._prefetch_related_lookups = self._prefetch_related_lookups
+        return list(results)
+
+
 class BaseSearchManagerMixin(Manager):
     search_lookups = set()
+    # The stored AbstractSearchDocument vector, relative to the model searched
+    search_document_field = None
 
     def search(self, search_term, search_filters, sort=None, site=None, queryset=None):
         if connection.vendor == "postgresql":
@@ -575,6 +647,139 @@ class BaseSearchManagerMixin(Manager):
     def get_search_lookups(self):
         return self.search_lookups
 
+    def get_search_document_vector(self, search_filters):
+        """Selects the lexemes of the stored search document to search
+
+        Titles are weighted A, keywords and author names B and abstracts C.
+        Keywords and authors share a weight, so filters selecting only one of
+        them can't be served by the document.
+        :return: A FilteredSearchVector or None
+        """
+        if not self.search_document_field:
+            return None
+        if bool(search_filters.get("keywords")) != bool(search_filters.get("authors")):
+            return None
+        weights = ""
+        if search_filters.get("title"):
+            weights += "A"
+        if search_filters.get("keywords"):
+            weights += "B"
+        if search_filters.get("abstract"):
+            weights += "C"
+        if not weights:
+            return None
+        return FilteredSearchVector(self.search_document_field, weights)
+
+    def get_search_results(self, queryset, order_by_sql):
+        """Wraps a search queryset so its results can be sorted by any column
+
+        The primary key breaks ties in the sort, so that pages of results
+        fetched with LIMIT and OFFSET do not overlap.
+        :param queryset: A QuerySet, annotated with the relevance of each row
+        :param order_by_sql: The ORDER BY clause applied to the results
+        :return: A SearchResultsQuerySet
+        """
+        inner_sql, params = queryset.query.sql_with_params()
+        return SearchResultsQuerySet(
+            "SELECT * FROM ({}) AS search {}, {} ASC".format(
+                inner_sql,
+                order_by_sql,
+                connections[queryset.db].ops.quote_name(self.model._meta.pk.column),
+            ),
+            model=self.model,
+            params=params,
+            using=queryset.db,
+        )
+
+
+class FilteredSearchVector(SearchVectorCombinable, Func):
+    """Keeps only the lexemes of a tsvector with the given weights
+
+    e.g. FilteredSearchVector("search_document__document", "AC")
+    """
+
+    function = "ts_filter"
+    template = '%(function)s(%(expressions)s::"char"[])'
+    output_field = SearchVectorField()
+    config = None
+
+    def __init__(self, expression, weights, **extra):
+        super().__init__(
+            expression,
+            Value("{%s}" % ",".join(weights)),
+            **extra,
+        )
+
+
+class AbstractSearchDocument(models.Model):
+    """A weighted tsvector of the searchable metadata of a record
+
+    Documents are rebuilt after every transaction that changes the metadata,
+    so that searches can match and rank records against a single GIN indexed
+    column rather than building vectors across several joins at query time.
+    Subclasses declare the field linking to the record and how its document
+    is built.
+    """
+
+    document = SearchVectorField(blank=True, null=True, editable=False)
+    date_populated = models.DateTimeField(default=timezone.now)
+
+    source_field = None
+
+    class Meta:
+        abstract = True
+        required_db_vendor = "postgresql"
+
+    @classmethod
+    def get_source_queryset(cls):
+        return cls._meta.get_field(cls.source_field).related_model.objects.all()
+
+    @classmethod
+    def get_document_vector(cls):
+        """Returns the expression building the document of a source record"""
+        raise NotImplementedError
+
+    @classmethod
+    def update_documents(cls, pks=None, batch_size=500):
+        """Rebuilds the documents of the given records
+        :param pks: The primary keys of the records, or None for all records
+        :param batch_size: The number of documents rebuilt per transaction
+        :return: The number of documents written
+        """
+        if connection.vendor != "postgresql":
+            return 0
+        queryset = cls.get_source_queryset()
+        if pks is not None:
+            queryset = queryset.filter(pk__in=pks)
+        pks = list(queryset.order_by("pk").values_list("pk", flat=True))
+
+        written = 0
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start : start + batch_size]
+            documents = (
+                cls.get_source_queryset()
+                .filter(pk__in=batch)
+                .annotate(search_document=cls.get_document_vector())
+                .values_list("pk", "search_document")
+            )
+            with transaction.atomic():
+                cls.objects.filter(
+                    **{"{}__in".format(cls.source_field): batch}
+                ).delete()
+                created = cls.objects.bulk_create(
+                    cls(**{"{}_id".format(cls.source_field): pk, "document": document})
+                    for pk, document in documents
+                )
+            written += len(created)
+        return written
+
+    @classmethod
+    def schedule_update(cls, pk):
+        """Rebuilds the document of a record once the transaction commits"""
+        if pk is None or connection.vendor != "postgresql":
+            return
+        transaction.on_commit(lambda: cls.update_documents([pk]))
+
 
 class SearchVector(DjangoSearchVector):
     """An Extension of SearchVector that works with SearchVectorField
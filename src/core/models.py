@@ -2284,6 +2284,22 @@ def setup_user_signature(sender, instance, created, **kwargs):
         instance.save()
 
 
+@receiver(post_save, sender=SettingValue)
+@receiver(models.signals.post_delete, sender=SettingValue)
+def invalidate_setting_value_cache(sender, instance, **kwargs):
+    from utils import setting_handler
+
+    setting_handler.invalidate_settings_cache(instance.journal_id)
+
+
+@receiver(post_save, sender=Setting)
+@receiver(models.signals.post_delete, sender=Setting)
+def invalidate_setting_cache(sender, instance, **kwargs):
+    from utils import setting_handler
+
+    setting_handler.invalidate_settings_cache()
+
+
 # This model is vestigial and will be removed in v1.5
 
 
@@ -2883,6 +2899,9 @@ class Organization(models.Model):
         """
         Return the first location.
         """
+        if "locations" in getattr(self, "_prefetched_objects_cache", {}):
+            locations = sorted(self.locations.all(), key=lambda location: location.pk)
+            return locations[0] if locations else None
         return self.locations.first() if self.locations else None
 
     @property
@@ -3163,6 +3182,15 @@ class ControlledAffiliation(models.Model):
         :param affiliated_object: Account, FrozenAuthor, PreprintAuthor
         :param as_object: whether to return a Python object
         """
+        prefetched = getattr(affiliated_object, "_prefetched_objects_cache", {})
+        if "controlledaffiliation_set" in prefetched:
+            # Ordered with the primary affiliation, then the highest pk, first
+            affiliations = affiliated_object.controlledaffiliation_set.all()
+            affil = affiliations[0] if affiliations else None
+            if affil is None:
+                return None if as_object else ""
+            return affil if as_object else str(affil)
+
         if not affiliated_object.affiliations.exists():
             return None if as_object else ""
         try:
@@ -0,0 +1,167 @@
+"""
+Rendering, fragment caching and timing of plugin template hooks.
+
+A hook registered in PLUGIN_HOOKS can declare how its output is cached:
+
+    'article_footer_block': {
+        'module': 'plugins.example.hooks',
+        'function': 'example_hook',
+        'cache_timeout': 600,
+        'cache_scope': ['journal', 'language', 'anonymous'],
+    }
+
+Output is only cached when `cache_timeout` is set. Entries are always keyed on
+the arguments passed to the hook tag, and on each scope listed:
+
+- journal: the journal, repository or press serving the request
+- language: the active language
+- path: the path of the request, for hooks rendering the object of a page
+- user: the user viewing the page, anonymous users sharing a single entry
+- anonymous: only cache the output for anonymous users
+
+Every hook registration keeps process-wide counters of its calls, errors,
+cache hits and misses and render time. Renders slower than
+SLOW_HOOK_THRESHOLD seconds are logged along with those counters.
+"""
+
+__copyright__ = "Copyright 2025 Open Library of Humanities"
+__author__ = "Open Library of Humanities"
+__license__ = "AGPL v3"
+__maintainer__ = "Open Library of Humanities"
+
+import threading
+import time
+from collections import defaultdict
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import translation
+
+from utils import function_cache, instrumentation
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_SCOPES = {"journal", "language", "path", "user", "anonymous"}
+
+_stats = defaultdict(
+    lambda: {
+        "calls": 0,
+        "errors": 0,
+        "hits": 0,
+        "misses": 0,
+        "time": 0.0,
+        "max_time": 0.0,
+    }
+)
+_stats_lock = threading.Lock()
+
+
+def get_hook_id(hook_name, hook):
+    return "{}:{}.{}".format(hook_name, hook.get("module"), hook.get("function"))
+
+
+def get_cache_key(hook_id, hook, context, args, kwargs):
+    """Returns the cache key of the output of a hook, or None if not cached"""
+    scope = set(hook.get("cache_scope", ()))
+    unknown_scopes = scope - CACHE_SCOPES
+    if unknown_scopes:
+        raise ValueError(
+            "Unknown cache scope {} for hook {}".format(unknown_scopes, hook_id)
+        )
+
+    request = context.get("request")
+    user = getattr(request, "user", None)
+    is_authenticated = bool(user and user.is_authenticated)
+    if "anonymous" in scope and is_authenticated:
+        return None
+
+    key_kwargs = dict(kwargs)
+    if "journal" in scope:
+        site = getattr(request, "site_type", None)
+        key_kwargs["hook_site"] = "{}:{}".format(
+            site._meta.label_lower if site else None,
+            site.pk if site else None,
+        )
+    if "language" in scope:
+        key_kwargs["hook_language"] = translation.get_language()
+    if "path" in scope:
+        key_kwargs["hook_path"] = getattr(request, "path", None)
+    if "user" in scope:
+        key_kwargs["hook_user"] = user.pk if is_authenticated else None
+    return function_cache.get_cache_key("hook:" + hook_id, args, key_kwargs)
+
+
+def call_hook(hook, context, args, kwargs):
+    hook_module = import_module(hook.get("module"))
+    function = getattr(hook_module, hook.get("function"))
+    return function(context, *args, **kwargs)
+
+
+def render_hook(hook_name, hook, context, args=(), kwargs=None):
+    """Returns the output of a hook registration, from the cache if declared
+    :param hook_name: The name of the hook being rendered
+    :param hook: The registration of the hook in settings.PLUGIN_HOOKS
+    :param context: The template context the hook is rendered in
+    :return: The HTML returned by the hook function
+    """
+    kwargs = kwargs or {}
+    hook_id = get_hook_id(hook_name, hook)
+    start = time.perf_counter()
+    counter = None
+    try:
+        key = None
+        if hook.get("cache_timeout"):
+            key = get_cache_key(hook_id, hook, context, args, kwargs)
+        if key is None:
+            return call_hook(hook, context, args, kwargs)
+
+        output = cache.get(key)
+        if output is not None:
+            counter = "hits"
+            return output
+        counter = "misses"
+        output = call_hook(hook, context, args, kwargs) or ""
+        cache.set(key, output, hook["cache_timeout"])
+        return output
+    except Exception:
+        counter = "errors"
+        raise
+    finally:
+        record(hook_id, time.perf_counter() - start, counter)
+
+
+def record(hook_id, elapsed, counter=None):
+    with _stats_lock:
+        stats = _stats[hook_id]
+        stats["calls"] += 1
+        stats["time"] += elapsed
+        stats["max_time"] = max(stats["max_time"], elapsed)
+        if counter:
+            stats[counter] += 1
+        stats = dict(stats)
+
+    instrumentation.record_hook(hook_id, elapsed)
+    threshold = settings.SLOW_HOOK_THRESHOLD
+    if threshold is not None and elapsed >= threshold:
+        logger.warning(
+            "Slow hook {} took {:.3f}s (calls={calls}, errors={errors}, "
+            "hits={hits}, misses={misses}, total={time:.3f}s, "
+            "max={max_time:.3f}s)".format(hook_id, elapsed, **stats),
+            extra={"hook_id": hook_id, "hook_stats": stats},
+        )
+
+
+def get_hook_stats():
+    """Returns the counters of each hook registration rendered
+    :return: A dict of {hook_id: {"calls": int, "errors": int, "hits": int,
+        "misses": int, "time": float, "max_time": float}}
+    """
+    with _stats_lock:
+        return {hook_id: dict(stats) for hook_id, stats in _stats.items()}
+
+
+def reset_hook_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,179 @@
+"""
+An in-memory routing table that resolves the site serving a request.
+
+The table maps hosts and path prefixes to the journals, repositories, presses
+and domain aliases of the install. It is compiled once per process and
+recompiled whenever any of those rows change, which is signalled through a
+version counter stored in the default cache backend.
+
+Only processes sharing that backend see the counter, and QuerySet.update()
+does not send the signals at all, so each table is also recompiled after
+SITE_RESOLUTION_TABLE_TIMEOUT seconds.
+"""
+
+__copyright__ = "Copyright 2025 Open Library of Humanities"
+__author__ = "Open Library of Humanities"
+__license__ = "AGPL v3"
+__maintainer__ = "Open Library of Humanities"
+
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http.request import split_domain_port
+
+from core import models as core_models
+from journal import models as journal_models
+from press import models as press_models
+from repository import models as repository_models
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+VERSION_CACHE_KEY = "site_resolution:version"
+
+_table = None
+_table_lock = threading.Lock()
+
+
+class SiteResolutionTable:
+    """Maps hosts and path codes to the site objects of the install"""
+
+    def __init__(self, version):
+        self.version = version
+        self.compiled = time.monotonic()
+
+        journals = list(journal_models.Journal.objects.all())
+        self.journals_by_domain = {j.domain: j for j in journals if j.domain}
+        self.journals_by_code = {j.code: j for j in journals}
+
+        repositories = list(repository_models.Repository.objects.all())
+        self.repositories_by_domain = {r.domain: r for r in repositories if r.domain}
+        self.repositories_by_short_name = {r.short_name: r for r in repositories}
+
+        presses = list(press_models.Press.objects.select_related("thumbnail_image"))
+        self.presses_by_id = {p.pk: p for p in presses}
+        self.presses_by_domain = {p.domain: p for p in presses if p.domain}
+        # Mirrors Journal.press, which returns the first press of the install
+        self.default_press = min(presses, key=lambda p: p.pk) if presses else None
+
+        aliases = list(core_models.DomainAlias.objects.all())
+        self.aliases_by_domain = {a.domain: a for a in aliases if a.domain}
+        self.journals_by_id = {j.pk: j for j in journals}
+
+    @staticmethod
+    def _match_domain(site_map, host):
+        # Lookup by domain with/without port
+        site = site_map.get(host)
+        if site is None:
+            domain, _port = split_domain_port(host)
+            site = site_map.get(domain)
+        return site
+
+    @staticmethod
+    def _copy(site):
+        # Views are free to mutate the objects attached to the request
+        return copy.copy(site) if site is not None else None
+
+    def is_current(self, version):
+        age = time.monotonic() - self.compiled
+        return self.version == version and age < settings.SITE_RESOLUTION_TABLE_TIMEOUT
+
+    def resolve(self, request):
+        """Matches the site objects relevant to the request url
+
+        Sites are matched in the same order as the database lookups performed
+        by get_by_request: journal, repository, press and then domain alias.
+        :param request: A Django HttpRequest
+        :return: A tuple of (journal, repository, press, alias, site_path)
+        """
+        journal = repository = press = alias = site_path = None
+        host = request.get_host()
+        try:
+            path_code = request.path.split("/")[1]
+        except IndexError:
+            path_code = None
+
+        journal = self._match_domain(self.journals_by_domain, host)
+        if journal is None and path_code is not None:
+            journal = self.journals_by_code.get(path_code)
+            if journal is not None:
+                site_path = path_code
+
+        if journal is not None:
+            press = self.default_press
+        else:
+            repository = self._match_domain(self.repositories_by_domain, host)
+            if repository is None and path_code is not None:
+                repository = self.repositories_by_short_name.get(path_code)
+                if repository is not None:
+                    site_path = path_code
+            if repository is not None:
+                press = self.presses_by_id.get(repository.press_id)
+            else:
+                press = self._match_domain(self.presses_by_domain, host)
+
+        if press is None:
+            alias = self._copy(self._match_domain(self.aliases_by_domain, host))
+            site_path = None
+            if alias is not None:
+                alias.journal = self._copy(self.journals_by_id.get(alias.journal_id))
+                alias.press = self._copy(self.presses_by_id.get(alias.press_id))
+
+        return (
+            self._copy(journal),
+            self._copy(repository),
+            self._copy(press),
+            alias,
+            site_path,
+        )
+
+
+def _new_version():
+    # Seeded from the clock so an evicted version key is never reused
+    return int(time.time() * 1000)
+
+
+def get_table_version():
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(VERSION_CACHE_KEY, _new_version(), timeout=None)
+        version = cache.get(VERSION_CACHE_KEY)
+    return version
+
+
+def get_table():
+    """Returns the routing table, recompiling it if it is out of date"""
+    global _table
+    version = get_table_version()
+    table = _table
+    if table is None or not table.is_current(version):
+        with _table_lock:
+            if _table is None or not _table.is_current(version):
+                logger.debug("Compiling site resolution table v%s" % version)
+                _table = SiteResolutionTable(version)
+            table = _table
+    return table
+
+
+def invalidate_table():
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, _new_version(), timeout=None)
+
+
+@receiver(post_save, sender=journal_models.Journal)
+@receiver(post_delete, sender=journal_models.Journal)
+@receiver(post_save, sender=repository_models.Repository)
+@receiver(post_delete, sender=repository_models.Repository)
+@receiver(post_save, sender=press_models.Press)
+@receiver(post_delete, sender=press_models.Press)
+@receiver(post_save, sender=core_models.DomainAlias)
+@receiver(post_delete, sender=core_models.DomainAlias)
+def invalidate_site_resolution_table(sender, **kwargs):
+    invalidate_table()
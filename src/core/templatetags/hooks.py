@@ -2,8 +2,7 @@ from django import template
 from django.conf import settings
 from django.utils.html import mark_safe
 
-from importlib import import_module
-
+from core import plugin_hooks
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -15,9 +14,13 @@ def hook(context, hook_name, default_value="", *args, **kwargs):
     html = ""
     for hook in settings.PLUGIN_HOOKS.get(hook_name, []):
         try:
-            hook_module = import_module(hook.get("module"))
-            function = getattr(hook_module, hook.get("function"))
-            hook_output = function(context, *args, **kwargs)
+            hook_output = plugin_hooks.render_hook(
+                hook_name,
+                hook,
+                context,
+                args,
+                kwargs,
+            )
             if hook_output:
                 html += hook_output
         except Exception as e:
@@ -0,0 +1,78 @@
+__copyright__ = "Copyright 2025 Open Library of Humanities"
+__author__ = "Open Library of Humanities"
+__license__ = "AGPL v3"
+__maintainer__ = "Open Library of Humanities"
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from core import dashboard
+from events import logic as event_logic
+from submission import models as submission_models
+from utils.testing import helpers
+
+
+class TestDashboardStatistics(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.press = helpers.create_press()
+        cls.journal_one, cls.journal_two = helpers.create_journals()
+        cls.editor = helpers.create_editor(cls.journal_one)
+        cls.reviewer = helpers.create_user(
+            "reviewer_dashboard@example.org",
+            ["reviewer"],
+            journal=cls.journal_one,
+        )
+        cls.article = helpers.create_submission(
+            journal_id=cls.journal_one.pk,
+            owner=cls.editor,
+            stage=submission_models.STAGE_UNDER_REVIEW,
+        )
+        helpers.create_submission(
+            journal_id=cls.journal_one.pk,
+            owner=cls.editor,
+            stage=submission_models.STAGE_UNASSIGNED,
+        )
+        helpers.create_submission(
+            journal_id=cls.journal_two.pk,
+            owner=cls.editor,
+            stage=submission_models.STAGE_UNASSIGNED,
+        )
+        helpers.create_review_assignment(
+            journal=cls.journal_one,
+            article=cls.article,
+            reviewer=cls.reviewer,
+            editor=cls.editor,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counts_match_stages_and_roles(self):
+        statistics = dashboard.get_statistics(self.journal_one, self.reviewer)
+        self.assertEqual(statistics["unassigned_articles_count"], 1)
+        self.assertEqual(statistics["assigned_articles_count"], 1)
+        self.assertEqual(statistics["editing_articles_count"], 0)
+        self.assertEqual(statistics["assigned_articles_for_user_review_count"], 1)
+        self.assertEqual(statistics["copyeditor_requests"], 0)
+        self.assertEqual(statistics["new_proofing"], 0)
+
+    def test_counts_are_cached(self):
+        dashboard.get_statistics(self.journal_one, self.reviewer)
+        with self.assertNumQueries(0):
+            dashboard.get_statistics(self.journal_one, self.reviewer)
+
+    def test_workflow_event_evicts_counts(self):
+        dashboard.get_statistics(self.journal_one, self.reviewer)
+        self.article.stage = submission_models.STAGE_UNASSIGNED
+        self.article.save()
+
+        self.assertIn(
+            dashboard.invalidate_on_event,
+            event_logic.Events._hooks[event_logic.Events.ON_ARTICLE_UNASSIGNED],
+        )
+        dashboard.invalidate_on_event(article=self.article)
+
+        statistics = dashboard.get_statistics(self.journal_one, self.reviewer)
+        self.assertEqual(statistics["unassigned_articles_count"], 2)
+        self.assertEqual(statistics["assigned_articles_count"], 0)
@@ -1,5 +1,8 @@
+import io
 import os
 import shutil
+import time
+import zipfile
 from tempfile import NamedTemporaryFile
 
 from django.urls import reverse
@@ -8,12 +11,16 @@ from django.test import TestCase, Client, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.conf import settings
 from django.utils import timezone
+import mock
 import pdfkit
+import swapper
 
 from utils.testing import helpers
 from utils.shared import clear_cache
 from submission import models as submission_models
 from core import files
+from core.models import File
+from utils.management.commands import dump_file_text_to_db
 
 
 class TestFilesHandler(TestCase):
@@ -172,3 +179,123 @@ class TestFilesHandler(TestCase):
         indexed = file_.index_full_text()
 
         self.assertTrue(indexed)
+
+    def save_article_file(self, file_to_handle):
+        file_ = files.save_file_to_article(
+            file_to_handle,
+            article=self.article_in_production,
+            owner=self.request.user,
+            label="test",
+        )
+        self.files.append(file_)
+        return file_
+
+    def test_dump_file_text_stores_batch(self):
+        xml_file = self.save_article_file(self.test_xml_file)
+        other_file = self.save_article_file(self.test_file_two)
+        FileTextModel = swapper.load_model("core", "FileText")
+        stale_text = FileTextModel.objects.create(
+            contents=FileTextModel.preprocess_contents("stale"),
+        )
+        File.objects.filter(pk=other_file.pk).update(text=stale_text)
+
+        stored = dump_file_text_to_db.Command.store_batch([(xml_file, "test")])
+
+        xml_file.refresh_from_db()
+        self.assertEqual(stored, 1)
+        self.assertIsNotNone(xml_file.text)
+        self.assertFalse(FileTextModel.objects.filter(pk=stale_text.pk).exists())
+
+    def test_dump_file_text_skips_unchanged_files(self):
+        xml_file = self.save_article_file(self.test_xml_file)
+        self.assertFalse(dump_file_text_to_db.is_unchanged(xml_file))
+
+        xml_file.index_full_text()
+        self.assertTrue(dump_file_text_to_db.is_unchanged(xml_file))
+
+        modified = time.time() + 60
+        os.utime(xml_file.self_article_path(), (modified, modified))
+        self.assertFalse(dump_file_text_to_db.is_unchanged(xml_file))
+
+    def test_dump_file_text_clears_articles_without_indexable_file(self):
+        xml_file = self.save_article_file(self.test_xml_file)
+        xml_file.index_full_text()
+
+        dump_file_text_to_db.Command.clear_text(
+            [self.article_in_production.pk],
+            batch_size=100,
+        )
+
+        xml_file.refresh_from_db()
+        self.assertIsNone(xml_file.text)
+
+    @override_settings(XML_RENDER_CACHE="default")
+    def test_render_xml_is_cached(self):
+        clear_cache()
+        file_, _path_parts = helpers.create_test_file(self, self.test_xml_file)
+        with mock.patch(
+            "core.files.transform_with_xsl",
+            wraps=files.transform_with_xsl,
+        ) as transform:
+            first = files.render_xml(
+                file_,
+                self.article_in_production,
+                xsl_path=settings.BUILTIN_XSL_PATH,
+            )
+            second = files.render_xml(
+                file_,
+                self.article_in_production,
+                xsl_path=settings.BUILTIN_XSL_PATH,
+            )
+
+        self.assertEqual(first, second)
+        transform.assert_called_once()
+
+    @override_settings(XML_RENDER_CACHE=None)
+    def test_render_xml_returns_a_string_without_cache(self):
+        file_, _path_parts = helpers.create_test_file(self, self.test_xml_file)
+        rendered = files.render_xml(
+            file_,
+            self.article_in_production,
+            xsl_path=settings.BUILTIN_XSL_PATH,
+        )
+        self.assertIsInstance(rendered, str)
+
+    def test_xsl_transform_is_compiled_once(self):
+        self.assertIs(
+            files.get_xsl_transform(settings.BUILTIN_XSL_PATH),
+            files.get_xsl_transform(settings.BUILTIN_XSL_PATH),
+        )
+
+
+class TestZipStreaming(TestCase):
+    def test_iter_zip_stores_compressed_formats(self):
+        with (
+            NamedTemporaryFile(suffix=".pdf") as pdf,
+            NamedTemporaryFile(suffix=".xml") as xml,
+        ):
+            pdf.write(b"%PDF-1.4" + os.urandom(1024))
+            pdf.flush()
+            xml.write(b"<article>" + b"text " * 1024 + b"</article>")
+            xml.flush()
+
+            archive = zipfile.ZipFile(
+                io.BytesIO(
+                    b"".join(
+                        files.iter_zip(
+                            [
+                                (pdf.name, "1/article.pdf", "application/pdf"),
+                                (xml.name, "1/article.xml", "application/xml"),
+                            ]
+                        )
+                    )
+                )
+            )
+
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(
+            archive.getinfo("1/article.pdf").compress_type, zipfile.ZIP_STORED
+        )
+        self.assertEqual(
+            archive.getinfo("1/article.xml").compress_type, zipfile.ZIP_DEFLATED
+        )
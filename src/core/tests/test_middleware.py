@@ -2,16 +2,27 @@
 Unit tests for janeway core middleware
 """
 
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
 from django.shortcuts import redirect
+from django.template.loader import render_to_string
 from django.test import TestCase, override_settings
 from django.test.client import RequestFactory
 from django.urls import reverse
 from django.urls.base import clear_script_prefix
 from django.core.management import call_command
 
-from core.middleware import SiteSettingsMiddleware, TimezoneMiddleware, BaseMiddleware
-from core.models import Account
+from core import site_resolution
+from core.middleware import (
+    CounterCookieMiddleware,
+    SiteSettingsMiddleware,
+    TimezoneMiddleware,
+    BaseMiddleware,
+    get_site_resources,
+)
+from core.models import Account, DomainAlias
+from journal.models import Journal
 from journal.tests.utils import make_test_journal
 from press.models import Press
 from utils.testing import helpers
@@ -129,6 +140,85 @@ class TestSiteMiddleware(TestCase):
         )
 
 
+@override_settings(ENABLE_SITE_RESOLUTION_TABLE=True)
+class TestSiteResolutionTable(TestCase):
+    def setUp(self):
+        self.middleware = SiteSettingsMiddleware(BaseMiddleware)
+        self.request_factory = RequestFactory()
+        self.journal = make_test_journal(code="test", domain="journal.org")
+        self.press = Press(domain="press.org")
+        self.press.save()
+        self.alias = DomainAlias.objects.create(
+            domain="alias.org",
+            journal=self.journal,
+            redirect=False,
+        )
+        # Compile the table ahead of the assertions
+        site_resolution.get_table()
+
+    def tearDown(self):
+        clear_script_prefix()
+
+    def test_journal_by_domain(self):
+        request = self.request_factory.get("/", SERVER_NAME="journal.org")
+        with self.assertNumQueries(0):
+            journal, repository, press, redirect_obj, site_path = get_site_resources(
+                request
+            )
+        self.assertEqual(journal, self.journal)
+        self.assertEqual(press, self.press)
+        self.assertIsNone(site_path)
+
+    def test_journal_by_path(self):
+        request = self.request_factory.get("/test/", SERVER_NAME="press.org")
+        journal, repository, press, redirect_obj, site_path = get_site_resources(
+            request
+        )
+        self.assertEqual(journal, self.journal)
+        self.assertEqual(site_path, "test")
+
+    def test_press_by_domain(self):
+        request = self.request_factory.get("/", SERVER_NAME="press.org")
+        journal, repository, press, redirect_obj, site_path = get_site_resources(
+            request
+        )
+        self.assertIsNone(journal)
+        self.assertEqual(press, self.press)
+
+    def test_domain_alias(self):
+        request = self.request_factory.get("/", SERVER_NAME="alias.org")
+        journal, repository, press, redirect_obj, site_path = get_site_resources(
+            request
+        )
+        self.assertEqual(journal, self.journal)
+        self.assertIsNone(redirect_obj)
+
+    def test_table_recompiled_on_change(self):
+        self.journal.domain = "new-journal.org"
+        self.journal.save()
+        request = self.request_factory.get("/", SERVER_NAME="new-journal.org")
+        journal, repository, press, redirect_obj, site_path = get_site_resources(
+            request
+        )
+        self.assertEqual(journal, self.journal)
+
+    @override_settings(SITE_RESOLUTION_TABLE_TIMEOUT=0)
+    def test_table_recompiled_after_timeout(self):
+        # QuerySet.update() does not send post_save
+        Journal.objects.filter(pk=self.journal.pk).update(domain="new-journal.org")
+        request = self.request_factory.get("/", SERVER_NAME="new-journal.org")
+        journal, repository, press, redirect_obj, site_path = get_site_resources(
+            request
+        )
+        self.assertEqual(journal, self.journal)
+
+    def test_resolved_objects_are_not_shared(self):
+        request = self.request_factory.get("/", SERVER_NAME="journal.org")
+        journal, *_ = get_site_resources(request)
+        journal_again, *_ = get_site_resources(request)
+        self.assertIsNot(journal, journal_again)
+
+
 class TestTimezoneMiddleware(TestCase):
     def setUp(self):
         journal_kwargs = dict(code="test", domain="journal.org")
@@ -200,3 +290,68 @@ class TestTimezoneMiddleware(TestCase):
         response = self.middleware.process_request(request)
 
         self.assertEqual(request.timezone.zone, user_timezone)
+
+
+class TestCounterCookieMiddleware(TestCase):
+    def setUp(self):
+        self.middleware = CounterCookieMiddleware(BaseMiddleware)
+        self.request_factory = RequestFactory()
+
+    def process(self, request):
+        self.middleware.process_request(request)
+        return self.middleware.process_response(request, HttpResponse())
+
+    def test_new_reader_gets_signed_cookie_without_session_write(self):
+        request = self.request_factory.get("/")
+        request.session = {}
+        response = self.process(request)
+
+        cookie = response.cookies[settings.COUNTER_TRACKING_COOKIE_NAME]
+        self.assertEqual(request.session, {})
+        self.assertNotEqual(cookie.value, request.counter_tracking_id)
+
+        next_request = self.request_factory.get("/")
+        next_request.COOKIES[settings.COUNTER_TRACKING_COOKIE_NAME] = cookie.value
+        next_response = self.process(next_request)
+
+        self.assertEqual(
+            next_request.counter_tracking_id,
+            request.counter_tracking_id,
+        )
+        self.assertNotIn(settings.COUNTER_TRACKING_COOKIE_NAME, next_response.cookies)
+
+    def test_session_identifier_is_carried_over(self):
+        request = self.request_factory.get("/")
+        request.session = {"counter_tracking": "existing-id"}
+        self.process(request)
+
+        self.assertEqual(request.counter_tracking_id, "existing-id")
+
+    def test_tampered_cookie_is_replaced(self):
+        request = self.request_factory.get("/")
+        request.COOKIES[settings.COUNTER_TRACKING_COOKIE_NAME] = "forged"
+        self.process(request)
+
+        self.assertNotEqual(request.counter_tracking_id, "forged")
+
+    def test_analytics_client_id_is_the_tracking_id(self):
+        request = self.request_factory.get("/")
+        request.session = {}
+        self.process(request)
+        rendered = render_to_string(
+            "common/elements/analytics.html",
+            {
+                "request": request,
+                "journal_settings": {
+                    "general": {
+                        "google_analytics_code": "G-TEST",
+                        "use_ga_four": True,
+                    },
+                },
+            },
+        )
+
+        self.assertIn(
+            "client_id: '{}'".format(request.counter_tracking_id),
+            rendered,
+        )
@@ -1,14 +1,38 @@
 from collections import namedtuple
 
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
-from django.test import TestCase
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
 
-from core import plugin_loader
+from core import plugin_hooks, plugin_loader
 from utils.models import Version
+from utils.testing import helpers
 
 MockSettings = namedtuple("MockSettings", ["JANEWAY_VERSION", "PLUGIN_NAME"])
 MockSettingsNoVersion = namedtuple("MockSettings", ["PLUGIN_NAME"])
 
+hook_calls = []
+
+
+def counting_hook(context, *args):
+    hook_calls.append(args)
+    return "<p>{}</p>".format(len(hook_calls))
+
+
+def failing_hook(context):
+    raise RuntimeError("Hook failure")
+
+
+def cached_hook(cache_scope):
+    return {
+        "module": __name__,
+        "function": "counting_hook",
+        "cache_timeout": 600,
+        "cache_scope": cache_scope,
+    }
+
 
 class TestPluginLoader(TestCase):
     def setUp(self):
@@ -41,3 +65,75 @@ class TestPluginLoader(TestCase):
         )
 
         plugin_loader.validate_plugin_version(mock_settings)
+
+
+class TestPluginHooks(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.press = helpers.create_press()
+        cls.journal_one, cls.journal_two = helpers.create_journals()
+        cls.user = helpers.create_user("hook_user@example.org")
+
+    def setUp(self):
+        cache.clear()
+        hook_calls.clear()
+        plugin_hooks.reset_hook_stats()
+
+    def render(self, journal=None, user=None, tag="{% hook 'test_hook' %}"):
+        request = RequestFactory().get("/")
+        request.user = user or AnonymousUser()
+        request.site_type = journal or self.press
+        template = Template("{% load hooks %}" + tag)
+        return template.render(Context({"request": request}))
+
+    def test_hooks_are_not_cached_by_default(self):
+        hook = {"module": __name__, "function": "counting_hook"}
+        with override_settings(PLUGIN_HOOKS={"test_hook": [hook]}):
+            self.assertEqual(self.render(), "<p>1</p>")
+            self.assertEqual(self.render(), "<p>2</p>")
+
+    def test_cached_hook_is_rendered_once_per_scope(self):
+        hook = cached_hook(["journal"])
+        with override_settings(PLUGIN_HOOKS={"test_hook": [hook]}):
+            self.assertEqual(self.render(self.journal_one), "<p>1</p>")
+            self.assertEqual(self.render(self.journal_one), "<p>1</p>")
+            self.assertEqual(self.render(self.journal_two), "<p>2</p>")
+
+        stats = plugin_hooks.get_hook_stats()[
+            plugin_hooks.get_hook_id("test_hook", hook)
+        ]
+        self.assertEqual(stats["calls"], 3)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+
+    def test_hook_arguments_are_part_of_the_key(self):
+        hook = cached_hook(["journal"])
+        with override_settings(PLUGIN_HOOKS={"test_hook": [hook]}):
+            self.render(tag="{% hook 'test_hook' '' 'one' %}")
+            self.render(tag="{% hook 'test_hook' '' 'two' %}")
+        self.assertEqual(hook_calls, [("one",), ("two",)])
+
+    def test_anonymous_scope_skips_authenticated_users(self):
+        hook = cached_hook(["anonymous"])
+        with override_settings(PLUGIN_HOOKS={"test_hook": [hook]}):
+            self.render()
+            self.render()
+            self.render(user=self.user)
+            self.render(user=self.user)
+        self.assertEqual(len(hook_calls), 3)
+
+    def test_user_scope_keys_on_user(self):
+        hook = cached_hook(["user"])
+        with override_settings(PLUGIN_HOOKS={"test_hook": [hook]}):
+            self.assertEqual(self.render(), "<p>1</p>")
+            self.assertEqual(self.render(user=self.user), "<p>2</p>")
+            self.assertEqual(self.render(user=self.user), "<p>2</p>")
+
+    def test_errors_are_counted(self):
+        hook = {"module": __name__, "function": "failing_hook"}
+        with override_settings(PLUGIN_HOOKS={"test_hook": [hook]}, DEBUG=False):
+            self.assertEqual(self.render(), "")
+        stats = plugin_hooks.get_hook_stats()[
+            plugin_hooks.get_hook_id("test_hook", hook)
+        ]
+        self.assertEqual(stats["errors"], 1)
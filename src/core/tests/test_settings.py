@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase, override_settings
 
 from core.models import SettingGroup
@@ -279,3 +280,134 @@ class TestSettingHandler(TestCase):
 
         self.assertEqual(result, setting_value)
         self.assertEqual(xl_result, xl_setting_value)
+
+    def test_get_settings_for_groups_matches_get_setting(self):
+        for name in ("journal_override", "press_default"):
+            setting_handler.create_setting(
+                "test_group",
+                name,
+                type="text",
+                pretty_name=name,
+                description=None,
+                is_translatable=False,
+            )
+            setting_handler.save_setting("test_group", name, None, "default")
+        setting_handler.save_setting(
+            "test_group",
+            "journal_override",
+            self.journal_one,
+            "override",
+        )
+
+        with self.assertNumQueries(2):
+            resolved = setting_handler.get_settings_for_groups(
+                ["test_group"],
+                self.journal_one,
+            )
+
+        for name in ("journal_override", "press_default"):
+            self.assertEqual(
+                resolved["test_group"][name].value,
+                setting_handler.get_setting(
+                    "test_group",
+                    name,
+                    self.journal_one,
+                ).value,
+            )
+        self.assertEqual(resolved["test_group"]["journal_override"].value, "override")
+
+
+@override_settings(ENABLE_SETTINGS_CACHE=True)
+class TestSettingHandlerCache(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.press = helpers.create_press()
+        cls.journal_one, cls.journal_two = helpers.create_journals()
+        SettingGroup.objects.create(name="test_group")
+        setting_handler.create_setting(
+            "test_group",
+            "test_cached_setting",
+            type="text",
+            pretty_name="Pretty Name",
+            description=None,
+            is_translatable=False,
+        )
+        setting_handler.save_setting(
+            "test_group",
+            "test_cached_setting",
+            journal=None,
+            value="default",
+        )
+
+    def setUp(self):
+        cache.clear()
+        setting_handler.clear_local_settings_cache()
+
+    def get_value(self, journal):
+        return setting_handler.get_setting(
+            "test_group",
+            "test_cached_setting",
+            journal=journal,
+        ).value
+
+    def test_get_setting_warm_cache_makes_no_queries(self):
+        self.get_value(self.journal_one)
+        with self.assertNumQueries(0):
+            result = self.get_value(self.journal_one)
+        self.assertEqual(result, "default")
+
+    def test_save_journal_setting_invalidates_cache(self):
+        self.get_value(self.journal_one)
+        setting_handler.save_setting(
+            "test_group",
+            "test_cached_setting",
+            journal=self.journal_one,
+            value="journal",
+        )
+        self.assertEqual(self.get_value(self.journal_one), "journal")
+        self.assertEqual(self.get_value(self.journal_two), "default")
+
+    def test_save_press_setting_invalidates_journal_fallback(self):
+        self.get_value(self.journal_one)
+        setting_handler.save_setting(
+            "test_group",
+            "test_cached_setting",
+            journal=None,
+            value="new default",
+        )
+        self.assertEqual(self.get_value(self.journal_one), "new default")
+
+    def test_delete_journal_setting_invalidates_cache(self):
+        setting_handler.save_setting(
+            "test_group",
+            "test_cached_setting",
+            journal=self.journal_one,
+            value="journal",
+        )
+        setting_value = setting_handler.get_setting(
+            "test_group",
+            "test_cached_setting",
+            journal=self.journal_one,
+        )
+        setting_value.delete()
+        self.assertEqual(self.get_value(self.journal_one), "default")
+
+    def test_mutating_returned_value_does_not_alter_cache(self):
+        setting_value = setting_handler.get_setting(
+            "test_group",
+            "test_cached_setting",
+            journal=self.journal_one,
+        )
+        setting_value.value = "mutated"
+        self.assertEqual(self.get_value(self.journal_one), "default")
+
+    def test_mutating_value_from_shared_cache_does_not_alter_cache(self):
+        self.get_value(self.journal_one)
+        setting_handler.clear_local_settings_cache()
+        setting_value = setting_handler.get_setting(
+            "test_group",
+            "test_cached_setting",
+            journal=self.journal_one,
+        )
+        setting_value.value = "mutated"
+        self.assertEqual(self.get_value(self.journal_one), "default")
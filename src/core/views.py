@@ -37,7 +37,15 @@ from django.utils import translation
 from django.db.models import Q, OuterRef, Subquery, Count, Avg
 from django.views import generic
 
-from core import models, forms, logic, workflow, files, models as core_models
+from core import (
+    dashboard as dashboard_logic,
+    models,
+    forms,
+    logic,
+    workflow,
+    files,
+    models as core_models,
+)
 from core.model_utils import NotImplementedField, SafePaginator, search_model_admin
 from security.decorators import (
     editor_user_required,
@@ -51,10 +59,7 @@ from submission import models as submission_models
 from utils.forms import clean_orcid_id
 from review import models as review_models
 from copyediting import models as copyedit_models
-from production import models as production_models
 from journal import models as journal_models
-from proofing import logic as proofing_logic
-from proofing import models as proofing_models
 from press import forms as press_forms
 from utils import models as util_models, setting_handler, orcid
 from utils.logger import get_logger
@@ -812,163 +817,48 @@ def dashboard(request):
     :return: HttpResponse object
     """
     template = "core/dashboard.html"
-    new_proofing, active_proofing, completed_proofing = proofing_logic.get_tasks(
-        request
-    )
-    (
-        new_proofing_typesetting,
-        active_proofing_typesetting,
-        completed_proofing_typesetting,
-    ) = proofing_logic.get_typesetting_tasks(request)
     section_editor_articles = review_models.EditorAssignment.objects.filter(
         editor=request.user,
         editor_type="section-editor",
         article__journal=request.journal,
     )
 
+    # Stage and task counts are cached until a workflow event fires
+    context = dashboard_logic.get_statistics(request.journal, request.user)
     # TODO: Move most of this to model logic.
-    context = {
-        "new_proofing": new_proofing.count(),
-        "active_proofing": active_proofing.count(),
-        "completed_proofing": completed_proofing.count(),
-        "new_proofing_typesetting": new_proofing_typesetting.count(),
-        "completed_proofing_typesetting": completed_proofing_typesetting.count(),
-        "active_proofing_typesetting": active_proofing_typesetting.count(),
-        "unassigned_articles_count": submission_models.Article.objects.filter(
-            stage=submission_models.STAGE_UNASSIGNED, journal=request.journal
-        ).count(),
-        "assigned_articles_count": submission_models.Article.objects.filter(
-            Q(stage=submission_models.STAGE_ASSIGNED)
-            | Q(stage=submission_models.STAGE_UNDER_REVIEW)
-            | Q(stage=submission_models.STAGE_UNDER_REVISION),
-            journal=request.journal,
-        ).count(),
-        "editing_articles_count": submission_models.Article.objects.filter(
-            Q(stage=submission_models.STAGE_EDITOR_COPYEDITING)
-            | Q(stage=submission_models.STAGE_AUTHOR_COPYEDITING)
-            | Q(stage=submission_models.STAGE_FINAL_COPYEDITING),
-            journal=request.journal,
-        ).count(),
-        "production_articles_count": submission_models.Article.objects.filter(
-            Q(stage=submission_models.STAGE_TYPESETTING), journal=request.journal
-        ).count(),
-        "proofing_articles_count": submission_models.Article.objects.filter(
-            Q(stage=submission_models.STAGE_PROOFING), journal=request.journal
-        ).count(),
-        "prepub_articles_count": submission_models.Article.objects.filter(
-            Q(stage=submission_models.STAGE_READY_FOR_PUBLICATION),
-            journal=request.journal,
-        ).count(),
-        "is_editor": request.user.is_editor(request),
-        "is_author": request.user.is_author(request),
-        "is_reviewer": request.user.is_reviewer(request),
-        "section_editor_articles": section_editor_articles,
-        "active_submission_count": submission_models.Article.objects.filter(
-            frozenauthor__author=request.user,
-            journal=request.journal,
-        )
-        .exclude(stage=submission_models.STAGE_UNSUBMITTED)
-        .count(),
-        "in_progress_submission_count": submission_models.Article.objects.filter(
-            owner=request.user,
-            journal=request.journal,
-            stage=submission_models.STAGE_UNSUBMITTED,
-        ).count(),
-        "assigned_articles_for_user_review_count": review_models.ReviewAssignment.objects.filter(
-            Q(is_complete=False)
-            & Q(reviewer=request.user)
-            & Q(article__stage=submission_models.STAGE_UNDER_REVIEW)
-            & Q(date_accepted__isnull=True),
-            article__journal=request.journal,
-        ).count(),
-        "assigned_articles_for_user_review_accepted_count": review_models.ReviewAssignment.objects.filter(
-            Q(is_complete=False)
-            & Q(reviewer=request.user)
-            & Q(article__stage=submission_models.STAGE_UNDER_REVIEW)
-            & Q(date_accepted__isnull=False),
-            article__journal=request.journal,
-        ).count(),
-        "assigned_articles_for_user_review_completed_count": review_models.ReviewAssignment.objects.filter(
-            Q(is_complete=True)
-            & Q(reviewer=request.user)
-            & Q(date_declined__isnull=True),
-            article__journal=request.journal,
-        ).count(),
-        "copyeditor_requests": copyedit_models.CopyeditAssignment.objects.filter(
-            Q(copyeditor=request.user)
-            & Q(decision__isnull=True)
-            & Q(copyedit_reopened__isnull=True),
-            article__journal=request.journal,
-        ).count(),
-        "copyeditor_accepted_requests": copyedit_models.CopyeditAssignment.objects.filter(
-            Q(
-                copyeditor=request.user,
-                decision="accept",
-                copyeditor_completed__isnull=True,
-                article__journal=request.journal,
+    context.update(
+        {
+            "is_editor": request.user.is_editor(request),
+            "is_author": request.user.is_author(request),
+            "is_reviewer": request.user.is_reviewer(request),
+            "section_editor_articles": section_editor_articles,
+            "active_submissions": submission_models.Article.objects.filter(
+                frozenauthor__author=request.user,
+                journal=request.journal,
             )
-            | Q(
-                copyeditor=request.user,
-                decision="accept",
-                copyeditor_completed__isnull=False,
-                article__journal=request.journal,
-                copyedit_reopened__isnull=False,
-                copyedit_reopened_complete__isnull=True,
+            .exclude(
+                stage__in=[
+                    submission_models.STAGE_UNSUBMITTED,
+                    submission_models.STAGE_PUBLISHED,
+                ],
             )
-        ).count(),
-        "copyeditor_completed_requests": copyedit_models.CopyeditAssignment.objects.filter(
-            (Q(copyeditor=request.user) & Q(copyeditor_completed__isnull=False))
-            | (
-                Q(copyeditor=request.user)
-                & Q(copyeditor_completed__isnull=False)
-                & Q(copyedit_reopened_complete__isnull=False)
+            .order_by("-date_submitted"),
+            "published_submissions": submission_models.Article.objects.filter(
+                frozenauthor__author=request.user,
+                journal=request.journal,
+                stage=submission_models.STAGE_PUBLISHED,
+            ).order_by("-date_published"),
+            "progress_submissions": submission_models.Article.objects.filter(
+                journal=request.journal,
+                owner=request.user,
+                stage=submission_models.STAGE_UNSUBMITTED,
+            ).order_by("-date_started"),
+            "workflow_elements": workflow.element_names(
+                request.journal.workflow().elements.all()
             ),
-            article__journal=request.journal,
-        ).count(),
-        "typeset_tasks": production_models.TypesetTask.active_objects.filter(
-            assignment__article__journal=request.journal,
-            accepted__isnull=True,
-            completed__isnull=True,
-            typesetter=request.user,
-        ).count(),
-        "typeset_in_progress_tasks": production_models.TypesetTask.active_objects.filter(
-            assignment__article__journal=request.journal,
-            accepted__isnull=False,
-            completed__isnull=True,
-            typesetter=request.user,
-        ).count(),
-        "typeset_completed_tasks": production_models.TypesetTask.active_objects.filter(
-            assignment__article__journal=request.journal,
-            accepted__isnull=False,
-            completed__isnull=False,
-            typesetter=request.user,
-        ).count(),
-        "active_submissions": submission_models.Article.objects.filter(
-            frozenauthor__author=request.user,
-            journal=request.journal,
-        )
-        .exclude(
-            stage__in=[
-                submission_models.STAGE_UNSUBMITTED,
-                submission_models.STAGE_PUBLISHED,
-            ],
-        )
-        .order_by("-date_submitted"),
-        "published_submissions": submission_models.Article.objects.filter(
-            frozenauthor__author=request.user,
-            journal=request.journal,
-            stage=submission_models.STAGE_PUBLISHED,
-        ).order_by("-date_published"),
-        "progress_submissions": submission_models.Article.objects.filter(
-            journal=request.journal,
-            owner=request.user,
-            stage=submission_models.STAGE_UNSUBMITTED,
-        ).order_by("-date_started"),
-        "workflow_elements": workflow.element_names(
-            request.journal.workflow().elements.all()
-        ),
-        "workflow_element_url": request.GET.get("workflow_element_url", False),
-    }
+            "workflow_element_url": request.GET.get("workflow_element_url", False),
+        }
+    )
 
     return render(request, template, context)
 
@@ -2242,71 +2132,11 @@ def kanban(request):
     :param request: HttpRequest object
     :return: HttpResponse object
     """
-    unassigned_articles = submission_models.Article.objects.filter(
-        Q(stage=submission_models.STAGE_UNASSIGNED), journal=request.journal
-    ).order_by("-date_submitted")
-
-    in_review = submission_models.Article.objects.filter(
-        Q(stage=submission_models.STAGE_ASSIGNED)
-        | Q(stage=submission_models.STAGE_UNDER_REVIEW)
-        | Q(stage=submission_models.STAGE_UNDER_REVISION),
-        journal=request.journal,
-    ).order_by("-date_submitted")
-
-    copyediting = submission_models.Article.objects.filter(
-        Q(stage=submission_models.STAGE_ACCEPTED)
-        | Q(stage__in=submission_models.COPYEDITING_STAGES),
-        journal=request.journal,
-    ).order_by("-date_submitted")
-
-    assigned_table = production_models.ProductionAssignment.objects.filter(
-        article__journal=request.journal
-    )
-    assigned = [assignment.article.pk for assignment in assigned_table]
-
-    prod_articles = submission_models.Article.objects.filter(
-        stage=submission_models.STAGE_TYPESETTING, journal=request.journal
-    )
-    assigned_articles = submission_models.Article.objects.filter(pk__in=assigned)
-
-    proofing_assigned_table = proofing_models.ProofingAssignment.objects.filter(
-        article__journal=request.journal,
-    )
-    proofing_assigned = [
-        assignment.article.pk for assignment in proofing_assigned_table
-    ]
-
-    proof_articles = submission_models.Article.objects.filter(
-        stage=submission_models.STAGE_PROOFING, journal=request.journal
-    )
-    proof_assigned_articles = submission_models.Article.objects.filter(
-        pk__in=proofing_assigned,
-    )
-    typesetting_articles = submission_models.Article.objects.filter(
-        stage=submission_models.STAGE_TYPESETTING_PLUGIN,
-        journal=request.journal,
-    )
-
-    prepub = submission_models.Article.objects.filter(
-        Q(stage=submission_models.STAGE_READY_FOR_PUBLICATION),
-        journal=request.journal,
-    ).order_by("-date_submitted")
-
+    context = logic.get_kanban_articles(request.journal)
     articles_in_workflow_plugins = workflow.articles_in_workflow_plugins(request)
 
-    context = {
-        "unassigned_articles": unassigned_articles,
-        "in_review": in_review,
-        "copyediting": copyediting,
-        "production": prod_articles,
-        "production_assigned": assigned_articles,
-        "proofing": proof_articles,
-        "proofing_assigned": proof_assigned_articles,
-        "typesetting": typesetting_articles,
-        "prepubs": prepub,
-        "articles_in_workflow_plugins": articles_in_workflow_plugins,
-        "workflow": request.journal.workflow(),
-    }
+    context["articles_in_workflow_plugins"] = articles_in_workflow_plugins
+    context["workflow"] = request.journal.workflow()
 
     template = "core/kanban.html"
 
@@ -66,6 +66,18 @@ class Command(BaseCommand):
                 "task": "generate_sitemaps",
                 "type": "hourly",
             },
+            {
+                "name": "{}_janeway_access_rollup_job".format(cwd),
+                "time": 1,
+                "task": "rollup_article_accesses",
+                "type": "hourly",
+            },
+            {
+                "name": "{}_janeway_popular_articles_job".format(cwd),
+                "time": 1,
+                "task": "refresh_popular_articles",
+                "type": "hourly",
+            },
             {
                 "name": "{}_janeway_reader_notifications".format(cwd),
                 "time": 23,
@@ -96,6 +108,26 @@ class Command(BaseCommand):
                 }
             )
 
+        if settings.ENABLE_EMAIL_OUTBOX:
+            jobs.append(
+                {
+                    "name": "{}_janeway_email_outbox_job".format(cwd),
+                    "time": 1,
+                    "task": "send_queued_emails",
+                    "type": "mins",
+                }
+            )
+
+        if settings.BUFFER_ARTICLE_ACCESSES:
+            jobs.append(
+                {
+                    "name": "{}_janeway_flush_accesses_job".format(cwd),
+                    "time": 5,
+                    "task": "flush_article_accesses",
+                    "type": "mins",
+                }
+            )
+
         if settings.SITE_SEARCH_INDEXING_FREQUENCY:
             task_time, task_type = settings.SITE_SEARCH_INDEXING_FREQUENCY
             jobs.append(
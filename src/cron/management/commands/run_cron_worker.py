@@ -0,0 +1,83 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from cron import models
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Runs due CronTasks outside of the request cycle, polling for new ones.
+    """
+
+    help = (
+        "Runs due cron tasks in a polling loop. Set ENABLE_CRON_MIDDLEWARE to "
+        "False when using this worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll_interval",
+            type=float,
+            default=30,
+            help="Seconds to wait before polling again when no tasks are due.",
+        )
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=50,
+            help="Maximum number of tasks claimed at a time.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of tasks run concurrently.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            default=False,
+            help="Run every task that is due and exit.",
+        )
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        totals = {"claimed": 0, "succeeded": 0, "failed": 0}
+        while self.running:
+            metrics = models.CronTask.run_due_tasks(
+                batch_size=options["batch_size"],
+                workers=options["workers"],
+            )
+            for key in totals:
+                totals[key] += metrics[key]
+
+            if metrics["claimed"]:
+                message = (
+                    "Ran {claimed} cron tasks in {duration:.2f}s: "
+                    "{succeeded} succeeded, {failed} failed.".format(**metrics)
+                )
+                logger.info(message)
+                self.stdout.write(message)
+
+            if metrics["claimed"] < options["batch_size"]:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Cron worker ran {claimed} tasks: {succeeded} succeeded, "
+                "{failed} failed.".format(**totals)
+            )
+        )
+
+    def stop(self, signum, frame):
+        self.running = False
@@ -6,11 +6,18 @@ __maintainer__ = "Birkbeck Centre for Technology and Publishing"
 
 from cron import models
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 
 from utils.middleware import BaseMiddleware
 
 
 class CronMiddleware(BaseMiddleware):
+    def __init__(self, *args, **kwargs):
+        if not settings.ENABLE_CRON_MIDDLEWARE:
+            # Tasks are run by the run_cron_worker command instead
+            raise MiddlewareNotUsed()
+        super().__init__(*args, **kwargs)
+
     @staticmethod
     def process_request(request):
         """This middleware class calls the Cron runner to process scheduled tasks (like emails)
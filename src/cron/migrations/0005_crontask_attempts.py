@@ -0,0 +1,17 @@
+# Generated by Django 4.2.29 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("cron", "0004_auto_20210831_1159"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="crontask",
+            name="attempts",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -4,7 +4,11 @@ __license__ = "AGPL v3"
 __maintainer__ = "Birkbeck Centre for Technology and Publishing"
 
 
-from django.db import models
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, models, transaction
 from django.utils import timezone
 from django.db.models import Q
 from datetime import timedelta
@@ -43,6 +47,7 @@ class CronTask(models.Model):
     email_html = models.TextField(blank=True, null=True)
     email_cc = models.CharField(max_length=255, blank=True, null=True)
     email_bcc = models.CharField(max_length=255, blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
 
     @staticmethod
     def run_tasks():
@@ -55,6 +60,75 @@ class CronTask(models.Model):
 
                 task.delete()
 
+    @staticmethod
+    def run_due_tasks(batch_size=50, workers=1):
+        """Claims and runs a batch of due tasks
+
+        Due rows are locked with SELECT ... FOR UPDATE SKIP LOCKED, where
+        supported, until the batch completes, so concurrent workers never run
+        the same task. Tasks that raise are postponed by CRON_TASK_RETRY_DELAY,
+        doubled after each failed attempt, and are no longer claimed once
+        they have failed CRON_TASK_MAX_ATTEMPTS times.
+        :param batch_size: The maximum number of tasks claimed
+        :param workers: The number of threads running tasks concurrently
+        :return: A dict of claimed, succeeded and failed counts and duration
+        """
+        started = time.monotonic()
+        succeeded, failed = [], []
+
+        def run(task):
+            try:
+                logic.task_runner(task)
+            except Exception as e:
+                logger.exception("Cron task {} failed: {}".format(task.pk, e))
+                return task, False
+            finally:
+                if workers > 1:
+                    # Each thread opens its own database connections
+                    connections.close_all()
+            return task, True
+
+        with transaction.atomic():
+            tasks = list(
+                CronTask.objects.select_for_update(skip_locked=True)
+                .filter(
+                    run_at__lt=timezone.now(),
+                    attempts__lt=settings.CRON_TASK_MAX_ATTEMPTS,
+                )
+                .order_by("run_at", "pk")[:batch_size]
+            )
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(run, tasks))
+            else:
+                results = [run(task) for task in tasks]
+
+            for task, success in results:
+                (succeeded if success else failed).append(task)
+            CronTask.objects.filter(pk__in=[task.pk for task in succeeded]).delete()
+            for task in failed:
+                task.postpone()
+
+        return {
+            "claimed": len(tasks),
+            "succeeded": len(succeeded),
+            "failed": len(failed),
+            "duration": time.monotonic() - started,
+        }
+
+    def postpone(self):
+        """Records a failed attempt and schedules the next one"""
+        self.attempts += 1
+        if self.attempts >= settings.CRON_TASK_MAX_ATTEMPTS:
+            logger.error(
+                "Cron task {} failed {} times and will not be retried".format(
+                    self.pk, self.attempts
+                )
+            )
+        delay = settings.CRON_TASK_RETRY_DELAY * 2 ** (self.attempts - 1)
+        self.run_at = timezone.now() + timedelta(seconds=delay)
+        self.save(update_fields=["attempts", "run_at"])
+
     @staticmethod
     def add_email_task(
         to,
@@ -1,5 +1,9 @@
-from django.test import TestCase
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
 from django.core.management import call_command
+from django.utils import timezone
+import mock
 from utils.testing import helpers
 from cron import forms, models
 
@@ -26,3 +30,61 @@ class ModelTests(TestCase):
 
     def test_items_for_reminder(self):
         self.assertEqual(1, len(self.review_reminder.items_for_reminder()))
+
+    def test_run_due_tasks(self):
+        due = models.CronTask.objects.create(
+            task_type="email_message",
+            run_at=timezone.now() - timedelta(minutes=1),
+        )
+        failing = models.CronTask.objects.create(
+            task_type="email_message",
+            run_at=timezone.now() - timedelta(minutes=1),
+        )
+        future = models.CronTask.objects.create(
+            task_type="email_message",
+            run_at=timezone.now() + timedelta(days=1),
+        )
+
+        def task_runner(task):
+            if task.pk == failing.pk:
+                raise ValueError("Could not send")
+
+        with mock.patch("cron.logic.task_runner", side_effect=task_runner):
+            metrics = models.CronTask.run_due_tasks()
+
+        self.assertEqual(
+            (metrics["claimed"], metrics["succeeded"], metrics["failed"]),
+            (2, 1, 1),
+        )
+        self.assertFalse(models.CronTask.objects.filter(pk=due.pk).exists())
+        failing.refresh_from_db()
+        self.assertGreater(failing.run_at, timezone.now())
+        self.assertTrue(models.CronTask.objects.filter(pk=future.pk).exists())
+
+    @override_settings(CRON_TASK_RETRY_DELAY=60, CRON_TASK_MAX_ATTEMPTS=2)
+    def test_failing_task_backs_off_until_max_attempts(self):
+        failing = models.CronTask.objects.create(
+            task_type="email_message",
+            run_at=timezone.now() - timedelta(minutes=1),
+        )
+
+        with mock.patch("cron.logic.task_runner", side_effect=ValueError):
+            models.CronTask.run_due_tasks()
+            failing.refresh_from_db()
+            self.assertEqual(failing.attempts, 1)
+            self.assertLessEqual(failing.run_at, timezone.now() + timedelta(seconds=60))
+
+            models.CronTask.objects.filter(pk=failing.pk).update(
+                run_at=timezone.now() - timedelta(minutes=1),
+            )
+            models.CronTask.run_due_tasks()
+            failing.refresh_from_db()
+            self.assertEqual(failing.attempts, 2)
+            self.assertGreater(failing.run_at, timezone.now() + timedelta(seconds=60))
+
+            models.CronTask.objects.filter(pk=failing.pk).update(
+                run_at=timezone.now() - timedelta(minutes=1),
+            )
+            metrics = models.CronTask.run_due_tasks()
+
+        self.assertEqual(metrics["claimed"], 0)
@@ -3,7 +3,7 @@ __author__ = "Martin Paul Eve & Andy Byers"
 __license__ = "AGPL v3"
 __maintainer__ = "Birkbeck Centre for Technology and Publishing"
 
-from core import models as core_models, workflow
+from core import dashboard, models as core_models, workflow
 from events import logic as event_logic
 from utils import transactional_emails, workflow_tasks
 from journal import logic as journal_logic
@@ -361,3 +361,10 @@ event_logic.Events.register_for_event(
     event_logic.Events.ON_ARTICLE_ASSIGNED_TO_ISSUE,
     id_logic.on_article_assign_to_issue,
 )
+
+# Cached dashboard counts are evicted when the workflow of a journal moves on
+for event_name in dashboard.WORKFLOW_EVENTS:
+    event_logic.Events.register_for_event(
+        event_name,
+        dashboard.invalidate_on_event,
+    )
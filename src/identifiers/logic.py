@@ -76,7 +76,7 @@ def register_batch_of_crossref_dois(articles, **kwargs):
         return status, error
 
 
-@cache(30)
+@cache(30, depends_on=["core.SettingValue"])
 def check_crossref_settings(journal):
     use_crossref = setting_handler.get_setting(
         "Identifiers", "use_crossref", journal
@@ -638,7 +638,7 @@ def generate_crossref_doi_with_pattern(article):
     return models.Identifier.objects.create(**doi_options)
 
 
-@cache(600)
+@cache(600, depends_on=["core.SettingValue"])
 def render_doi_from_pattern(article):
     doi_prefix = setting_handler.get_setting(
         "Identifiers", "crossref_prefix", article.journal
@@ -5,6 +5,7 @@ __maintainer__ = "Birkbeck Centre for Technology and Publishing"
 
 from bs4 import BeautifulSoup
 import csv
+import hashlib
 import os
 from os import listdir, makedirs
 from os.path import isfile, join
@@ -646,8 +647,25 @@ def get_table_from_html(table_name, content):
 def get_all_tables_from_html(content):
     """
     Uses BS4 to fetch all tables in html.
+
+    Results are stored alongside rendered XML galleys, keyed on a hash of the
+    content, so a cached render does not need to be parsed again.
     :param content: HTML content
     """
+    render_cache = files.get_xml_render_cache()
+    if render_cache is None or not content:
+        return _get_all_tables_from_html(content)
+
+    content_hash = hashlib.sha1(str(content).encode("utf-8")).hexdigest()
+    cache_key = "html_tables:{}".format(content_hash)
+    tables = render_cache.get(cache_key)
+    if tables is None:
+        tables = _get_all_tables_from_html(content)
+        render_cache.set(cache_key, tables, settings.XML_RENDER_CACHE_TIMEOUT)
+    return tables
+
+
+def _get_all_tables_from_html(content):
     soup = BeautifulSoup(str(content), "lxml")
     tables = []
 
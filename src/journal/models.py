@@ -334,7 +334,7 @@ class Journal(AbstractSiteModel):
         ).processed_value
 
     @property
-    @cache(15)
+    @cache(15, depends_on=["core.SettingValue"])
     def name(self):
         try:
             return setting_handler.get_setting(
@@ -359,7 +359,7 @@ class Journal(AbstractSiteModel):
         setting_handler.save_setting("general", "publisher_name", self, value)
 
     @property
-    @cache(120)
+    @cache(120, depends_on=["core.SettingValue"])
     def issn(self):
         return setting_handler.get_setting(
             "general", "journal_issn", self, default=True
@@ -379,21 +379,21 @@ class Journal(AbstractSiteModel):
         setting_handler.save_setting("Identifiers", "title_doi", self, value)
 
     @property
-    @cache(120)
+    @cache(120, depends_on=["core.SettingValue"])
     def print_issn(self):
         return setting_handler.get_setting(
             "general", "print_issn", self, default=True
         ).value
 
     @property
-    @cache(120)
+    @cache(120, depends_on=["core.SettingValue"])
     def use_crossref(self):
         return setting_handler.get_setting(
             "Identifiers", "use_crossref", self, default=True
         ).processed_value
 
     @property
-    @cache(120)
+    @cache(120, depends_on=["core.SettingValue"])
     def register_doi_at_acceptance(self):
         return setting_handler.get_setting(
             "Identifiers", "register_doi_at_acceptance", self, default=True
@@ -550,7 +550,7 @@ class Journal(AbstractSiteModel):
 
         return users
 
-    @cache(300)
+    @cache(300, depends_on=["core.EditorialGroup"])
     def editorial_groups(self):
         return core_models.EditorialGroup.objects.filter(journal=self)
 
@@ -250,6 +250,20 @@ class TestJournalSite(TestCase):
             self.article_title,
         )
 
+    @override_settings(ENABLE_FULL_TEXT_SEARCH=True)
+    def test_full_text_search_all_results_without_hits(self):
+        url = "{}?article_search=Janeway&paginate_by=all".format(
+            reverse(
+                "search",
+            )
+        )
+        response = self.client.get(url, SERVER_NAME=self.journal_domain)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(
+            response,
+            self.article_title,
+        )
+
     def test_search_excludes_artucle(self):
         url = "{}?article_search=Janeway&sort=relevance".format(
             reverse(
@@ -60,7 +60,13 @@ from security.decorators import (
     production_user_or_editor_required,
 )
 from submission import models as submission_models
-from utils import models as utils_models, shared, setting_handler, xml_validation
+from utils import (
+    models as utils_models,
+    shared,
+    setting_handler,
+    sitemaps,
+    xml_validation,
+)
 from utils.logger import get_logger
 from events import logic as event_logic
 from typesetting import models as typesetting_models
@@ -2262,11 +2268,12 @@ def author_list(request):
 
 
 @has_journal
-def sitemap(request, issue_id=None):
+def sitemap(request, issue_id=None, page=None):
     """
     Renders an XML sitemap based on articles and pages available to the journal.
     :param request: HttpRequest object
     :param issue_id: Int, primary key of an Issue object
+    :param page: Int, the shard of a sharded sitemap
     :return: HttpResponse object
     """
     if issue_id:
@@ -2276,7 +2283,7 @@ def sitemap(request, issue_id=None):
         )
         path_parts = [
             request.journal.code,
-            "{}_sitemap.xml".format(issue.pk),
+            sitemaps.ShardedSitemap.get_file_name(issue.pk, int(page or 1)),
         ]
     else:
         path_parts = [
@@ -2324,7 +2331,7 @@ def full_text_search(request):
 
     paginate_by = request.GET.get("paginate_by", 25)
     if paginate_by == "all":
-        paginate_by = articles.count() if articles else 25
+        paginate_by = (articles.count() or 25) if search_term else 25
 
     paginator = Paginator(articles, paginate_by)
     page_number = request.GET.get("page")
@@ -2846,11 +2853,10 @@ def download_issue(request, issue_id):
             )
             galley_files.append(galley.file)
 
-    zip_file, file_name = files.zip_article_files(
+    return files.serve_article_files_zip(
         galley_files,
         article_folders=True,
     )
-    return files.serve_temp_file(zip_file, file_name)
 
 
 def download_issue_galley(request, issue_id, galley_id):
@@ -4,14 +4,25 @@ __license__ = "AGPL v3"
 __maintainer__ = "Birkbeck Centre for Technology and Publishing"
 
 import calendar
+import json
 import os
-from datetime import timedelta
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from itertools import chain
 from user_agents import parse as parse_ua_string
 import geoip2.database
 from geoip2.errors import AddressNotFoundError
 import hashlib
+from uuid import uuid4
 
 from django.db import transaction, OperationalError
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
 from django.utils import timezone
 from django.conf import settings
 
@@ -21,11 +32,55 @@ from utils.decorators import retry
 from utils.function_cache import cache
 from core import models as core_models
 from events import logic as event_logic
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Accesses younger than this are left for the next rollup run
+ROLLUP_LAG = timedelta(minutes=5)
+
+# Repeated accesses by the same reader within this window are not recorded
+ACCESS_DEDUPLICATION_WINDOW = timedelta(seconds=3600)
+
+SPOOL_FILE_FORMAT = "accesses-%Y%m%d%H%M.jsonl"
+SPOOL_PROCESSING_SUFFIX = ".processing"
+# Files claimed by a flush longer ago than this are assumed to be left over
+# from an interrupted flush
+SPOOL_STALE_AFTER = timedelta(hours=1)
+
+GEOIP_DB_PATH = os.path.join(
+    settings.BASE_DIR,
+    "metrics",
+    "geolocation",
+    "GeoLite2-Country.mmdb",
+)
+GEOIP_CACHE_SIZE = 10000
+
+_geoip_reader = None
+_geoip_lock = threading.Lock()
+_countries_by_code = {}
+_country_lock = threading.Lock()
+
+
+def _month_key(date):
+    return "{0}-{1}".format(date.strftime("%b"), date.year)
+
+
+def _bump_count(counts, key, value):
+    # Months with no accesses must be blank, not zero
+    if counts[key] == "":
+        counts[key] = 0
+    counts[key] += value
 
 
 @cache(300)
 def get_press_totals(start_date, end_date, report_months, compat=False, do_yop=False):
-    from submission import models as submission_models
+    """Counts article views and downloads per journal and month
+
+    The counts are computed with grouped queries rather than per article, so
+    the cost does not grow with the number of articles in the press.
+    :return: A tuple of (total, views, downloads, press_months, journals)
+    """
     from journal import models as journal_models
 
     view_access_count = 0
@@ -35,10 +90,52 @@ def get_press_totals(start_date, end_date, report_months, compat=False, do_yop=F
 
     press_months = {}
 
-    year_of_publication = {}
-
     for date in report_months:
-        press_months["{0}-{1}".format(date.strftime("%b"), date.year)] = ""
+        press_months[_month_key(date)] = ""
+
+    monthly_counts = get_monthly_access_counts(start_date, end_date)
+    counts_by_journal = defaultdict(list)
+    for row in monthly_counts:
+        counts_by_journal[row["article__journal"]].append(row)
+
+    # year of publication is for COUNTER journal report 5
+    # it needs to have "each YOP in the current decade and in the immediately previous decade as separate columns"
+    # easiest way to do this is simply to count backwards 19 years as the theoretical maximum
+    year = timezone.now().year
+    publication_years = range(year, year - 19, -1)
+    yop_counts = defaultdict(int)
+    if do_yop:
+        watermark = get_rollup_watermark()
+        rolled_up_counts = (
+            models.ArticleAccessRollup.objects.filter(
+                type__in=["view", "download"],
+                article__date_published__year__in=publication_years,
+            )
+            .values("article__journal", "article__date_published__year")
+            .annotate(count=Sum("count"))
+            .order_by()
+        )
+        access_counts = (
+            models.ArticleAccess.objects.filter(
+                pk__gt=watermark,
+                type__in=["view", "download"],
+                article__date_published__year__in=publication_years,
+            )
+            .values("article__journal", "article__date_published__year")
+            .annotate(count=Count("pk"))
+            .order_by()
+        )
+        historic_counts = (
+            models.HistoricArticleAccess.objects.filter(
+                article__date_published__year__in=publication_years,
+            )
+            .values("article__journal", "article__date_published__year")
+            .annotate(count=Sum("views") + Sum("downloads"))
+            .order_by()
+        )
+        for row in chain(rolled_up_counts, access_counts, historic_counts):
+            key = (row["article__journal"], row["article__date_published__year"])
+            yop_counts[key] += row["count"] or 0
 
     for journal_object in journal_models.Journal.objects.all():
         journal = {}
@@ -50,18 +147,10 @@ def get_press_totals(start_date, end_date, report_months, compat=False, do_yop=F
 
         journal["reporting_periods"] = []
 
-        # year of publication is for COUNTER journal report 5
-        # it needs to have "each YOP in the current decade and in the immediately previous decade as separate columns"
-        # easiest way to do this is simply to count backwards 19 years as the theoretical maximum
         journal["year_of_publication"] = {}
 
-        year = timezone.now().year
-
-        for year_counter in range(year, year - 19, -1):
-            year_of_publication[year] = ""
-
         for date in report_months:
-            month = "{0}-{1}".format(date.strftime("%b"), date.year)
+            month = _month_key(date)
 
             # setting these to zero for now for compat with pycounter
             # the spec says they should be set to "" so we may need to change that back
@@ -75,101 +164,37 @@ def get_press_totals(start_date, end_date, report_months, compat=False, do_yop=F
                 journal["{0}-views".format(month)] = ""
                 journal["{0}-downloads".format(month)] = ""
 
-        articles = submission_models.Article.objects.filter(journal=journal_object)
-
-        # if we're doing a year-of-publication for JR5 purposes, then run this section, which is pretty DB intensive
         if do_yop:
-            for article in articles:
-                views = get_article_views(article)
-                downloads = get_article_downloads(article)
-
-                if article.date_published.year in year_of_publication:
-                    if year_of_publication[article.date_published.year] == "":
-                        year_of_publication[article.date_published.year] = 0
-
-                    if (
-                        journal["year_of_publication"][article.date_published.year]
-                        == ""
-                    ):
-                        journal["year_of_publication"][article.date_published.year] = 0
-
-                year_of_publication[article.date_published.year] += views + downloads
-                journal["year_of_publication"][article.date_published.year] += (
-                    views + downloads
-                )
-
-        for article in articles:
-            views = models.ArticleAccess.objects.filter(
-                type="view", article=article, accessed__range=[start_date, end_date]
-            )
+            for publication_year in publication_years:
+                count = yop_counts.get((journal_object.pk, publication_year))
+                if count is not None:
+                    journal["year_of_publication"][publication_year] = count
 
-            downloads = models.ArticleAccess.objects.filter(
-                type="download", article=article, accessed__range=[start_date, end_date]
-            )
-
-            view_count = views.count()
-            download_count = downloads.count()
+        for row in counts_by_journal[journal_object.pk]:
+            count = row["count"]
+            access_date = _month_key(row["month"])
+            type_key = "{0}-{1}s".format(access_date, row["type"])
 
             # total views and downloads
-            journal["total"] += view_count + download_count
-
-            # total views
-            journal["total_views"] += view_count
-
-            # total downloads
-            journal["total_downloads"] += download_count
-
-            # add the totals to the press totals
-            view_access_count += view_count
-            download_access_count += download_count
-
-            for view_object in views:
-                # get the date for this access
-                access_date = "{0}-{1}".format(
-                    view_object.accessed.strftime("%b"), view_object.accessed.year
-                )
+            journal["total"] += count
 
-                # we have to handle this like this since data for months already collected must be blank, not zero
-                if journal[access_date] == "":
-                    journal[access_date] = 0
-
-                if press_months[access_date] == "":
-                    press_months[access_date] = 0
-
-                if journal["{0}-views".format(access_date)] == "":
-                    journal["{0}-views".format(access_date)] = 0
-
-                journal[access_date] += 1
-                journal["{0}-views".format(access_date)] += 1
-                press_months[access_date] += 1
-
-            for download_object in downloads:
-                # get the date for this access
-                access_date = "{0}-{1}".format(
-                    download_object.accessed.strftime("%b"),
-                    download_object.accessed.year,
-                )
-
-                # we have to handle this like this since data for months already collected must be blank, not zero
-                if journal[access_date] == "":
-                    journal[access_date] = 0
-
-                if press_months[access_date] == "":
-                    press_months[access_date] = 0
-
-                if journal["{0}-downloads".format(access_date)] == "":
-                    journal["{0}-downloads".format(access_date)] = 0
+            if row["type"] == "view":
+                journal["total_views"] += count
+                view_access_count += count
+            else:
+                journal["total_downloads"] += count
+                download_access_count += count
 
-                journal[access_date] += 1
-                journal["{0}-downloads".format(access_date)] += 1
-                press_months[access_date] += 1
+            _bump_count(journal, access_date, count)
+            _bump_count(journal, type_key, count)
+            _bump_count(press_months, access_date, count)
 
         for date in report_months:
             # add to "reporting_periods":
             # a start date
             # an end date
             # a total number of views
-            month = "{0}-{1}".format(date.strftime("%b"), date.year)
+            month = _month_key(date)
             journal["reporting_periods"].append(
                 (
                     "{0}-01".format(date.strftime("%Y-%m")),
@@ -194,26 +219,295 @@ def get_press_totals(start_date, end_date, report_months, compat=False, do_yop=F
     )
 
 
-def get_article_views(article):
-    historic_record, created = models.HistoricArticleAccess.objects.get_or_create(
-        article=article
+def get_monthly_access_counts(start_date, end_date):
+    """Counts views and downloads per journal, access type and month
+
+    Whole days inside the range are read from ArticleAccessRollup. Partial days
+    at either end of the range, and accesses that have not been rolled up yet,
+    are counted from ArticleAccess. Months are truncated in UTC, matching the
+    timezone in which accesses are stored and rolled up.
+    :return: A list of dicts with article__journal, type, month and count keys
+    """
+    watermark = get_rollup_watermark()
+    start_utc = start_date.astimezone(dt_timezone.utc)
+    end_utc = end_date.astimezone(dt_timezone.utc)
+    first_day = start_utc.date()
+    if start_utc.time() != dt_time.min:
+        first_day += timedelta(days=1)
+    last_day = end_utc.date() - timedelta(days=1)
+    whole_days_start = datetime.combine(first_day, dt_time.min, dt_timezone.utc)
+    whole_days_end = datetime.combine(
+        last_day + timedelta(days=1), dt_time.min, dt_timezone.utc
+    )
+
+    rolled_up_counts = (
+        models.ArticleAccessRollup.objects.filter(
+            type__in=["view", "download"],
+            date__range=[first_day, last_day],
+        )
+        .annotate(month=TruncMonth("date"))
+        .values("article__journal", "type", "month")
+        .annotate(count=Sum("count"))
+        .order_by()
+    )
+    access_counts = (
+        models.ArticleAccess.objects.filter(
+            type__in=["view", "download"],
+            accessed__range=[start_date, end_date],
+        )
+        .filter(
+            Q(pk__gt=watermark)
+            | Q(accessed__lt=whole_days_start)
+            | Q(accessed__gte=whole_days_end)
+        )
+        .annotate(month=TruncMonth("accessed", tzinfo=dt_timezone.utc))
+        .values("article__journal", "type", "month")
+        .annotate(count=Count("pk"))
+        .order_by()
+    )
+
+    return list(chain(rolled_up_counts, access_counts))
+
+
+def get_access_counts_since(start_date, **article_filter):
+    """Counts the accesses of each matching article since the given date
+
+    Whole days are read from ArticleAccessRollup, while the partial first day
+    and accesses that have not been rolled up yet are counted from
+    ArticleAccess, as in get_monthly_access_counts.
+    :param start_date: An aware datetime
+    :return: A dict of {article_id: count}
+    """
+    watermark = get_rollup_watermark()
+    start_utc = start_date.astimezone(dt_timezone.utc)
+    first_day = start_utc.date()
+    if start_utc.time() != dt_time.min:
+        first_day += timedelta(days=1)
+    whole_days_start = datetime.combine(first_day, dt_time.min, dt_timezone.utc)
+    article_filter = {
+        "article__{}".format(lookup): value for lookup, value in article_filter.items()
+    }
+
+    rolled_up_counts = (
+        models.ArticleAccessRollup.objects.filter(date__gte=first_day, **article_filter)
+        .values("article_id")
+        .annotate(total=Sum("count"))
+        .order_by()
+    )
+    access_counts = (
+        models.ArticleAccess.objects.filter(accessed__gte=start_date, **article_filter)
+        .filter(Q(pk__gt=watermark) | Q(accessed__lt=whole_days_start))
+        .values("article_id")
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+
+    counts = defaultdict(int)
+    for row in chain(rolled_up_counts, access_counts):
+        counts[row["article_id"]] += row["total"] or 0
+    return dict(counts)
+
+
+def _count_accesses(**article_filter):
+    """Sums historic, rolled up and new accesses for the matching articles
+    :return: A tuple of (views, downloads)
+    """
+    watermark = get_rollup_watermark()
+    counts = defaultdict(int)
+
+    historic = models.HistoricArticleAccess.objects.filter(**article_filter).aggregate(
+        views=Sum("views"), downloads=Sum("downloads")
     )
-    view_access_count = models.ArticleAccess.objects.filter(
-        type="view", article=article
-    ).count()
+    counts["view"] += historic["views"] or 0
+    counts["download"] += historic["downloads"] or 0
+
+    rolled_up_counts = (
+        models.ArticleAccessRollup.objects.filter(**article_filter)
+        .values("type")
+        .annotate(total=Sum("count"))
+        .order_by()
+    )
+    access_counts = (
+        models.ArticleAccess.objects.filter(pk__gt=watermark, **article_filter)
+        .values("type")
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+    for row in chain(rolled_up_counts, access_counts):
+        counts[row["type"]] += row["total"] or 0
+
+    return counts["view"], counts["download"]
+
 
-    return historic_record.views + view_access_count
+def get_article_access_counts(article):
+    """Returns the total views and downloads of an article
+    :param article: submission.models.Article
+    :return: A tuple of (views, downloads)
+    """
+    models.HistoricArticleAccess.objects.get_or_create(article=article)
+    return _count_accesses(article=article)
+
+
+def get_article_views(article):
+    views, _downloads = get_article_access_counts(article)
+    return views
 
 
 def get_article_downloads(article):
-    historic_record, created = models.HistoricArticleAccess.objects.get_or_create(
-        article=article
+    _views, downloads = get_article_access_counts(article)
+    return downloads
+
+
+def get_rollup_watermark():
+    """Returns the pk of the last ArticleAccess included in the rollup"""
+    watermark = (
+        models.ArticleAccessRollupWatermark.objects.filter(pk=1)
+        .values_list("last_access_id", flat=True)
+        .first()
+    )
+    return watermark or 0
+
+
+def _apply_to_rollup(accesses, sign=1):
+    """Adds (or, with a negative sign, removes) accesses to daily rollups"""
+    grouped = (
+        accesses.annotate(day=TruncDate("accessed", tzinfo=dt_timezone.utc))
+        .values("article_id", "day", "type", "galley_type", "country_id")
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+    totals = {
+        (
+            row["article_id"],
+            row["day"],
+            row["type"],
+            row["galley_type"],
+            row["country_id"],
+        ): row["total"]
+        for row in grouped
+    }
+    if not totals:
+        return
+
+    existing = {
+        (
+            rollup.article_id,
+            rollup.date,
+            rollup.type,
+            rollup.galley_type,
+            rollup.country_id,
+        ): rollup
+        for rollup in models.ArticleAccessRollup.objects.filter(
+            article_id__in={key[0] for key in totals},
+            date__in={key[1] for key in totals},
+        )
+    }
+    to_update = []
+    to_create = []
+    for key, total in totals.items():
+        rollup = existing.get(key)
+        if rollup:
+            rollup.count = max(rollup.count + sign * total, 0)
+            to_update.append(rollup)
+        elif sign > 0:
+            article_id, date, access_type, galley_type, country_id = key
+            to_create.append(
+                models.ArticleAccessRollup(
+                    article_id=article_id,
+                    date=date,
+                    type=access_type,
+                    galley_type=galley_type,
+                    country_id=country_id,
+                    count=total,
+                )
+            )
+
+    models.ArticleAccessRollup.objects.bulk_update(
+        to_update,
+        ["count"],
+        batch_size=1000,
     )
-    download_access_count = models.ArticleAccess.objects.filter(
-        type="download", article=article
-    ).count()
+    models.ArticleAccessRollup.objects.bulk_create(to_create, batch_size=1000)
+
+
+def rollup_article_accesses(batch_size=50000, lag=ROLLUP_LAG):
+    """Adds ArticleAccess rows recorded since the watermark to the rollup
+
+    Only rows older than the lag are processed, so that accesses still being
+    written by in-flight requests are not skipped by the watermark.
+    :param batch_size: The maximum number of accesses rolled up per transaction
+    :param lag: A timedelta
+    :return: The number of accesses rolled up
+    """
+    watermark = models.ArticleAccessRollupWatermark.get_solo()
+    cutoff = timezone.now() - lag
+    processed = 0
+
+    # The watermark must not pass an access newer than the cutoff, or it would
+    # be counted neither from the rollup nor from ArticleAccess
+    accesses = models.ArticleAccess.objects.filter(accessed__lt=cutoff)
+    first_recent_id = (
+        models.ArticleAccess.objects.filter(
+            pk__gt=watermark.last_access_id,
+            accessed__gte=cutoff,
+        )
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    if first_recent_id is not None:
+        accesses = accesses.filter(pk__lt=first_recent_id)
 
-    return historic_record.downloads + download_access_count
+    while True:
+        with transaction.atomic():
+            watermark = (
+                models.ArticleAccessRollupWatermark.objects.select_for_update().get(
+                    pk=1
+                )
+            )
+            access_ids = list(
+                accesses.filter(pk__gt=watermark.last_access_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not access_ids:
+                watermark.last_run = timezone.now()
+                watermark.save()
+                return processed
+
+            _apply_to_rollup(
+                accesses.filter(
+                    pk__gt=watermark.last_access_id,
+                    pk__lte=access_ids[-1],
+                )
+            )
+            processed += len(access_ids)
+            watermark.last_access_id = access_ids[-1]
+            watermark.last_run = timezone.now()
+            watermark.save()
+
+
+def adjust_access_rollup(accesses, sign):
+    """Keeps the rollup in step when rolled up accesses are removed or restored
+
+    Must be called while the accesses exist in the database: before deleting
+    them, or after restoring them. Accesses above the watermark are ignored,
+    since they are counted from ArticleAccess until the next rollup.
+    :param accesses: An ArticleAccess queryset
+    :param sign: -1 when removing the accesses, 1 when restoring them
+    """
+    with transaction.atomic():
+        watermark = (
+            models.ArticleAccessRollupWatermark.objects.select_for_update()
+            .filter(pk=1)
+            .first()
+        )
+        if watermark is None:
+            return
+        _apply_to_rollup(
+            accesses.filter(pk__lte=watermark.last_access_id),
+            sign=sign,
+        )
 
 
 def get_altmetrics(article):
@@ -239,8 +533,7 @@ class ArticleMetrics:
     alm = 0
 
     def __init__(self, article):
-        self.views = get_article_views(article)
-        self.downloads = get_article_downloads(article)
+        self.views, self.downloads = get_article_access_counts(article)
         self.alm = get_altmetrics(article)
 
 
@@ -256,7 +549,7 @@ def store_article_access(request, article, access_type, galley_type=None):
     ip = shared.get_ip_address(request)
     iso_country_code = get_iso_country_code(ip)
     country = iso_to_country_object(iso_country_code)
-    counter_tracking_id = request.session.get("counter_tracking")
+    counter_tracking_id = shared.get_counter_tracking_id(request)
 
     if user_agent and not user_agent.is_bot:
         if counter_tracking_id:
@@ -269,9 +562,21 @@ def store_article_access(request, article, access_type, galley_type=None):
             ).encode("utf-8")
             identifier = hashlib.sha512(string).hexdigest()
 
+        if settings.BUFFER_ARTICLE_ACCESSES:
+            # Deduplicated and written in bulk by flush_article_accesses
+            spool_article_access(
+                article,
+                access_type,
+                identifier,
+                galley_type,
+                country,
+                current_time,
+            )
+            return None
+
         # check if the current IP has accessed this article recently.
         with transaction.atomic():
-            time_to_check = current_time - timedelta(seconds=3600)
+            time_to_check = current_time - ACCESS_DEDUPLICATION_WINDOW
             exists = models.ArticleAccess.objects.filter(
                 article=article,
                 identifier=identifier,
@@ -304,35 +609,261 @@ def store_article_access(request, article, access_type, galley_type=None):
     return None
 
 
-@cache(300)
-def get_view_and_download_totals(articles):
-    total_views = 0
-    total_downs = 0
+def get_spool_file_path(accessed):
+    return os.path.join(
+        settings.ARTICLE_ACCESS_SPOOL_DIR,
+        accessed.astimezone(dt_timezone.utc).strftime(SPOOL_FILE_FORMAT),
+    )
+
+
+def spool_article_access(
+    article, access_type, identifier, galley_type, country, accessed
+):
+    """Appends an access to the spool file for the current minute
+
+    Each line is written with a single append, so concurrent writers from
+    several processes do not interleave.
+    """
+    os.makedirs(settings.ARTICLE_ACCESS_SPOOL_DIR, exist_ok=True)
+    line = json.dumps(
+        {
+            "article_id": article.pk,
+            "type": access_type,
+            "identifier": identifier,
+            "galley_type": galley_type,
+            "country_id": country.pk if country else None,
+            "accessed": accessed.isoformat(),
+        }
+    )
+    with open(get_spool_file_path(accessed), "a", encoding="utf-8") as spool_file:
+        spool_file.write(line + "\n")
+
+
+def get_completed_spool_files():
+    """Returns the spool files that are no longer being written to
 
-    for article in articles:
-        total_views += article.metrics.views
-        total_downs += article.metrics.downloads
+    Files for the current and the previous minute are left alone, as are files
+    being processed by another flush. Files claimed more than SPOOL_STALE_AFTER
+    ago are included, since the flush that claimed them was interrupted.
+    """
+    if not os.path.isdir(settings.ARTICLE_ACCESS_SPOOL_DIR):
+        return []
+    oldest_open_file = os.path.basename(
+        get_spool_file_path(timezone.now() - timedelta(minutes=1))
+    )
+    stale_before = time.time() - SPOOL_STALE_AFTER.total_seconds()
+
+    paths = []
+    for file_name in os.listdir(settings.ARTICLE_ACCESS_SPOOL_DIR):
+        path = os.path.join(settings.ARTICLE_ACCESS_SPOOL_DIR, file_name)
+        if not file_name.startswith("accesses-"):
+            continue
+        if file_name.endswith(SPOOL_PROCESSING_SUFFIX):
+            try:
+                if os.path.getmtime(path) < stale_before:
+                    paths.append(path)
+            except FileNotFoundError:
+                continue
+        elif file_name.endswith(".jsonl") and file_name < oldest_open_file:
+            paths.append(path)
+    return sorted(paths)
+
+
+def claim_spool_file(path):
+    """Renames a spool file so that no concurrent flush processes it
+
+    Renaming is atomic, so only one flush can claim each file, including a
+    stale file claimed by an interrupted flush. The modification time of the
+    claimed file records when it was claimed.
+    :return: The path of the claimed file, or None if another flush claimed it
+    """
+    spool_path = path[: path.index(".jsonl") + len(".jsonl")]
+    processing_path = "{}.{}{}".format(
+        spool_path,
+        uuid4().hex,
+        SPOOL_PROCESSING_SUFFIX,
+    )
+    try:
+        os.rename(path, processing_path)
+        os.utime(processing_path)
+    except FileNotFoundError:
+        return None
+    return processing_path
+
+
+def write_spooled_accesses(entries):
+    """Deduplicates spooled accesses and writes them with bulk_create
+
+    An access is dropped when the same identifier already accessed the same
+    article, type and galley type within ACCESS_DEDUPLICATION_WINDOW, either
+    in the database or earlier in the batch. This also makes replaying
+    entries that were already written harmless.
+    :param entries: An iterable of dicts as written by spool_article_access
+    :return: A list of the created ArticleAccess objects
+    """
+    from submission import models as submission_models
+
+    entries = sorted(
+        (
+            dict(entry, accessed=datetime.fromisoformat(entry["accessed"]))
+            for entry in entries
+        ),
+        key=lambda entry: entry["accessed"],
+    )
+    if not entries:
+        return []
+
+    articles = submission_models.Article.objects.in_bulk(
+        {entry["article_id"] for entry in entries}
+    )
+    country_ids = set(
+        core_models.Country.objects.filter(
+            pk__in={entry["country_id"] for entry in entries},
+        ).values_list("pk", flat=True)
+    )
+
+    # The most recent access of each key, from the database and the batch
+    last_accessed = {}
+    existing = models.ArticleAccess.objects.filter(
+        article_id__in=articles.keys(),
+        identifier__in={entry["identifier"] for entry in entries},
+        accessed__gte=entries[0]["accessed"] - ACCESS_DEDUPLICATION_WINDOW,
+    ).values_list("article_id", "identifier", "type", "galley_type", "accessed")
+    for article_id, identifier, access_type, galley_type, accessed in existing:
+        key = (article_id, identifier, access_type, galley_type)
+        last_accessed[key] = max(accessed, last_accessed.get(key, accessed))
+
+    accesses = []
+    for entry in entries:
+        article = articles.get(entry["article_id"])
+        if article is None:
+            continue
+        key = (
+            entry["article_id"],
+            entry["identifier"],
+            entry["type"],
+            entry["galley_type"],
+        )
+        previous = last_accessed.get(key)
+        if previous and previous >= entry["accessed"] - ACCESS_DEDUPLICATION_WINDOW:
+            continue
+        last_accessed[key] = entry["accessed"]
+        accesses.append(
+            models.ArticleAccess(
+                article=article,
+                type=entry["type"],
+                identifier=entry["identifier"],
+                galley_type=entry["galley_type"],
+                country_id=(
+                    entry["country_id"] if entry["country_id"] in country_ids else None
+                ),
+                accessed=entry["accessed"],
+            )
+        )
+
+    accesses = models.ArticleAccess.objects.bulk_create(accesses, batch_size=1000)
+    for access in accesses:
+        # Spooled accesses are written outside of the request cycle
+        event_logic.Events.raise_event(
+            event_logic.Events.ON_ARTICLE_ACCESS,
+            task_object=access.article,
+            article_access=access,
+            article=access.article,
+            request=None,
+        )
+
+    return accesses
+
+
+def flush_article_access_spool():
+    """Writes the accesses from completed spool files to the database
+    :return: A tuple of (entries read, accesses written)
+    """
+    read = written = 0
+    for path in get_completed_spool_files():
+        processing_path = claim_spool_file(path)
+        if processing_path is None:
+            # Claimed by a concurrent flush
+            continue
+
+        entries = []
+        try:
+            with open(processing_path, encoding="utf-8") as spool_file:
+                for line in spool_file:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        logger.warning(
+                            "Skipping malformed access in {}: {}".format(
+                                processing_path, line
+                            )
+                        )
+        except FileNotFoundError:
+            # Taken over by a concurrent flush
+            continue
+
+        with transaction.atomic():
+            written += len(write_spooled_accesses(entries))
+        read += len(entries)
+        try:
+            os.remove(processing_path)
+        except FileNotFoundError:
+            pass
 
-    return total_views, total_downs
+    return read, written
+
+
+@cache(300)
+def get_view_and_download_totals(articles):
+    return _count_accesses(article__in=articles)
 
 
 def iso_to_country_object(code):
+    """Returns the Country for an ISO code, from a process-wide map
+
+    Codes are cached as they are looked up, including misses, and the map is
+    cleared whenever a Country is saved or deleted.
+    """
     if settings.DEBUG:
         code = "GB"
-    try:
-        return core_models.Country.objects.get(code=code)
-    except core_models.Country.DoesNotExist:
-        return None
+    with _country_lock:
+        if code in _countries_by_code:
+            return _countries_by_code[code]
+
+    country = core_models.Country.objects.filter(code=code).first()
+    with _country_lock:
+        _countries_by_code[code] = country
+    return country
+
+
+@receiver(post_save, sender="core.Country")
+@receiver(post_delete, sender="core.Country")
+def clear_country_map(**kwargs):
+    with _country_lock:
+        _countries_by_code.clear()
+
+
+def get_geoip_reader():
+    """Returns a process-wide, memory mapped reader for the GeoLite2 database"""
+    global _geoip_reader
+    if _geoip_reader is None:
+        with _geoip_lock:
+            if _geoip_reader is None:
+                _geoip_reader = geoip2.database.Reader(
+                    GEOIP_DB_PATH,
+                    mode=geoip2.database.MODE_MMAP,
+                )
+    return _geoip_reader
 
 
+@lru_cache(maxsize=GEOIP_CACHE_SIZE)
 def get_iso_country_code(ip):
-    db_path = os.path.join(
-        settings.BASE_DIR,
-        "metrics",
-        "geolocation",
-        "GeoLite2-Country.mmdb",
-    )
-    reader = geoip2.database.Reader(db_path)
+    """Returns the ISO country code for an IP address
+
+    Results for recently seen addresses are memoised, since readers tend to
+    make several requests in quick succession.
+    """
+    reader = get_geoip_reader()
 
     try:
         response = reader.country(ip)
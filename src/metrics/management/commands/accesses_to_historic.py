@@ -5,8 +5,9 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.conf import settings
 from django.core import serializers
+from django.db import transaction
 
-from metrics import models
+from metrics import logic, models
 
 
 class Command(BaseCommand):
@@ -51,10 +52,14 @@ class Command(BaseCommand):
                 data = serializers.serialize("json", article_accesses, indent=4)
                 f.write(data)
 
-        for access in article_accesses:
-            if access.type == "view":
-                access.article.historicarticleaccess.add_one_view()
-            elif access.type == "download":
-                access.article.historicarticleaccess.add_one_download()
+        with transaction.atomic():
+            # Remove the accesses from the rollup so they are not counted twice
+            logic.adjust_access_rollup(article_accesses, sign=-1)
 
-            access.delete()
+            for access in article_accesses:
+                if access.type == "view":
+                    access.article.historicarticleaccess.add_one_view()
+                elif access.type == "download":
+                    access.article.historicarticleaccess.add_one_download()
+
+                access.delete()
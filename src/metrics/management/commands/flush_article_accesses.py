@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from metrics import logic
+
+
+class Command(BaseCommand):
+    """
+    Writes article accesses spooled by store_article_access, when
+    BUFFER_ARTICLE_ACCESSES is enabled, to the database in bulk.
+    """
+
+    help = "Deduplicates and stores spooled article accesses."
+
+    def handle(self, *args, **options):
+        read, written = logic.flush_article_access_spool()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Read {0} spooled accesses, stored {1}.".format(read, written)
+            )
+        )
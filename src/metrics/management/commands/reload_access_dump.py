@@ -4,6 +4,8 @@ from django.core.management.base import BaseCommand
 from django.conf import settings
 from django.core import serializers
 
+from metrics import logic, models
+
 
 class Command(BaseCommand):
     """
@@ -41,10 +43,18 @@ class Command(BaseCommand):
         with open(file_path, encoding="utf-8") as f:
             data = f.read()
 
+        restored_pks = []
         for obj in serializers.deserialize("json", data):
             obj.save()
+            restored_pks.append(obj.object.pk)
 
             if obj.object.type == "view":
                 obj.object.article.historicarticleaccess.remove_one_view()
             elif obj.object.type == "download":
                 obj.object.article.historicarticleaccess.remove_one_download()
+
+        # Restored accesses below the rollup watermark must be rolled up again
+        logic.adjust_access_rollup(
+            models.ArticleAccess.objects.filter(pk__in=restored_pks),
+            sign=1,
+        )
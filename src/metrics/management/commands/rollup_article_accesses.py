@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from metrics import logic
+
+
+class Command(BaseCommand):
+    """
+    Rolls up ArticleAccess rows recorded since the last run into daily
+    ArticleAccessRollup totals, which the metrics read paths count from.
+    """
+
+    help = "Rolls up new article accesses into daily access totals."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=50000,
+            help="Maximum number of accesses rolled up per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        processed = logic.rollup_article_accesses(
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS("Rolled up {0} article accesses.".format(processed))
+        )
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.29 on 2026-10-18 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0111_merge_20260603_2206"),
+        ("submission", "0089_merge_20260226_1524"),
+        ("metrics", "0011_articlelink_source_booklink_source_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleAccessRollupWatermark",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last_access_id", models.PositiveBigIntegerField(default=0)),
+                ("last_run", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ArticleAccessRollup",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("download", "Download"), ("view", "View")],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "galley_type",
+                    models.CharField(blank=True, max_length=200, null=True),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "article",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="submission.article",
+                    ),
+                ),
+                (
+                    "country",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="core.country",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "article access rollups",
+                "indexes": [
+                    models.Index(
+                        fields=["date", "type"],
+                        name="metrics_rollup_date_type_idx",
+                    )
+                ],
+                "unique_together": {
+                    ("article", "date", "type", "galley_type", "country")
+                },
+            },
+        ),
+    ]
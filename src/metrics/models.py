@@ -76,6 +76,58 @@ class HistoricArticleAccess(models.Model):
         self.save()
 
 
+class ArticleAccessRollup(models.Model):
+    """Daily totals of ArticleAccess rows, maintained by rollup_article_accesses"""
+
+    article = models.ForeignKey(
+        "submission.Article",
+        on_delete=models.CASCADE,
+    )
+    date = models.DateField()
+    type = models.CharField(max_length=20, choices=access_choices())
+    galley_type = models.CharField(max_length=200, null=True, blank=True)
+    country = models.ForeignKey(
+        "core.Country",
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "article access rollups"
+        unique_together = ("article", "date", "type", "galley_type", "country")
+        indexes = [
+            models.Index(fields=["date", "type"], name="metrics_rollup_date_type_idx"),
+        ]
+
+    def __str__(self):
+        return "Article {0}, {1} {2}s on {3}".format(
+            self.article_id, self.count, self.type, self.date
+        )
+
+
+class ArticleAccessRollupWatermark(models.Model):
+    """Records the last ArticleAccess included in ArticleAccessRollup
+
+    Rows with a primary key above the watermark have not been rolled up yet
+    and are counted from ArticleAccess directly.
+    """
+
+    last_access_id = models.PositiveBigIntegerField(default=0)
+    last_run = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return "Accesses rolled up to {0} at {1}".format(
+            self.last_access_id, self.last_run
+        )
+
+    @classmethod
+    def get_solo(cls):
+        watermark, _created = cls.objects.get_or_create(pk=1)
+        return watermark
+
+
 def object_types():
     return (
         ("book", "Book"),
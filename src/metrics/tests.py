@@ -1,12 +1,19 @@
 import datetime
+import os
 import pytz
+import shutil
+import tempfile
+import time
 
 from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from freezegun import freeze_time
+import mock
 
-from metrics.models import ArticleAccess
+from core.models import Country
+from metrics import logic
+from metrics.models import ArticleAccess, ArticleAccessRollup
 from utils import install
 from utils.testing import helpers
 from utils.shared import clear_cache
@@ -48,6 +55,20 @@ class ArticleAccessTests(TestCase):
             "A 'view' has not been recorded for abstract when no render galley",
         )
 
+    def test_cookieless_requests_are_counted_once(self):
+        for _request in range(2):
+            # Clients such as bots and harvesters never return the cookie
+            self.client.cookies.clear()
+            self.client.get(
+                self.article_url + "/",
+                SERVER_NAME=self.journal_one.domain,
+                HTTP_USER_AGENT="Chrome/39.0.2171.95 Safari/537.36",
+            )
+        self.assertEqual(
+            ArticleAccess.objects.filter(article=self.article, type="view").count(),
+            1,
+        )
+
     def test_article_access_when_view_render_galley(self):
         galley_type = "html"
         galley = helpers.create_galley(self.article, type=galley_type, public=True)
@@ -116,3 +137,295 @@ class ArticleAccessTests(TestCase):
             ).exists(),
             "No 'download' recorded when downloading PDF galley",
         )
+
+
+class PressTotalsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.press = helpers.create_press()
+        cls.journal_one, cls.journal_two = helpers.create_journals()
+        cls.article_one = helpers.create_article(cls.journal_one)
+        cls.article_two = helpers.create_article(cls.journal_one)
+        cls.article_three = helpers.create_article(cls.journal_two)
+        accesses = [
+            (cls.article_one, "view", datetime.datetime(2024, 1, 5, tzinfo=pytz.UTC)),
+            (cls.article_one, "view", datetime.datetime(2024, 1, 31, tzinfo=pytz.UTC)),
+            (
+                cls.article_two,
+                "download",
+                datetime.datetime(2024, 1, 9, tzinfo=pytz.UTC),
+            ),
+            (cls.article_three, "view", datetime.datetime(2024, 2, 1, tzinfo=pytz.UTC)),
+            (cls.article_three, "view", datetime.datetime(2025, 2, 1, tzinfo=pytz.UTC)),
+        ]
+        for article, access_type, accessed in accesses:
+            ArticleAccess.objects.create(
+                article=article,
+                type=access_type,
+                identifier="test",
+                accessed=accessed,
+            )
+        cls.start_date = datetime.datetime(2024, 1, 1, tzinfo=pytz.UTC)
+        cls.end_date = datetime.datetime(2024, 2, 29, tzinfo=pytz.UTC)
+        cls.report_months = [
+            datetime.datetime(2024, 1, 1, tzinfo=pytz.UTC),
+            datetime.datetime(2024, 2, 1, tzinfo=pytz.UTC),
+        ]
+
+    def setUp(self):
+        clear_cache()
+
+    def get_journal_totals(self, journals, journal):
+        return next(j for j in journals if j["journal"] == journal)
+
+    def test_press_totals(self):
+        total, views, downloads, press_months, journals = logic.get_press_totals(
+            self.start_date,
+            self.end_date,
+            self.report_months,
+        )
+        self.assertEqual((total, views, downloads), (4, 3, 1))
+        self.assertEqual(press_months, {"Jan-2024": 3, "Feb-2024": 1})
+
+    def test_journal_monthly_totals(self):
+        *_, journals = logic.get_press_totals(
+            self.start_date,
+            self.end_date,
+            self.report_months,
+        )
+        journal = self.get_journal_totals(journals, self.journal_one)
+        self.assertEqual(journal["total"], 3)
+        self.assertEqual(journal["Jan-2024-views"], 2)
+        self.assertEqual(journal["Jan-2024-downloads"], 1)
+        self.assertEqual(journal["Feb-2024"], "")
+        self.assertEqual(
+            journal["reporting_periods"],
+            [
+                ("2024-01-01", "2024-01-31", 3, 2, 1),
+                ("2024-02-01", "2024-02-29", "", "", ""),
+            ],
+        )
+
+    def test_compat_months_default_to_zero(self):
+        *_, journals = logic.get_press_totals(
+            self.start_date,
+            self.end_date,
+            self.report_months,
+            compat=True,
+        )
+        journal = self.get_journal_totals(journals, self.journal_two)
+        self.assertEqual(journal["Jan-2024"], 0)
+        self.assertEqual(journal["Feb-2024-views"], 1)
+
+    def test_press_totals_after_rollup(self):
+        logic.rollup_article_accesses(lag=datetime.timedelta(0))
+        total, views, downloads, press_months, journals = logic.get_press_totals(
+            self.start_date,
+            self.end_date,
+            self.report_months,
+        )
+        self.assertEqual((total, views, downloads), (4, 3, 1))
+        self.assertEqual(press_months, {"Jan-2024": 3, "Feb-2024": 1})
+
+
+class ArticleAccessRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.press = helpers.create_press()
+        cls.journal_one, cls.journal_two = helpers.create_journals()
+        cls.article = helpers.create_article(cls.journal_one)
+        for access_type, day in [("view", 1), ("view", 1), ("download", 2)]:
+            ArticleAccess.objects.create(
+                article=cls.article,
+                type=access_type,
+                identifier="test",
+                accessed=datetime.datetime(2024, 1, day, 12, tzinfo=pytz.UTC),
+            )
+
+    def setUp(self):
+        clear_cache()
+
+    def test_rollup_groups_accesses_by_day(self):
+        processed = logic.rollup_article_accesses(lag=datetime.timedelta(0))
+        self.assertEqual(processed, 3)
+        self.assertEqual(
+            set(
+                ArticleAccessRollup.objects.values_list("date", "type", "count"),
+            ),
+            {
+                (datetime.date(2024, 1, 1), "view", 2),
+                (datetime.date(2024, 1, 2), "download", 1),
+            },
+        )
+
+    def test_rollup_is_incremental(self):
+        logic.rollup_article_accesses(lag=datetime.timedelta(0))
+        ArticleAccess.objects.create(
+            article=self.article,
+            type="view",
+            identifier="test",
+            accessed=datetime.datetime(2024, 1, 1, 18, tzinfo=pytz.UTC),
+        )
+        processed = logic.rollup_article_accesses(lag=datetime.timedelta(0))
+        self.assertEqual(processed, 1)
+        self.assertEqual(
+            ArticleAccessRollup.objects.get(type="view").count,
+            3,
+        )
+
+    def test_rollup_stops_before_recent_accesses(self):
+        ArticleAccess.objects.create(
+            article=self.article,
+            type="view",
+            identifier="test",
+        )
+        ArticleAccess.objects.create(
+            article=self.article,
+            type="view",
+            identifier="test",
+            accessed=datetime.datetime(2024, 1, 3, 12, tzinfo=pytz.UTC),
+        )
+        processed = logic.rollup_article_accesses()
+        self.assertEqual(processed, 3)
+        self.assertEqual(logic.get_article_access_counts(self.article), (4, 1))
+
+    def test_counts_include_accesses_not_rolled_up(self):
+        logic.rollup_article_accesses(lag=datetime.timedelta(0))
+        ArticleAccess.objects.create(
+            article=self.article,
+            type="download",
+            identifier="test",
+        )
+        self.assertEqual(logic.get_article_access_counts(self.article), (2, 2))
+
+    def test_adjust_rollup_when_accesses_removed(self):
+        logic.rollup_article_accesses(lag=datetime.timedelta(0))
+        downloads = ArticleAccess.objects.filter(type="download")
+        logic.adjust_access_rollup(downloads, sign=-1)
+        downloads.delete()
+        self.assertEqual(logic.get_article_access_counts(self.article), (2, 0))
+
+
+class GeolocationTests(TestCase):
+    def setUp(self):
+        logic.get_iso_country_code.cache_clear()
+        logic.clear_country_map()
+
+    @mock.patch("metrics.logic.get_geoip_reader")
+    def test_country_code_lookups_are_memoised(self, get_reader):
+        get_reader.return_value.country.return_value.country.iso_code = "FR"
+        self.assertEqual(logic.get_iso_country_code("192.0.2.1"), "FR")
+        self.assertEqual(logic.get_iso_country_code("192.0.2.1"), "FR")
+        get_reader.return_value.country.assert_called_once_with("192.0.2.1")
+
+    @override_settings(DEBUG=False)
+    def test_country_objects_are_cached(self):
+        country = Country.objects.create(code="FR", name="France")
+        self.assertEqual(logic.iso_to_country_object("FR"), country)
+        with self.assertNumQueries(0):
+            self.assertEqual(logic.iso_to_country_object("FR"), country)
+
+    @override_settings(DEBUG=False)
+    def test_country_map_cleared_on_save(self):
+        self.assertIsNone(logic.iso_to_country_object("FR"))
+        country = Country.objects.create(code="FR", name="France")
+        self.assertEqual(logic.iso_to_country_object("FR"), country)
+
+
+class SpooledArticleAccessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.press = helpers.create_press()
+        cls.journal_one, cls.journal_two = helpers.create_journals()
+        cls.article = helpers.create_article(
+            cls.journal_one,
+            date_published=datetime.datetime(1988, 4, 24, tzinfo=pytz.UTC),
+            stage="Published",
+        )
+
+    def setUp(self):
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir)
+        override = override_settings(
+            BUFFER_ARTICLE_ACCESSES=True,
+            ARTICLE_ACCESS_SPOOL_DIR=self.spool_dir,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def spool(self, identifier, accessed, access_type="view"):
+        logic.spool_article_access(
+            self.article, access_type, identifier, None, None, accessed
+        )
+
+    @mock.patch("metrics.logic.get_iso_country_code", return_value=None)
+    def test_store_article_access_is_spooled(self, _get_country_code):
+        request = helpers.Request()
+        request.META["HTTP_USER_AGENT"] = "Chrome/39.0.2171.95 Safari/537.36"
+        request.META["REMOTE_ADDR"] = "192.0.2.1"
+        request.session = {}
+        self.assertIsNone(logic.store_article_access(request, self.article, "view"))
+        self.assertFalse(ArticleAccess.objects.exists())
+        self.assertEqual(len(os.listdir(self.spool_dir)), 1)
+
+    def test_flush_deduplicates_within_the_window(self):
+        with freeze_time("2025-01-01 12:00:00"):
+            self.spool("reader", timezone.now())
+            self.spool("reader", timezone.now() + datetime.timedelta(minutes=10))
+            self.spool("reader", timezone.now() + datetime.timedelta(minutes=90))
+            self.spool("other-reader", timezone.now())
+            self.spool("reader", timezone.now(), access_type="download")
+        with freeze_time("2025-01-01 14:00:00"):
+            read, written = logic.flush_article_access_spool()
+
+        self.assertEqual((read, written), (5, 4))
+        self.assertEqual(
+            ArticleAccess.objects.filter(identifier="reader", type="view").count(),
+            2,
+        )
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_flush_deduplicates_against_stored_accesses(self):
+        with freeze_time("2025-01-01 12:00:00"):
+            ArticleAccess.objects.create(
+                article=self.article,
+                type="view",
+                identifier="reader",
+                accessed=timezone.now(),
+            )
+            self.spool("reader", timezone.now() + datetime.timedelta(minutes=5))
+        with freeze_time("2025-01-01 14:00:00"):
+            self.assertEqual(logic.flush_article_access_spool(), (1, 0))
+
+    def test_flush_skips_files_still_being_written(self):
+        with freeze_time("2025-01-01 12:00:30"):
+            self.spool("reader", timezone.now())
+            self.assertEqual(logic.flush_article_access_spool(), (0, 0))
+        self.assertEqual(len(os.listdir(self.spool_dir)), 1)
+
+    def spool_processing_file(self, claimed):
+        accessed = datetime.datetime(2025, 1, 1, 12, tzinfo=pytz.UTC)
+        self.spool("reader", accessed)
+        path = logic.get_spool_file_path(accessed)
+        processing_path = path + ".claimed" + logic.SPOOL_PROCESSING_SUFFIX
+        os.rename(path, processing_path)
+        os.utime(processing_path, (claimed, claimed))
+        return processing_path
+
+    def test_flush_skips_files_claimed_by_a_running_flush(self):
+        processing_path = self.spool_processing_file(time.time())
+        self.assertEqual(logic.flush_article_access_spool(), (0, 0))
+        self.assertEqual(
+            os.listdir(self.spool_dir), [os.path.basename(processing_path)]
+        )
+
+    def test_flush_takes_over_files_left_by_an_interrupted_flush(self):
+        stale = time.time() - logic.SPOOL_STALE_AFTER.total_seconds() - 60
+        self.spool_processing_file(stale)
+        self.assertEqual(logic.flush_article_access_spool(), (1, 1))
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_flush_skips_files_removed_by_a_concurrent_flush(self):
+        path = os.path.join(self.spool_dir, "accesses-202501011200.jsonl")
+        with mock.patch("metrics.logic.get_completed_spool_files", return_value=[path]):
+            self.assertEqual(logic.flush_article_access_spool(), (0, 0))
@@ -399,7 +399,7 @@ class Press(AbstractSiteModel):
     def publishes_journals(self):
         return self.journals(is_conference=False).count() > 0
 
-    @cache(600)
+    @cache(600, depends_on=["repository.Repository"])
     def live_repositories(self):
         from repository import models as repository_models
 
@@ -407,7 +407,7 @@ class Press(AbstractSiteModel):
             live=True,
         )
 
-    @cache(600)
+    @cache(600, depends_on=["repository.Subject"])
     def preprint_editors(self):
         from repository import models as repository_models
 
@@ -433,7 +433,7 @@ class Press(AbstractSiteModel):
 
         return True
 
-    @cache(600)
+    @cache(600, depends_on=["cms.NavigationItem"])
     def navigation_items(self):
         return utils.get_navigation_items(self)
 
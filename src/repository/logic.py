@@ -482,7 +482,7 @@ def store_preprint_access(request, preprint, file=None):
         ip = shared.get_ip_address(request)
         iso_country_code = get_iso_country_code(ip)
         country = iso_to_country_object(iso_country_code)
-        counter_tracking_id = request.session.get("counter_tracking")
+        counter_tracking_id = shared.get_counter_tracking_id(request)
         identifier = counter_tracking_id if counter_tracking_id else hash(ip)
 
         # Check if someone with this identifier has accessed the same file
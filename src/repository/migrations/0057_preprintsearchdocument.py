@@ -0,0 +1,58 @@
+# Generated by Django 4.2.29 on 2026-10-18 10:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("repository", "0056_preprintfile_text"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PreprintSearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "document",
+                    django.contrib.postgres.search.SearchVectorField(
+                        blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "date_populated",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "preprint",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="repository.preprint",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+                "required_db_vendor": "postgresql",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="preprintsearchdocument",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["document"], name="repository_preprint_doc_idx"
+            ),
+        ),
+    ]
@@ -11,10 +11,13 @@ from dateutil import parser as dateparser
 import warnings
 import csv
 
-from django.db import connection, DEFAULT_DB_ALIAS, models
-from django.db.models import Q, Max, Subquery, OuterRef
+from django.db import DEFAULT_DB_ALIAS, models
+from django.db.models import Q, Max, Subquery, OuterRef, Value
+from django.db.models.functions import Concat
 from django.db.models.query import RawQuerySet
 from django.db.models.sql.query import get_order_dir
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.search import (
     SearchQuery,
     SearchRank,
@@ -590,6 +593,7 @@ class RepositoryFieldAnswer(models.Model):
 
 
 class PreprintSearchManager(model_utils.BaseSearchManagerMixin):
+    search_document_field = "search_document__document"
     SORT_KEYS = {
         "-title",
         "title",
@@ -704,17 +708,11 @@ class PreprintSearchManager(model_utils.BaseSearchManagerMixin):
 
         queryset = queryset.order_by("id").distinct("id")
 
-        inner_sql = self.stringify_queryset(queryset)
-
         if "relevance" in sort:
-            return self.model.objects.raw(
-                f"SELECT * from ({inner_sql}) AS search ORDER BY relevance DESC"
-            )
+            order_by_sql = "ORDER BY relevance DESC"
         else:
             order_by_sql = self.build_order_by_sql(sort)
-            return self.model.objects.raw(
-                f"SELECT * from ({inner_sql}) AS search {order_by_sql}"
-            )
+        return self.get_search_results(queryset, order_by_sql)
 
     def _latest_version_subq(self):
         return Subquery(
@@ -738,19 +736,23 @@ class PreprintSearchManager(model_utils.BaseSearchManagerMixin):
         lookups = {}
         annotations = {"relevance": models.Value(1.0, models.FloatField())}
         vectors = []
-        if search_filters.get("title"):
-            vectors.append(SearchVector("title", weight="A"))
-        if search_filters.get("keywords"):
-            vectors.append(SearchVector("keywords__word", weight="B"))
-        if search_filters.get("authors"):
-            vectors.append(
-                SearchVector("preprintauthor__account__last_name", weight="B")
-            )
-            vectors.append(
-                SearchVector("preprintauthor__account__first_name", weight="B")
-            )
-        if search_filters.get("abstract"):
-            vectors.append(SearchVector("abstract", weight="C"))
+        document_vector = self.get_search_document_vector(search_filters)
+        if document_vector is not None:
+            vectors.append(document_vector)
+        else:
+            if search_filters.get("title"):
+                vectors.append(SearchVector("title", weight="A"))
+            if search_filters.get("keywords"):
+                vectors.append(SearchVector("keywords__word", weight="B"))
+            if search_filters.get("authors"):
+                vectors.append(
+                    SearchVector("preprintauthor__account__last_name", weight="B")
+                )
+                vectors.append(
+                    SearchVector("preprintauthor__account__first_name", weight="B")
+                )
+            if search_filters.get("abstract"):
+                vectors.append(SearchVector("abstract", weight="C"))
         if search_filters.get("full_text"):
             FileTextModel = swapper.load_model("core", "FileText")
             field_type = FileTextModel._meta.get_field("contents")
@@ -776,17 +778,14 @@ class PreprintSearchManager(model_utils.BaseSearchManagerMixin):
             relevance = SearchRank(vector, query)
             annotations["relevance"] = relevance
             lookups["relevance__gte"] = 0.01
+            if document_vector is not None and not search_filters.get("full_text"):
+                # Lets the GIN index of the documents find the candidate rows
+                lookups["search_document__document"] = query
 
         if search_filters.get("ORCID"):
             lookups["preprintauthor__account__orcid"] = search_term
         return lookups, annotations
 
-    @staticmethod
-    def stringify_queryset(queryset):
-        sql, params = queryset.query.sql_with_params()
-        with connection.cursor() as cursor:
-            return cursor.mogrify(sql, params).decode()
-
 
 class Preprint(models.Model):
     objects = PreprintSearchManager()
@@ -952,9 +951,12 @@ class Preprint(models.Model):
 
     @property
     def authors(self):
-        preprint_authors = PreprintAuthor.objects.filter(
-            preprint=self,
-        ).select_related("account")
+        if "preprintauthor_set" in getattr(self, "_prefetched_objects_cache", {}):
+            preprint_authors = self.preprintauthor_set.all()
+        else:
+            preprint_authors = PreprintAuthor.objects.filter(
+                preprint=self,
+            ).select_related("account")
 
         return [pa.account for pa in preprint_authors if pa.account]
 
@@ -1115,7 +1117,7 @@ class Preprint(models.Model):
         return None
 
     @property
-    @cache(600)
+    @cache(600, depends_on=["repository.Repository", "press.Press"])
     def url(self):
         return self.repository.site_url(path=self.local_url)
 
@@ -1460,6 +1462,49 @@ class PreprintAuthor(models.Model):
             return self.account.institution
 
 
+class PreprintSearchDocument(model_utils.AbstractSearchDocument):
+    preprint = models.OneToOneField(
+        Preprint,
+        on_delete=models.CASCADE,
+        related_name="search_document",
+    )
+
+    source_field = "preprint"
+
+    class Meta(model_utils.AbstractSearchDocument.Meta):
+        indexes = [
+            GinIndex(fields=["document"], name="repository_preprint_doc_idx"),
+        ]
+
+    def __str__(self):
+        return "Search document of preprint {}".format(self.preprint_id)
+
+    @classmethod
+    def get_document_vector(cls):
+        keywords = (
+            KeywordPreprint.objects.filter(preprint=OuterRef("pk"))
+            .values("preprint")
+            .annotate(words=StringAgg("keyword__word", delimiter=" "))
+            .values("words")
+        )
+        authors = (
+            PreprintAuthor.objects.filter(preprint=OuterRef("pk"))
+            .values("preprint")
+            .annotate(
+                names=StringAgg(
+                    Concat("account__first_name", Value(" "), "account__last_name"),
+                    delimiter=" ",
+                )
+            )
+            .values("names")
+        )
+        return (
+            SearchVector("title", weight="A")
+            + SearchVector(Subquery(keywords), Subquery(authors), weight="B")
+            + SearchVector("abstract", weight="C")
+        )
+
+
 class Author(models.Model):
     """
     Deprecated. Please use PreprintAuthor instead.
@@ -2220,3 +2265,30 @@ def update_preprint_file_index(sender, instance, created, **kwargs):
         return
 
     instance.index_full_text()
+
+
+@receiver(models.signals.post_save, sender=Preprint)
+def update_preprint_search_document(sender, instance, update_fields=None, **kwargs):
+    if kwargs.get("raw"):
+        return
+    if update_fields is not None and not {"title", "abstract"} & set(update_fields):
+        return
+    PreprintSearchDocument.schedule_update(instance.pk)
+
+
+@receiver(models.signals.post_save, sender=PreprintAuthor)
+@receiver(models.signals.post_delete, sender=PreprintAuthor)
+@receiver(models.signals.post_save, sender=KeywordPreprint)
+@receiver(models.signals.post_delete, sender=KeywordPreprint)
+def update_related_preprint_search_document(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    PreprintSearchDocument.schedule_update(instance.preprint_id)
+
+
+@receiver(models.signals.m2m_changed, sender=Preprint.keywords.through)
+def update_keyword_preprint_search_document(sender, instance, action, **kwargs):
+    if action in {"post_add", "post_remove", "post_clear"} and isinstance(
+        instance, Preprint
+    ):
+        PreprintSearchDocument.schedule_update(instance.pk)
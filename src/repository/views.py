@@ -42,6 +42,7 @@ from utils import (
     logic as utils_logic,
     models as utils_models,
     shared as utils_shared,
+    sitemaps,
 )
 from events import logic as event_logic
 from security.decorators import (
@@ -120,10 +121,11 @@ def repository_home(
     )
 
 
-def sitemap(request, subject_id=None):
+def sitemap(request, subject_id=None, page=None):
     """
     :param request: HttpRequest object
     :param subject_id: Int, primary key of a Subject object
+    :param page: Int, the shard of a sharded sitemap
     :return: HttpResponse
     """
     if subject_id:
@@ -134,7 +136,7 @@ def sitemap(request, subject_id=None):
         )
         path_parts = [
             request.repository.code,
-            "{}_sitemap.xml".format(subject.pk),
+            sitemaps.ShardedSitemap.get_file_name(subject.pk, int(page or 1)),
         ]
     else:
         path_parts = [
@@ -401,12 +403,15 @@ def repository_list(request):
             )
 
     if isinstance(preprints, RawQuerySet):
-        # RawQuerySets (used for postgres relevance sort) don't support .order_by() or pagination
-        preprints_list = list(preprints)
-        paginator = Paginator(preprints_list, 15)
+        # Postgres search results are already sorted and are counted and
+        # sliced in the database, so only the page shown is loaded
+        preprints = preprints.prefetch_related(
+            "submission_type",
+            "organisation_units",
+        )
     else:
         preprints = preprints.order_by("-date_published")
-        paginator = Paginator(preprints, 15)
+    paginator = Paginator(preprints, 15)
     page = request.GET.get("page", 1)
 
     try:
@@ -2623,12 +2623,10 @@ def reviewer_article_file(request, assignment_id, file_id):
 def review_download_all_files(request, assignment_id):
     review_assignment = models.ReviewAssignment.objects.get(pk=assignment_id)
 
-    zip_file, file_name = files.zip_article_files(
+    return files.serve_article_files_zip(
         review_assignment.review_round.review_files.all(),
     )
 
-    return files.serve_temp_file(zip_file, file_name)
-
 
 @editor_is_not_author
 @editor_user_required
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.29 on 2026-10-18 10:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("submission", "0089_merge_20260226_1524"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleSearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "document",
+                    django.contrib.postgres.search.SearchVectorField(
+                        blank=True, editable=False, null=True
+                    ),
+                ),
+                (
+                    "date_populated",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "article",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="submission.article",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+                "required_db_vendor": "postgresql",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="articlesearchdocument",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["document"], name="submission_article_doc_idx"
+            ),
+        ),
+    ]
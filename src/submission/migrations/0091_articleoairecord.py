@@ -0,0 +1,65 @@
+# Generated by Django 4.2.29 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("submission", "0090_articlesearchdocument"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleOAIRecord",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "record_format",
+                    models.CharField(
+                        choices=[
+                            ("oai_dc", "Dublin Core record"),
+                            ("stub", "JATS metadata record"),
+                            ("jats", "JATS of the render galley"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "document",
+                    models.TextField(
+                        blank=True,
+                        help_text="Empty when there is nothing to render, such as an article without a JATS galley.",
+                    ),
+                ),
+                (
+                    "source_last_modified",
+                    models.DateTimeField(blank=True, null=True),
+                ),
+                (
+                    "date_rendered",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "article",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="oai_records",
+                        to="submission.article",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("article", "record_format")},
+            },
+        ),
+    ]
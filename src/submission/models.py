@@ -15,13 +15,16 @@ from iso639 import Lang
 from django.apps import apps
 from django.urls import reverse
 from django.db import (
-    connection,
     DEFAULT_DB_ALIAS,
     models,
 )
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Concat
 from django.db.models.query import RawQuerySet
 from django.db.models.sql.query import get_order_dir
 from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import GinIndex
 from django.contrib.postgres.search import (
     SearchQuery,
     SearchRank,
@@ -33,7 +36,7 @@ from django.utils.translation import gettext_lazy as _
 from django.template import Context, Template
 from django.template.loader import render_to_string
 from django.templatetags.static import static
-from django.db.models.signals import pre_delete, m2m_changed
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.core import exceptions
 from django.utils.functional import cached_property
@@ -809,6 +812,7 @@ class ArticlePrefetchAuthorsManager(ArticleManager):
 
 
 class ArticleSearchManager(BaseSearchManagerMixin):
+    search_document_field = "search_document__document"
     SORT_KEYS = {
         "-title",
         "title",
@@ -889,20 +893,13 @@ class ArticleSearchManager(BaseSearchManagerMixin):
         # We can't use the ORM for sorting because it is not possible to select
         # a column from a subquery filter and postgres sorting requires
         # distinct fields to match order_by fields
-        inner_sql = self.stringify_queryset(queryset)
-
         if "relevance" in sort:
             # Relevance is not a field but an annotation
-            return Article.objects.raw(
-                f"SELECT * from ({inner_sql}) AS search ORDER BY relevance DESC"
-            )
+            order_by_sql = "ORDER BY relevance DESC"
         else:
             order_by_sql = self.build_order_by_sql(sort)
 
-            return Article.objects.raw(
-                f"SELECT * from ({inner_sql}) AS search {order_by_sql}"
-            )
-            return queryset.order_by(sort)
+        return self.get_search_results(queryset, order_by_sql)
 
     def build_order_by_sql(self, sort_key):
         """Compiles and returns the ORDER BY statement in sql for the sort_key
@@ -941,15 +938,19 @@ class ArticleSearchManager(BaseSearchManagerMixin):
         lookups = {}
         annotations = {"relevance": models.Value(1.0, models.FloatField())}
         vectors = []
-        if search_filters.get("title"):
-            vectors.append(SearchVector("title", weight="A"))
-        if search_filters.get("keywords"):
-            vectors.append(SearchVector("keywords__word", weight="B"))
-        if search_filters.get("authors"):
-            vectors.append(SearchVector("frozenauthor__last_name", weight="B"))
-            vectors.append(SearchVector("frozenauthor__first_name", weight="B"))
-        if search_filters.get("abstract"):
-            vectors.append(SearchVector("abstract", weight="C"))
+        document_vector = self.get_search_document_vector(search_filters)
+        if document_vector is not None:
+            vectors.append(document_vector)
+        else:
+            if search_filters.get("title"):
+                vectors.append(SearchVector("title", weight="A"))
+            if search_filters.get("keywords"):
+                vectors.append(SearchVector("keywords__word", weight="B"))
+            if search_filters.get("authors"):
+                vectors.append(SearchVector("frozenauthor__last_name", weight="B"))
+                vectors.append(SearchVector("frozenauthor__first_name", weight="B"))
+            if search_filters.get("abstract"):
+                vectors.append(SearchVector("abstract", weight="C"))
         if search_filters.get("full_text"):
             FileTextModel = swapper.load_model("core", "FileText")
             field_type = FileTextModel._meta.get_field("contents")
@@ -970,18 +971,15 @@ class ArticleSearchManager(BaseSearchManagerMixin):
             # Since we weight file contents as 'D', the returned relevance
             # values can range between .01 and .1
             lookups["relevance__gte"] = 0.01
+            if document_vector is not None and not search_filters.get("full_text"):
+                # Lets the GIN index of the documents find the candidate rows
+                lookups["search_document__document"] = query
 
         if search_filters.get("ORCID"):
             lookups["frozenauthor__author__orcid"] = search_term
             lookups["frozenauthor__frozen_orcid"] = search_term
         return lookups, annotations
 
-    @staticmethod
-    def stringify_queryset(queryset):
-        sql, params = queryset.query.sql_with_params()
-        with connection.cursor() as cursor:
-            return cursor.mogrify(sql, params).decode()
-
 
 class ActiveArticleManager(models.Manager):
     def get_queryset(self):
@@ -1415,7 +1413,7 @@ class Article(AbstractLastModifiedModel):
         return self.galley_set.all().exists()
 
     @staticmethod
-    @cache(600)
+    @cache(600, depends_on=["core.SettingValue"])
     def publication_detail_settings(journal):
         display_date_accepted = journal.get_setting(
             group_name="article",
@@ -1575,7 +1573,7 @@ class Article(AbstractLastModifiedModel):
         return indexed
 
     @property
-    @cache(300)
+    @cache(300, depends_on=["identifiers.Identifier"])
     def identifier(self):
         from identifiers import models as identifier_models
 
@@ -1621,7 +1619,7 @@ class Article(AbstractLastModifiedModel):
         return self.get_identifier("doi", object=True)
 
     @property
-    @cache(30)
+    @cache(30, depends_on=["core.SettingValue"])
     def doi_pattern_preview(self):
         return id_logic.render_doi_from_pattern(self)
 
@@ -1688,7 +1686,7 @@ class Article(AbstractLastModifiedModel):
         return "%s - %s" % (self.pk, truncatesmart(self.title))
 
     @staticmethod
-    @cache(300)
+    @cache(300, depends_on=["identifiers.Identifier"])
     def get_article(journal, identifier_type, identifier):
         from identifiers import models as identifier_models
 
@@ -1739,7 +1737,10 @@ class Article(AbstractLastModifiedModel):
             return None
 
     @property
-    @cache(600)
+    @cache(
+        600,
+        depends_on=["identifiers.Identifier", "journal.Journal", "press.Press"],
+    )
     def url(self):
         return self.journal.site_url(path=self.local_url)
 
@@ -1894,7 +1895,7 @@ class Article(AbstractLastModifiedModel):
             journal=self.journal, articles__in=[self]
         )
 
-    @cache(7200)
+    @cache(7200, depends_on=["metrics.AltMetric"])
     def altmetrics(self):
         alm = self.altmetric_set.all()
         return {
@@ -1907,7 +1908,7 @@ class Article(AbstractLastModifiedModel):
         }
 
     @property
-    @cache(300)
+    @cache(300, depends_on=["journal.Issue"])
     def issue(self):
         """
         Yields the first issue in the current journal that contains this article.
@@ -2326,7 +2327,7 @@ class Article(AbstractLastModifiedModel):
         else:
             return None
 
-    @cache(600)
+    @cache(600, depends_on=["core.WorkflowLog"])
     def workflow_stages(self):
         return core_models.WorkflowLog.objects.filter(article=self)
 
@@ -2387,7 +2388,7 @@ class Article(AbstractLastModifiedModel):
         except (IndexError, ValueError):
             return "No next workflow stage found"
 
-    @cache(600)
+    @cache(600, depends_on=["core.SettingValue"])
     def render_sample_doi(self):
         return id_logic.render_doi_from_pattern(self)
 
@@ -2534,7 +2535,7 @@ class Article(AbstractLastModifiedModel):
 
         return last_mod_date
 
-    @cache(600)
+    @cache(600, depends_on=["journal.PinnedArticle"])
     def pinned(self):
         if journal_models.PinnedArticle.objects.filter(
             journal=self.journal,
@@ -3387,6 +3388,92 @@ class SubmissionConfiguration(models.Model):
         article.save()
 
 
+class ArticleSearchDocument(model_utils.AbstractSearchDocument):
+    article = models.OneToOneField(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="search_document",
+    )
+
+    source_field = "article"
+
+    class Meta(model_utils.AbstractSearchDocument.Meta):
+        indexes = [
+            GinIndex(fields=["document"], name="submission_article_doc_idx"),
+        ]
+
+    def __str__(self):
+        return "Search document of article {}".format(self.article_id)
+
+    @classmethod
+    def get_document_vector(cls):
+        languages = [code for code, _name in settings.LANGUAGES]
+        keywords = (
+            KeywordArticle.objects.filter(article=OuterRef("pk"))
+            .values("article")
+            .annotate(words=StringAgg("keyword__word", delimiter=" "))
+            .values("words")
+        )
+        authors = (
+            FrozenAuthor.objects.filter(article=OuterRef("pk"))
+            .values("article")
+            .annotate(
+                names=StringAgg(
+                    Concat("first_name", Value(" "), "last_name"),
+                    delimiter=" ",
+                )
+            )
+            .values("names")
+        )
+        return (
+            SearchVector(*["title_{}".format(code) for code in languages], weight="A")
+            + SearchVector(Subquery(keywords), Subquery(authors), weight="B")
+            + SearchVector(
+                *["abstract_{}".format(code) for code in languages], weight="C"
+            )
+        )
+
+
+class ArticleOAIRecord(models.Model):
+    """An OAI-PMH record of an article, rendered in one metadata format
+
+    Records are rendered on demand by api.oai.records and rendered again
+    when the last modified date of the article, or of its galleys, authors,
+    files and issues, no longer matches `source_last_modified`.
+    """
+
+    class RecordFormat(models.TextChoices):
+        OAI_DC = "oai_dc", _("Dublin Core record")
+        STUB = "stub", _("JATS metadata record")
+        JATS = "jats", _("JATS of the render galley")
+
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="oai_records",
+    )
+    record_format = models.CharField(
+        max_length=10,
+        choices=RecordFormat.choices,
+    )
+    document = models.TextField(
+        blank=True,
+        help_text="Empty when there is nothing to render, "
+        "such as an article without a JATS galley.",
+    )
+    source_last_modified = models.DateTimeField(blank=True, null=True)
+    date_rendered = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ("article", "record_format")
+
+    def __str__(self):
+        return "{} record of article {}".format(
+            self.record_format,
+            self.article_id,
+        )
+
+
 # Signals
 
 
@@ -3469,3 +3556,35 @@ def backwards_compat_authors(
 
 
 m2m_changed.connect(backwards_compat_authors, sender=Article.authors.through)
+
+
+ARTICLE_SEARCH_DOCUMENT_FIELDS = {"title", "abstract"}
+
+
+@receiver(post_save, sender=Article)
+def update_article_search_document(sender, instance, update_fields=None, **kwargs):
+    if kwargs.get("raw"):
+        return
+    if update_fields is not None and not any(
+        field.split("_")[0] in ARTICLE_SEARCH_DOCUMENT_FIELDS for field in update_fields
+    ):
+        return
+    ArticleSearchDocument.schedule_update(instance.pk)
+
+
+@receiver(post_save, sender=FrozenAuthor)
+@receiver(post_delete, sender=FrozenAuthor)
+@receiver(post_save, sender=KeywordArticle)
+@receiver(post_delete, sender=KeywordArticle)
+def update_related_article_search_document(sender, instance, **kwargs):
+    if kwargs.get("raw"):
+        return
+    ArticleSearchDocument.schedule_update(instance.article_id)
+
+
+@receiver(m2m_changed, sender=Article.keywords.through)
+def update_keyword_article_search_document(sender, instance, action, **kwargs):
+    if action in {"post_add", "post_remove", "post_clear"} and isinstance(
+        instance, Article
+    ):
+        ArticleSearchDocument.schedule_update(instance.pk)
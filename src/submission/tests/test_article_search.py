@@ -4,8 +4,12 @@ __license__ = "AGPL v3"
 __maintainer__ = "Open Library of Humanities"
 
 import os
+from unittest import skipUnless
 
 from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import FloatField, Value
 from django.test import TransactionTestCase
 from django.conf import settings
 from django.test.utils import override_settings
@@ -183,3 +187,61 @@ class ArticleSearchTests(TransactionTestCase):
         result = [a for a in queryset]
 
         self.assertEqual(result, [article])
+
+    def test_search_results_are_counted_and_sliced_in_the_database(self):
+        articles = [
+            models.Article.objects.create(
+                journal=self.journal_one,
+                title="Paginated result {}".format(i),
+                date_published=FROZEN_DATETIME_2020,
+                stage=models.STAGE_PUBLISHED,
+            )
+            for i in range(5)
+        ]
+        queryset = models.Article.objects.filter(
+            journal=self.journal_one,
+        ).annotate(relevance=Value(1.0, FloatField()))
+        results = models.Article.objects.get_search_results(
+            queryset,
+            "ORDER BY relevance DESC",
+        )
+
+        self.assertEqual(results.count(), 5)
+        self.assertEqual(results[1:3], articles[1:3])
+        self.assertEqual(results[4], articles[4])
+        self.assertEqual(results[4:10], articles[4:])
+        self.assertEqual(results._result_cache, None)
+
+        paginator = Paginator(results, 2)
+        self.assertEqual(paginator.num_pages, 3)
+        self.assertEqual(list(paginator.page(3)), articles[4:])
+
+    @skipUnless(connection.vendor == "postgresql", "Requires Postgres")
+    @override_settings(ENABLE_FULL_TEXT_SEARCH=True)
+    def test_search_document_follows_article_changes(self):
+        article = models.Article.objects.create(
+            journal=self.journal_one,
+            title="Calibrating the deflector array",
+            date_published=FROZEN_DATETIME_2020,
+            stage=models.STAGE_PUBLISHED,
+        )
+        keyword = models.Keyword.objects.create(word="Dilithium")
+        article.keywords.add(keyword)
+        search_filters = {"title": True, "keywords": True, "authors": True}
+
+        results = models.Article.objects.search("dilithium", search_filters)
+        self.assertEqual(list(results), [article])
+
+        article.title = "Realigning the warp coils"
+        article.save()
+        self.assertEqual(
+            list(models.Article.objects.search("deflector", search_filters)),
+            [],
+        )
+        self.assertEqual(
+            list(models.Article.objects.search("coils", search_filters)),
+            [article],
+        )
+        self.assertTrue(
+            models.ArticleSearchDocument.objects.filter(article=article).exists()
+        )
@@ -79,6 +79,23 @@ class LogAdmin(admin.ModelAdmin):
             return ", ".join([to.email for to in obj.addressee_set.all()])
 
 
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk",
+        "subject",
+        "status",
+        "attempts",
+        "date_queued",
+        "date_sent",
+        "next_attempt",
+    )
+    list_filter = ("status", "date_queued", "date_sent")
+    search_fields = ("subject", "from_email", "message_id", "last_error")
+    date_hierarchy = "date_queued"
+    raw_id_fields = ("log_entry",)
+    exclude = ("attachments",)
+
+
 class VersionAdmin(admin.ModelAdmin):
     list_display = ("number", "date", "rollback")
     list_filter = ("number", "date", "rollback")
@@ -112,6 +129,7 @@ class RORImportErrorAdmin(admin.ModelAdmin):
 
 admin_list = [
     (models.LogEntry, LogAdmin),
+    (models.OutboxEmail, OutboxEmailAdmin),
     (models.Plugin, PluginAdmin),
     (models.ImportCacheEntry, ImportCacheAdmin),
     (models.Version, VersionAdmin),
@@ -0,0 +1,251 @@
+"""
+A persistent outbox for emails sent by the notify_email plugin.
+
+When settings.ENABLE_EMAIL_OUTBOX is on, emails are stored as OutboxEmail rows
+during the request and delivered by the send_queued_emails command, which
+reuses a single mail connection per batch and retries failures with an
+exponential backoff.
+"""
+
+__copyright__ = "Copyright 2025 Open Library of Humanities"
+__author__ = "Open Library of Humanities"
+__license__ = "AGPL v3"
+__maintainer__ = "Open Library of Humanities"
+
+import base64
+from datetime import timedelta
+from email.utils import make_msgid
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.utils import DNS_NAME
+from django.db import transaction
+from django.utils import timezone
+
+from utils import models
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def queue_email(message):
+    """Stores an email in the outbox instead of sending it
+    :param message: An EmailMultiAlternatives instance
+    :return: The queued OutboxEmail
+    """
+    html = None
+    for content, mimetype in message.alternatives:
+        if mimetype == "text/html":
+            html = content
+
+    attachments = []
+    for name, content, mimetype in message.attachments:
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        attachments.append(
+            {
+                "name": name,
+                "content": base64.b64encode(content).decode("ascii"),
+                "mimetype": mimetype,
+            }
+        )
+
+    return models.OutboxEmail.objects.create(
+        subject=message.subject,
+        body=message.body,
+        html=html,
+        from_email=message.from_email,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        attachments=attachments,
+    )
+
+
+def build_message(outbox_email, connection=None):
+    """Rebuilds the EmailMultiAlternatives of a queued email"""
+    message = EmailMultiAlternatives(
+        outbox_email.subject,
+        outbox_email.body,
+        outbox_email.from_email,
+        outbox_email.to,
+        bcc=outbox_email.bcc,
+        cc=outbox_email.cc,
+        reply_to=outbox_email.reply_to or None,
+        connection=connection,
+    )
+    if outbox_email.html is not None:
+        message.attach_alternative(outbox_email.html, "text/html")
+    for attachment in outbox_email.attachments:
+        message.attach(
+            attachment["name"],
+            base64.b64decode(attachment["content"]),
+            attachment["mimetype"],
+        )
+
+    # Set here rather than by the backend so it can be recorded
+    message_id = outbox_email.message_id or make_msgid(domain=DNS_NAME)
+    message.extra_headers["Message-ID"] = message_id
+    return message, message_id
+
+
+def get_retry_delay(attempts):
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+    )
+
+
+def link_log_entry(outbox_email, log_entry):
+    """Links a queued email to the LogEntry recording it
+
+    The message ID is recorded on the LogEntry once the email is sent, or
+    straight away if a worker has already sent it.
+    """
+    models.OutboxEmail.objects.filter(pk=outbox_email.pk).update(
+        log_entry=log_entry,
+    )
+    message_id = (
+        models.OutboxEmail.objects.filter(
+            pk=outbox_email.pk,
+            status=models.OutboxEmail.OutboxEmailStatus.SENT,
+        )
+        .values_list("message_id", flat=True)
+        .first()
+    )
+    if message_id:
+        record_message_id(log_entry.pk, message_id)
+
+
+def record_message_id(log_entry_id, message_id):
+    # Stored without brackets, as in the Message-Id of mailgun webhooks
+    models.LogEntry.objects.filter(pk=log_entry_id).update(
+        message_id=message_id.strip("<>"),
+        message_status="accepted",
+    )
+
+
+def record_sent(outbox_email):
+    outbox_email.status = models.OutboxEmail.OutboxEmailStatus.SENT
+    outbox_email.date_sent = timezone.now()
+    outbox_email.last_error = None
+    if outbox_email.log_entry_id:
+        record_message_id(outbox_email.log_entry_id, outbox_email.message_id)
+
+
+def record_failure(outbox_email, error):
+    outbox_email.last_error = repr(error)
+    if outbox_email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        outbox_email.status = models.OutboxEmail.OutboxEmailStatus.FAILED
+        logger.error(
+            "Giving up on queued email {} after {} attempts: {}".format(
+                outbox_email.pk, outbox_email.attempts, error
+            )
+        )
+        if outbox_email.log_entry_id:
+            models.LogEntry.objects.filter(pk=outbox_email.log_entry_id).update(
+                message_status="failed",
+            )
+    else:
+        outbox_email.next_attempt = timezone.now() + get_retry_delay(
+            outbox_email.attempts
+        )
+        logger.warning(
+            "Queued email {} failed, retrying at {}: {}".format(
+                outbox_email.pk, outbox_email.next_attempt, error
+            )
+        )
+
+
+def claim_queued_emails(batch_size):
+    """Claims a batch of due emails so no other worker sends them
+
+    Claimed emails are not due again until EMAIL_OUTBOX_CLAIM_TIMEOUT has
+    passed, so the row locks are only held while claiming. Emails claimed by
+    a worker that stopped before recording its sends are then retried with the
+    same Message-ID.
+    """
+    with transaction.atomic():
+        batch = list(
+            models.OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=models.OutboxEmail.OutboxEmailStatus.QUEUED,
+                next_attempt__lte=timezone.now(),
+            )
+            .order_by("next_attempt", "pk")[:batch_size]
+        )
+        claimed_until = timezone.now() + timedelta(
+            seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+        )
+        for outbox_email in batch:
+            outbox_email.attempts += 1
+            outbox_email.next_attempt = claimed_until
+            outbox_email.message_id = outbox_email.message_id or make_msgid(
+                domain=DNS_NAME
+            )
+        models.OutboxEmail.objects.bulk_update(
+            batch,
+            ["attempts", "next_attempt", "message_id"],
+        )
+    return batch
+
+
+def record_attempt(outbox_email, error=None):
+    """Records the outcome of sending a claimed email"""
+    with transaction.atomic():
+        # The log entry may have been linked by link_log_entry since the email
+        # was claimed, locking the row makes it wait for the status
+        outbox_email.log_entry_id = (
+            models.OutboxEmail.objects.select_for_update()
+            .filter(pk=outbox_email.pk)
+            .values_list("log_entry_id", flat=True)
+            .first()
+        )
+        if error is None:
+            record_sent(outbox_email)
+        else:
+            record_failure(outbox_email, error)
+        outbox_email.save(
+            update_fields=[
+                "status",
+                "date_sent",
+                "next_attempt",
+                "last_error",
+            ]
+        )
+
+
+def send_queued_emails(batch_size=100):
+    """Sends a batch of due emails over a single connection
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, where supported,
+    so several workers can run at once without sending an email twice. No
+    transaction is held open while talking to the mail server.
+    :param batch_size: The maximum number of emails sent
+    :return: A tuple of (sent, failed) counts
+    """
+    sent = failed = 0
+    batch = claim_queued_emails(batch_size)
+    if not batch:
+        return sent, failed
+
+    connection = get_connection()
+    try:
+        for outbox_email in batch:
+            message, _ = build_message(outbox_email, connection)
+            try:
+                # Opening an open connection is a no-op, this reconnects
+                # after a previous message dropped the connection
+                connection.open()
+                connection.send_messages([message])
+            except Exception as e:
+                failed += 1
+                record_attempt(outbox_email, e)
+                connection.close()
+            else:
+                sent += 1
+                record_attempt(outbox_email)
+    finally:
+        connection.close()
+
+    return sent, failed
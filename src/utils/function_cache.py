@@ -3,36 +3,215 @@ __author__ = "Martin Paul Eve & Andy Byers"
 __license__ = "AGPL v3"
 __maintainer__ = "Birkbeck Centre for Technology and Publishing"
 
-
+import functools
+import threading
+import time
+from collections import defaultdict
 from hashlib import sha1
 
 from django.core.cache import cache as django_cache
+from django.core.exceptions import EmptyResultSet
+from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 from django.utils.functional import cached_property
 
+CACHE_PREFIX = "function_cache"
+
+# Maps a lowercased model label to the functions whose results depend on it
+_dependencies = defaultdict(set)
+# Lowercased labels of the models whose saves and deletes evict entries
+_watched_models = set()
+_stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+_stats_lock = threading.Lock()
+
+
+def cache(seconds=900, depends_on=None):
+    """Caches the result of a function in the default cache backend
+
+    Model instances passed as arguments are keyed on their model label, primary
+    key and, where available, last_modified timestamp. Saving or deleting an
+    instance evicts every cached result computed from it, so eviction
+    receivers are only connected for the models that keys are built from.
+    :param seconds: The maximum time to live of each result
+    :param depends_on: An iterable of model labels (e.g. "journal.Issue").
+        Saving or deleting any instance of these models, or changing their
+        many to many relations, evicts every cached result of the function.
+    """
 
-def cache(seconds=900):
     def do_cache(f):
+        function_id = "{}.{}".format(f.__module__, f.__qualname__)
+        for label in depends_on or ():
+            _dependencies[label.lower()].add(function_id)
+            watch_model(label)
+
+        @functools.wraps(f)
         def y(*args, **kwargs):
-            f_module = f.__module__.encode("utf-8")
-            f_name = f.__name__.encode("utf-8")
-            key = sha1(
-                f_module
-                + f_name
-                + str(args).encode("UTF-8")
-                + str(kwargs).encode("UTF-8")
-            ).hexdigest()
+            key = get_cache_key(function_id, args, kwargs)
             result = django_cache.get(key)
             if result is None:
-                result = f(*args, **kwargs)
+                _record(function_id, "misses")
+                result = (f(*args, **kwargs),)
                 django_cache.set(key, result, seconds)
+            else:
+                _record(function_id, "hits")
 
-            return result
+            return result[0]
 
+        y.function_id = function_id
         return y
 
     return do_cache
 
 
+def _version_key(*parts):
+    return ":".join((CACHE_PREFIX, "version") + tuple(str(p) for p in parts))
+
+
+def _new_version():
+    # Seeded from the clock so an evicted version key is never reused
+    return int(time.time() * 1000)
+
+
+def _get_versions(keys):
+    versions = django_cache.get_many(keys)
+    if len(versions) < len(keys):
+        for key in keys:
+            if key not in versions:
+                django_cache.add(key, _new_version(), timeout=None)
+        versions = django_cache.get_many(keys)
+    return versions
+
+
+def _bump_version(key):
+    try:
+        django_cache.incr(key)
+    except ValueError:
+        django_cache.set(key, _new_version(), timeout=None)
+
+
+def _has_last_modified(instance):
+    return getattr(instance, "last_modified", None) is not None
+
+
+def _instance_version_key(instance):
+    return _version_key(instance._meta.label_lower, instance.pk)
+
+
+def _key_part(value, versions):
+    if isinstance(value, models.Model):
+        if _has_last_modified(value):
+            revision = value.last_modified.isoformat()
+        else:
+            # Without a timestamp, key on a version that saves and deletes reset
+            revision = versions.get(_instance_version_key(value))
+        return "{}:{}:{}".format(value._meta.label_lower, value.pk, revision)
+    elif isinstance(value, models.QuerySet):
+        try:
+            query = str(value.query)
+        except EmptyResultSet:
+            query = "empty"
+        return "{}:{}".format(value.model._meta.label_lower, query)
+    return str(value)
+
+
+def watch_model(model):
+    """Connects the eviction receivers for a model class or label, once
+    :param model: A model class or a model label such as "journal.Issue"
+    """
+    if isinstance(model, str):
+        label = model.lower()
+    else:
+        label = model._meta.label_lower
+    if label in _watched_models:
+        return
+    _watched_models.add(label)
+    # Labels are resolved lazily, so models can be watched while importing
+    dispatch_uid = "{}:{}".format(CACHE_PREFIX, label)
+    for signal in (post_save, post_delete):
+        signal.connect(evict_dependent_entries, sender=model, dispatch_uid=dispatch_uid)
+
+
+def get_cache_key(function_id, args, kwargs):
+    kwargs = sorted(kwargs.items())
+    instances = [
+        value
+        for value in list(args) + [value for _name, value in kwargs]
+        if isinstance(value, models.Model) and not _has_last_modified(value)
+    ]
+    for instance in instances:
+        watch_model(type(instance))
+    version_keys = [_version_key(function_id)]
+    version_keys += [_instance_version_key(instance) for instance in instances]
+    versions = _get_versions(version_keys)
+
+    parts = [_key_part(arg, versions) for arg in args]
+    parts += [
+        "{}={}".format(name, _key_part(value, versions)) for name, value in kwargs
+    ]
+    raw_key = "{}:{}:{}".format(
+        function_id,
+        versions.get(version_keys[0]),
+        ",".join(parts),
+    )
+    return "{}:{}".format(CACHE_PREFIX, sha1(raw_key.encode("utf-8")).hexdigest())
+
+
+def _record(function_id, counter):
+    with _stats_lock:
+        _stats[function_id][counter] += 1
+
+
+def get_cache_stats():
+    """Returns the hit and miss counters of each cached function
+    :return: A dict of {function_id: {"hits": int, "misses": int}}
+    """
+    with _stats_lock:
+        return {function_id: dict(counts) for function_id, counts in _stats.items()}
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def invalidate_instance(instance):
+    """Evicts every cached result computed from the given model instance"""
+    if not _has_last_modified(instance):
+        # Deleting rather than incrementing avoids creating version keys for
+        # instances that were never used as a cache key
+        django_cache.delete(_instance_version_key(instance))
+
+
+def invalidate_model(label):
+    """Evicts every cached result of the functions depending on a model
+    :param label: A model label such as "journal.Issue"
+    """
+    for function_id in _dependencies.get(label.lower(), ()):
+        _bump_version(_version_key(function_id))
+
+
+def evict_dependent_entries(sender, instance, **kwargs):
+    invalidate_instance(instance)
+    invalidate_model(sender._meta.label_lower)
+
+
+@receiver(m2m_changed)
+def evict_dependent_m2m_entries(sender, instance, action, model, **kwargs):
+    if action not in {"post_add", "post_remove", "post_clear"}:
+        return
+    labels = {
+        sender._meta.label_lower,
+        instance._meta.label_lower,
+        model._meta.label_lower,
+    }
+    if not labels & _watched_models:
+        return
+    invalidate_instance(instance)
+    for label in labels:
+        invalidate_model(label)
+
+
 class mutable_cached_property(cached_property):
     """Expands django's cached property to allow property mutation
 
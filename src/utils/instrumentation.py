@@ -0,0 +1,205 @@
+"""
+Per-request performance metrics.
+
+While a request is instrumented, a RequestMetrics instance is bound to the
+current context. Every SQL query run on any database connection is timed by
+a connection execute wrapper, the outermost template render is timed by a
+wrapper around the render method of Django template backends, and plugin
+hooks report their own time through `record_hook`. Instrumentation is driven
+by utils.middleware.RequestInstrumentationMiddleware.
+"""
+
+__copyright__ = "Copyright 2025 Open Library of Humanities"
+__author__ = "Open Library of Humanities"
+__license__ = "AGPL v3"
+__maintainer__ = "Open Library of Humanities"
+
+import contextvars
+import functools
+import hashlib
+import time
+from collections import defaultdict
+
+from django.db import connections
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+# The number of statements listed in a slow request sample
+SAMPLE_STATEMENTS = 10
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.duration = None
+        self.query_count = 0
+        self.query_time = 0.0
+        # Count and time of each SQL statement, regardless of its parameters
+        self.statements = defaultdict(lambda: [0, 0.0])
+        # Count of each query run with the exact same parameters
+        self.executions = defaultdict(int)
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.hook_time = 0.0
+        self.hooks = defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper recording the time of each query"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.query_count += 1
+            self.query_time += elapsed
+            statement = self.statements[sql]
+            statement[0] += 1
+            statement[1] += elapsed
+            if not many:
+                key = hashlib.sha1(
+                    "{}{!r}".format(sql, params).encode("utf-8", "replace")
+                ).digest()
+                self.executions[key] += 1
+
+    @property
+    def duplicate_queries(self):
+        """The number of queries repeating an earlier query exactly"""
+        return sum(count - 1 for count in self.executions.values() if count > 1)
+
+    @property
+    def similar_queries(self):
+        """The number of queries repeating an earlier statement
+
+        These are usually N+1 queries, run once per object of a list with
+        different parameters.
+        """
+        return sum(count - 1 for count, _ in self.statements.values() if count > 1)
+
+    def record_hook(self, hook_name, elapsed):
+        self.hook_time += elapsed
+        hook = self.hooks[hook_name]
+        hook[0] += 1
+        hook[1] += elapsed
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+
+    def as_dict(self):
+        return {
+            "duration_ms": round(self.duration * 1000, 2),
+            "query_count": self.query_count,
+            "query_ms": round(self.query_time * 1000, 2),
+            "duplicate_queries": self.duplicate_queries,
+            "similar_queries": self.similar_queries,
+            "template_ms": round(self.template_time * 1000, 2),
+            "hook_ms": round(self.hook_time * 1000, 2),
+        }
+
+    def server_timing(self):
+        """Returns the value of a Server-Timing header for the metrics"""
+        return ", ".join(
+            [
+                "total;dur={:.1f}".format(self.duration * 1000),
+                'sql;dur={:.1f};desc="{} queries, {} duplicates"'.format(
+                    self.query_time * 1000,
+                    self.query_count,
+                    self.duplicate_queries,
+                ),
+                "template;dur={:.1f}".format(self.template_time * 1000),
+                "hooks;dur={:.1f}".format(self.hook_time * 1000),
+            ]
+        )
+
+    def sample(self):
+        """Returns the details logged for a slow request
+
+        Lists the statements taking the most time overall, along with the
+        plugin hooks rendered.
+        """
+        slowest = sorted(
+            self.statements.items(),
+            key=lambda item: item[1][1],
+            reverse=True,
+        )[:SAMPLE_STATEMENTS]
+        return {
+            "statements": [
+                {"sql": sql, "count": count, "ms": round(elapsed * 1000, 2)}
+                for sql, (count, elapsed) in slowest
+            ],
+            "hooks": {
+                name: {"count": count, "ms": round(elapsed * 1000, 2)}
+                for name, (count, elapsed) in self.hooks.items()
+            },
+        }
+
+
+def current():
+    """Returns the metrics of the request being instrumented, if any"""
+    return _current.get()
+
+
+def record_hook(hook_name, elapsed):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.record_hook(hook_name, elapsed)
+
+
+class instrument:
+    """Context manager collecting the metrics of the code it wraps
+
+    with instrument() as metrics:
+        response = get_response(request)
+    """
+
+    def __enter__(self):
+        self.metrics = RequestMetrics()
+        self.token = _current.set(self.metrics)
+        self.wrapped = []
+        for alias in connections:
+            connection = connections[alias]
+            connection.execute_wrappers.append(self.metrics)
+            self.wrapped.append(connection)
+        return self.metrics
+
+    def __exit__(self, *exc_info):
+        for connection in self.wrapped:
+            try:
+                connection.execute_wrappers.remove(self.metrics)
+            except ValueError:
+                pass
+        _current.reset(self.token)
+        self.metrics.finish()
+        return False
+
+
+def instrument_template_backends():
+    """Times the outermost template render of instrumented requests
+
+    Templates rendered while rendering another template, such as those of
+    inclusion tags or plugin hooks, are part of the outermost render time.
+    """
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, "instrumented", False):
+        return
+    render = Template.render
+
+    @functools.wraps(render)
+    def instrumented_render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None or metrics.template_depth:
+            return render(self, context, request)
+        metrics.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+            metrics.template_depth -= 1
+
+    instrumented_render.instrumented = True
+    Template.render = instrumented_render
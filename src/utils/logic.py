@@ -10,7 +10,7 @@ from django.template.loader import render_to_string
 
 from core.middleware import GlobalRequestMiddleware
 from cron.models import Request
-from utils import models, notify_helpers
+from utils import models, notify_helpers, sitemaps
 from utils.logger import get_logger
 from utils.function_cache import cache
 from janeway import __version__ as janeway_version
@@ -230,6 +230,14 @@ def generate_sitemap(
         template = "common/journal_sitemap.xml"
         context = {
             "journal": journal,
+            "articles_not_in_issues": sitemaps.annotate_article_lastmod(
+                journal.published_articles_not_in_issues,
+            ),
+            "issue_sitemaps": [
+                (issue, shard)
+                for issue in journal.published_issues
+                for shard in sitemaps.IssueSitemap(issue).get_shards()
+            ],
             "news_items": news_items,
             "url_config": url_config,
             "enable_editorial_display": journal.get_setting(
@@ -249,17 +257,18 @@ def generate_sitemap(
         template = ("common/repo_sitemap.xml",)
         context = {
             "repo": repository,
+            "subject_sitemaps": [
+                (subject, shard)
+                for subject in repository.subject_set.all()
+                for shard in sitemaps.SubjectSitemap(subject).get_shards()
+            ],
         }
     elif issue:
-        template = "common/issue_sitemap.xml"
-        context = {
-            "issue": issue,
-        }
+        sitemaps.IssueSitemap(issue).write(file)
+        return
     elif subject:
-        template = "common/subject_sitemap.xml"
-        context = {
-            "subject": subject,
-        }
+        sitemaps.SubjectSitemap(subject).write(file)
+        return
 
     if template and context:
         content = render_to_string(
@@ -298,14 +307,11 @@ def write_journal_sitemap(journal):
         file.close()
 
 
-def write_issue_sitemap(issue):
-    issue_file_path = get_sitemap_path(
-        path_parts=[issue.journal.code],
-        file_name="{}_sitemap.xml".format(issue.pk),
-    )
-    with open(issue_file_path, "w") as file:
-        generate_sitemap(file, issue=issue)
-        file.close()
+def write_issue_sitemap(issue, force=False):
+    """Writes the changed shards of an issue sitemap
+    :return: A tuple of (written, skipped) shard counts
+    """
+    return sitemaps.IssueSitemap(issue).write_shards(force=force)
 
 
 def write_repository_sitemap(repository):
@@ -318,14 +324,11 @@ def write_repository_sitemap(repository):
         file.close()
 
 
-def write_subject_sitemap(subject):
-    subject_file_path = get_sitemap_path(
-        path_parts=[subject.repository.code],
-        file_name="{}_sitemap.xml".format(subject.pk),
-    )
-    with open(subject_file_path, "w") as file:
-        generate_sitemap(file, subject=subject)
-        file.close()
+def write_subject_sitemap(subject, force=False):
+    """Writes the changed shards of a subject sitemap
+    :return: A tuple of (written, skipped) shard counts
+    """
+    return sitemaps.SubjectSitemap(subject).write_shards(force=force)
 
 
 def write_press_sitemap():
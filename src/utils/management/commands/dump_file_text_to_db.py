@@ -1,7 +1,72 @@
+import os
+import time
+from datetime import datetime, timezone as dt_timezone
+from multiprocessing import Pool
+
 from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.models import Prefetch
+import swapper
 
+from core import files
+from core.models import File, Galley
 from submission.models import Article
-from core.models import File
+
+
+def extract_text(task):
+    """Runs the text parser for a file, in a worker process
+
+    Workers only read files from disk; all database access happens in the
+    parent process.
+    :param task: A tuple of (file id, path, mime type)
+    :return: A tuple of (file id, parsed text, error)
+    """
+    file_id, path, mime_type = task
+    try:
+        return file_id, files.MIME_TO_TEXT_PARSER[mime_type](path), None
+    except Exception as e:
+        return file_id, None, e
+
+
+def _is_indexable(file_):
+    return (
+        file_.article_id is not None
+        and file_.mime_type in files.MIME_TO_TEXT_PARSER
+        and os.path.isfile(file_.self_article_path())
+    )
+
+
+def get_file_to_index(article):
+    """Picks the galley file Article.index_full_text would index
+
+    Relies on the galleys of the article having been prefetched.
+    """
+    if article.render_galley:
+        return article.render_galley.file
+
+    galleys = list(article.galley_set.all())
+    xml_galleys = sorted(
+        (g for g in galleys if g.file.mime_type in files.XML_MIMETYPES),
+        key=lambda galley: galley.sequence,
+    )
+    if xml_galleys:
+        return xml_galleys[0].file
+
+    for galley in galleys:
+        if _is_indexable(galley.file):
+            return galley.file
+    return None
+
+
+def is_unchanged(file_):
+    """Checks if a file has been indexed since it was last written to disk"""
+    if not file_.text_id:
+        return False
+    modified = datetime.fromtimestamp(
+        os.path.getmtime(file_.self_article_path()),
+        tz=dt_timezone.utc,
+    )
+    return modified <= file_.text.date_populated
 
 
 class Command(BaseCommand):
@@ -17,6 +82,26 @@ class Command(BaseCommand):
         parser.add_argument("--article-id", type=int)
         parser.add_argument("--file-id", type=int)
         parser.add_argument("--all", action="store_true", default=False)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Extract text in a pool of N processes and store it in "
+            "batches, skipping files that have not changed on disk since "
+            "they were last indexed.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of extracted files stored per transaction when "
+            "using --workers.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            default=False,
+            help="Re-index unchanged files when using --workers.",
+        )
 
     def handle(self, *args, **options):
         errors = []
@@ -30,18 +115,153 @@ class Command(BaseCommand):
             if options["article_id"]:
                 articles = articles.filter(id=options["article_id"])
 
-            for article in articles:
-                print(f"Processing Article {article.pk}")
-                try:
-                    article.index_full_text()
-                except Exception as e:
-                    self.stderr.write("%s" % e)
-                    errors.append((article.id, e))
+            if options["workers"]:
+                errors = self.index_in_parallel(
+                    articles,
+                    workers=options["workers"],
+                    batch_size=options["batch_size"],
+                    force=options["force"],
+                )
+            else:
+                for article in articles:
+                    print(f"Processing Article {article.pk}")
+                    try:
+                        article.index_full_text()
+                    except Exception as e:
+                        self.stderr.write("%s" % e)
+                        errors.append((article.id, e))
+        else:
+            self.stderr.write("At least one filtering flag must be provided")
+            self.print_help("manage.py", "dump_file_text_to_db.py")
+
         if errors:
             self.stderr.write("Errors Found:")
             for id, err in errors:
                 self.stderr.write("%d: %s" % (id, repr(err)))
 
-        else:
-            self.stderr.write("At least one filtering flag must be provided")
-            self.print_help("manage.py", "dump_file_text_to_db.py")
+    def index_in_parallel(self, articles, workers, batch_size, force=False):
+        """Extracts text in a process pool and stores it in batches
+        :return: A list of (article id, error) tuples
+        """
+        articles = articles.select_related(
+            "render_galley__file__text",
+        ).prefetch_related(
+            Prefetch(
+                "galley_set",
+                queryset=Galley.objects.select_related("file__text"),
+            ),
+        )
+
+        tasks = []
+        files_by_id = {}
+        unindexed_article_ids = []
+        skipped = 0
+        for article in articles.iterator(chunk_size=500):
+            file_ = get_file_to_index(article)
+            if file_ is None or not _is_indexable(file_):
+                unindexed_article_ids.append(article.pk)
+                continue
+            if not force and is_unchanged(file_):
+                skipped += 1
+                continue
+            files_by_id[file_.pk] = file_
+            tasks.append((file_.pk, file_.self_article_path(), file_.mime_type))
+
+        self.stdout.write(
+            "Indexing {} files with {} workers, {} unchanged files skipped".format(
+                len(tasks), workers, skipped
+            )
+        )
+
+        self.clear_text(unindexed_article_ids, batch_size)
+
+        errors = []
+        indexed = 0
+        total_bytes = 0
+        started = time.monotonic()
+        batch = []
+
+        # Forked workers must not inherit the open database connections
+        connections.close_all()
+        with Pool(processes=workers) as pool:
+            for file_id, text, error in pool.imap_unordered(
+                extract_text, tasks, chunksize=4
+            ):
+                file_ = files_by_id[file_id]
+                if error is not None:
+                    self.stderr.write("%s" % error)
+                    errors.append((file_.article_id, error))
+                    continue
+                batch.append((file_, text))
+                total_bytes += os.path.getsize(file_.self_article_path())
+                if len(batch) >= batch_size:
+                    indexed += self.store_batch(batch)
+                    batch = []
+                    self.report(indexed, total_bytes, started)
+        if batch:
+            indexed += self.store_batch(batch)
+        self.report(indexed, total_bytes, started)
+
+        return errors
+
+    @staticmethod
+    def clear_text(article_ids, batch_size):
+        """Deletes the text indexed for articles with no file to index
+
+        As in Article.index_full_text, text indexed from a previous file of
+        the article is not kept.
+        """
+        FileTextModel = swapper.load_model("core", "FileText")
+        for start in range(0, len(article_ids), batch_size):
+            FileTextModel.objects.filter(
+                file__article_id__in=article_ids[start : start + batch_size],
+            ).delete()
+
+    @staticmethod
+    def store_batch(batch):
+        """Stores the text of a batch of files, replacing the article's index"""
+        FileTextModel = swapper.load_model("core", "FileText")
+        to_create, to_update = [], []
+        file_text_connection = connections[FileTextModel.objects.db]
+
+        with transaction.atomic():
+            # As in Article.index_full_text, only one file per article is indexed
+            FileTextModel.objects.filter(
+                file__article_id__in={file_.article_id for file_, _text in batch},
+            ).exclude(
+                file__in=[file_ for file_, _text in batch],
+            ).delete()
+
+            for file_, text in batch:
+                contents = FileTextModel.preprocess_contents(text)
+                if file_.text_id:
+                    file_.text.contents = contents
+                    file_.text.date_populated = datetime.now(tz=dt_timezone.utc)
+                    to_update.append(file_.text)
+                else:
+                    to_create.append((file_, FileTextModel(contents=contents)))
+
+            FileTextModel.objects.bulk_update(to_update, ["contents", "date_populated"])
+            new_texts = [file_text for _file, file_text in to_create]
+            if file_text_connection.features.can_return_rows_from_bulk_insert:
+                FileTextModel.objects.bulk_create(new_texts)
+            else:
+                # The primary keys are needed to link the files to their text
+                for file_text in new_texts:
+                    file_text.save()
+            for file_, file_text in to_create:
+                file_.text = file_text
+            # Bypasses the pre_save signal that would index each file again
+            File.objects.bulk_update([file_ for file_, _text in to_create], ["text"])
+        return len(batch)
+
+    def report(self, indexed, total_bytes, started):
+        elapsed = max(time.monotonic() - started, 0.001)
+        self.stdout.write(
+            "Indexed {} files in {:.1f}s ({:.1f} files/s, {:.2f} MB/s)".format(
+                indexed,
+                elapsed,
+                indexed / elapsed,
+                total_bytes / elapsed / 1024 / 1024,
+            )
+        )
@@ -34,11 +34,19 @@ class Command(ProfiledCommand):
             nargs="+",
             help="The codes of the sites (empty for all sites)",
         )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            default=False,
+            help="Rewrite every sitemap shard, including unchanged ones",
+        )
 
     def handle(self, *args, **options):
         with translation.override(settings.LANGUAGE_CODE):
             site_type = options.get("site_type")
             codes = options.get("codes")
+            force = options.get("force")
+            written = skipped = 0
 
             journals = journal_models.Journal.objects.none()
             repositories = repository_models.Repository.objects.none()
@@ -62,11 +70,15 @@ class Command(ProfiledCommand):
                 for journal in journals:
                     if journal.published_issues:
                         print(f"Generating sitemaps for {journal.name}'s issues:")
-                        logic.write_journal_sitemap(journal)
 
-                        # Generate Issue Sitemap
+                        # Generate Issue Sitemaps first, the journal sitemap
+                        # lists their shards
                         for issue in tqdm(journal.published_issues):
-                            logic.write_issue_sitemap(issue)
+                            counts = logic.write_issue_sitemap(issue, force=force)
+                            written += counts[0]
+                            skipped += counts[1]
+
+                        logic.write_journal_sitemap(journal)
 
             # Generate Repo Sitemap
             if repositories:
@@ -74,7 +86,12 @@ class Command(ProfiledCommand):
                 for repo in repositories:
                     if repo.subject_set.all():
                         print(f"Generating sitemaps for {repo.name}'s subjects:")
-                        logic.write_repository_sitemap(repo)
 
                         for subject in tqdm(repo.subject_set.all()):
-                            logic.write_subject_sitemap(subject)
+                            counts = logic.write_subject_sitemap(subject, force=force)
+                            written += counts[0]
+                            skipped += counts[1]
+
+                        logic.write_repository_sitemap(repo)
+
+            print(f"{written} sitemap shards written, {skipped} unchanged")
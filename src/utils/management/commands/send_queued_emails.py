@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from utils import email_outbox
+
+
+class Command(BaseCommand):
+    """
+    Sends the emails queued in the outbox when ENABLE_EMAIL_OUTBOX is on.
+    """
+
+    help = "Sends queued emails, reusing one mail connection per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=100,
+            help="Maximum number of emails sent over a single connection.",
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        started = time.monotonic()
+        while True:
+            sent, failed = email_outbox.send_queued_emails(
+                batch_size=options["batch_size"],
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < options["batch_size"]:
+                break
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Sent {0} emails, {1} failed, in {2:.1f}s.".format(
+                    total_sent,
+                    total_failed,
+                    time.monotonic() - started,
+                )
+            )
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from repository.models import PreprintSearchDocument
+from submission.models import ArticleSearchDocument
+
+
+class Command(BaseCommand):
+    """Rebuilds the stored search documents of articles and preprints"""
+
+    help = (
+        "Rebuilds the weighted search documents used by Postgres relevance "
+        "search. Documents are kept up to date as records change, so this is "
+        "only needed after upgrading and after changes made outside of the "
+        "ORM."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stderr.write("Search documents are only supported on Postgres")
+            return
+        for document_model in (ArticleSearchDocument, PreprintSearchDocument):
+            written = document_model.update_documents(
+                batch_size=options["batch_size"],
+            )
+            self.stdout.write(
+                "Rebuilt {} {} rows".format(written, document_model.__name__)
+            )
@@ -3,12 +3,19 @@ __author__ = "Martin Paul Eve & Andy Byers"
 __license__ = "AGPL v3"
 __maintainer__ = "Birkbeck Centre for Technology and Publishing"
 
+import json
 import resource
 import threading
 import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from utils import instrumentation
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
+slow_request_logger = get_logger("janeway.slow_requests")
 
 _local = threading.local()
 
@@ -54,16 +61,14 @@ class ThemeEngineMiddleware(object):
 class TimeMonitoring(BaseMiddleware):
     """Monitors the resource usage of a request/response cycle"""
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.usage_start = None
-
-    def process_request(self, _request):
-        self.usage_start = self._get_usage()
+    def process_request(self, request):
+        # Stored on the request, as one middleware instance serves every thread
+        request.usage_start = self._get_usage()
 
-    def process_response(self, _request, response):
-        if self.usage_start is not None:
-            diff_usage = self._diff_usages(self.usage_start)
+    def process_response(self, request, response):
+        usage_start = getattr(request, "usage_start", None)
+        if usage_start is not None:
+            diff_usage = self._diff_usages(usage_start)
             logger.info("Request took %0.3f (%0.3fu, %0.3fs)" % diff_usage)
 
         return response
@@ -83,3 +88,60 @@ class TimeMonitoring(BaseMiddleware):
             return (time.time(), utime, stime)
         except Exception:
             return (time.time(), 0, 0)
+
+
+class RequestInstrumentationMiddleware(BaseMiddleware):
+    """Records the SQL, template and plugin hook time of each request
+
+    Enabled by settings.ENABLE_REQUEST_INSTRUMENTATION. The metrics of every
+    request are logged as a single line, with the metrics also passed to log
+    handlers as the `request_metrics` attribute of the record, and returned
+    in a Server-Timing header to staff users when
+    REQUEST_INSTRUMENTATION_SERVER_TIMING is on. Requests slower than
+    SLOW_REQUEST_THRESHOLD seconds also log their slowest statements and the
+    plugin hooks they rendered.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if not settings.ENABLE_REQUEST_INSTRUMENTATION:
+            raise MiddlewareNotUsed()
+        super().__init__(*args, **kwargs)
+        instrumentation.instrument_template_backends()
+
+    def __call__(self, request):
+        with instrumentation.instrument() as metrics:
+            response = self.get_response(request)
+        self.report(request, response, metrics)
+        return response
+
+    @staticmethod
+    def get_request_details(request, response):
+        resolver_match = getattr(request, "resolver_match", None)
+        site = getattr(request, "journal", None) or getattr(request, "repository", None)
+        return {
+            "method": request.method,
+            "path": request.path,
+            "url_name": resolver_match.view_name if resolver_match else None,
+            "site": site.code if site else None,
+            "status": response.status_code,
+        }
+
+    def report(self, request, response, metrics):
+        data = self.get_request_details(request, response)
+        data.update(metrics.as_dict())
+        logger.info(
+            "request_metrics {}".format(json.dumps(data)),
+            extra={"request_metrics": data},
+        )
+
+        threshold = settings.SLOW_REQUEST_THRESHOLD
+        if threshold is not None and metrics.duration >= threshold:
+            data.update(metrics.sample())
+            slow_request_logger.warning(
+                "slow_request {}".format(json.dumps(data)),
+                extra={"request_metrics": data},
+            )
+
+        user = getattr(request, "user", None)
+        if settings.REQUEST_INSTRUMENTATION_SERVER_TIMING and user and user.is_staff:
+            response["Server-Timing"] = metrics.server_timing()
@@ -206,6 +206,60 @@ class Addressee(models.Model):
         return self.email
 
 
+class OutboxEmail(models.Model):
+    """
+    An email queued for delivery by the send_queued_emails command.
+    """
+
+    class OutboxEmailStatus(models.TextChoices):
+        QUEUED = "queued", _("Queued")
+        SENT = "sent", _("Sent")
+        FAILED = "failed", _("Failed")
+
+    date_queued = models.DateTimeField(auto_now_add=True)
+    date_sent = models.DateTimeField(blank=True, null=True)
+    status = models.CharField(
+        max_length=20,
+        choices=OutboxEmailStatus.choices,
+        default=OutboxEmailStatus.QUEUED,
+    )
+    next_attempt = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+
+    subject = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    html = models.TextField(blank=True, null=True)
+    from_email = models.TextField()
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    bcc = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list)
+    attachments = models.JSONField(
+        default=list,
+        help_text="A list of {name, content, mimetype} objects, where content "
+        "is base64 encoded.",
+    )
+    message_id = models.TextField(blank=True, null=True)
+    log_entry = models.ForeignKey(
+        LogEntry,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt"],
+                name="utils_outbox_status_next_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return "[{0}] {1}".format(self.status, self.subject)
+
+
 class VersionManager(models.Manager):
     def get_last_known_version_number(self):
         try:
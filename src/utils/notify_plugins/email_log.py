@@ -1,4 +1,4 @@
-from utils import models
+from utils import email_outbox, models
 
 
 def notify_hook(**kwargs):
@@ -53,7 +53,7 @@ def notify_hook(**kwargs):
                 bcc=bcc,
             )
         else:
-            models.LogEntry.add_entry(
+            log_entry = models.LogEntry.add_entry(
                 types=types,
                 description=html,
                 level=level,
@@ -67,6 +67,8 @@ def notify_hook(**kwargs):
                 cc=cc,
                 bcc=bcc,
             )
+            if isinstance(response, models.OutboxEmail):
+                email_outbox.link_log_entry(response, log_entry)
 
 
 def plugin_loaded():
@@ -9,6 +9,7 @@ from django.utils.html import strip_tags
 
 from utils import setting_handler
 from utils import notify
+from utils import email_outbox
 
 SANITIZE_FROM_RE = re.compile('\r|\n|\t|"|<|>|,')
 
@@ -110,6 +111,10 @@ def send_email(
             file.open()
             msg.attach(file.name, file.read(), file.content_type)
             file.close()
+
+    if settings.ENABLE_EMAIL_OUTBOX:
+        # Delivered out of the request by the send_queued_emails command
+        return email_outbox.queue_email(msg)
     return msg.send()
 
 
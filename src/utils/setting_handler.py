@@ -7,9 +7,16 @@ import inspect
 import json
 import os
 import codecs
+import copy
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha1
 
 from django.conf import settings
+from django.core.cache import cache as django_cache
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Q
 from django.utils import translation
 
 from core import models as core_models
@@ -18,6 +25,12 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+SETTINGS_CACHE_PREFIX = "setting_handler"
+LOCAL_CACHE_MAX_ENTRIES = 4096
+_CACHE_MISS = object()
+_local_cache = OrderedDict()
+_local_cache_lock = threading.Lock()
+
 
 def create_setting(
     setting_group_name,
@@ -103,6 +116,89 @@ def get_setting(
             f"utils.get_setting called by {callee.function}::{callee.lineno}"
             f" with setting_name {str(setting_name)}",
         )
+    if not settings.ENABLE_SETTINGS_CACHE:
+        return _get_setting(
+            setting_group_name,
+            setting_name,
+            journal,
+            create=create,
+            default=default,
+        )
+
+    cache_key = get_setting_cache_key(
+        setting_group_name,
+        setting_name,
+        journal,
+        default=default or create,
+    )
+    setting_value = _get_cached_setting_value(cache_key)
+    if setting_value is _CACHE_MISS:
+        setting_value = _get_setting(
+            setting_group_name,
+            setting_name,
+            journal,
+            create=create,
+            default=default,
+        )
+        if setting_value is not None:
+            _set_cached_setting_value(cache_key, setting_value)
+
+    return setting_value
+
+
+def get_settings_for_groups(setting_group_names, journal):
+    """
+    Resolves every setting of the given groups for a journal at once.
+
+    Loads all the settings of the groups, and their journal and default
+    values, in two queries, then applies the same fallback as get_setting.
+    :setting_group_names: An iterable of SettingGroup names
+    :journal: (Journal object) The journal for which the settings are
+        relevant. If None, returns the default values
+    :return: A dict of {group name: {setting name: SettingValue}}
+    """
+    setting_group_names = list(setting_group_names)
+    resolved = {group_name: {} for group_name in setting_group_names}
+    group_settings = core_models.Setting.objects.filter(
+        group__name__in=setting_group_names,
+    ).select_related("group")
+    settings_by_id = {setting.pk: setting for setting in group_settings}
+
+    journal_filter = Q(journal__isnull=True)
+    if journal is not None:
+        journal_filter |= Q(journal=journal)
+
+    journal_values, default_values = {}, {}
+    for setting_value in core_models.SettingValue.objects.filter(
+        journal_filter,
+        setting_id__in=settings_by_id.keys(),
+    ):
+        # Avoids a further query when the value is processed
+        setting_value.setting = settings_by_id[setting_value.setting_id]
+        if setting_value.journal_id is None:
+            default_values[setting_value.setting_id] = setting_value
+        else:
+            journal_values[setting_value.setting_id] = setting_value
+
+    for setting in settings_by_id.values():
+        setting_value = journal_values.get(setting.pk) or default_values.get(setting.pk)
+        if setting_value is None:
+            # Raises the same error get_setting would for a setting without
+            # any value
+            setting_value = get_setting(setting.group.name, setting.name, journal)
+        resolved[setting.group.name][setting.name] = setting_value
+
+    return resolved
+
+
+def _get_setting(
+    setting_group_name,
+    setting_name,
+    journal,
+    create=False,
+    default=True,
+):
+    """Resolves a SettingValue from the database, bypassing the cache"""
     try:
         setting = core_models.Setting.objects.get(
             name=setting_name,
@@ -119,11 +215,14 @@ def get_setting(
 
     with translation.override(lang):
         try:
-            return core_models.SettingValue.objects.get(
+            setting_value = core_models.SettingValue.objects.get(
                 setting__group__name=setting_group_name,
                 setting=setting,
                 journal=journal,
             )
+            # Avoids a further query when the value is processed
+            setting_value.setting = setting
+            return setting_value
         except ObjectDoesNotExist as e:
             if journal is not None:
                 if create:
@@ -147,6 +246,111 @@ def get_setting(
                 raise e
 
 
+def _get_version_key(journal_id):
+    return "{prefix}:version:{journal}".format(
+        prefix=SETTINGS_CACHE_PREFIX,
+        journal=journal_id or "press",
+    )
+
+
+def _new_version():
+    # Versions are seeded from the clock so that a version key evicted from
+    # the cache never restarts at a value used by surviving entries.
+    return int(time.time() * 1000)
+
+
+def get_settings_cache_versions(journal):
+    """Returns the current cache versions for the press and a journal
+    :param journal: A Journal object, journal ID or None for the press
+    :return: A tuple of (press_version, journal_version)
+    """
+    journal_id = getattr(journal, "pk", journal)
+    keys = [_get_version_key(None), _get_version_key(journal_id)]
+    versions = django_cache.get_many(keys)
+    if len(versions) < len(keys):
+        for key in keys:
+            if key not in versions:
+                django_cache.add(key, _new_version(), timeout=None)
+        versions = django_cache.get_many(keys)
+
+    return tuple(versions.get(key) for key in keys)
+
+
+def invalidate_settings_cache(journal=None):
+    """Bumps the cache version for a journal or, if None, for the press.
+
+    Press-wide values are the fallback for every journal, so bumping the press
+    version invalidates the cached settings of all journals.
+    :param journal: A Journal object, journal ID or None for the press
+    """
+    key = _get_version_key(getattr(journal, "pk", journal))
+    try:
+        django_cache.incr(key)
+    except ValueError:
+        django_cache.set(key, _new_version(), timeout=None)
+
+
+def get_setting_cache_key(setting_group_name, setting_name, journal, default=True):
+    """Builds the cache key for a resolved setting value.
+
+    Keys include the active language and the current press and journal
+    versions, so invalidation never needs to enumerate stale entries.
+    """
+    journal_id = getattr(journal, "pk", journal)
+    press_version, journal_version = get_settings_cache_versions(journal_id)
+    setting_hash = sha1(
+        "{}:{}".format(setting_group_name, setting_name).encode("utf-8")
+    ).hexdigest()
+    return "{prefix}:value:{hash}:{journal}:{lang}:{default}:{pv}:{jv}".format(
+        prefix=SETTINGS_CACHE_PREFIX,
+        hash=setting_hash,
+        journal=journal_id or "press",
+        lang=translation.get_language(),
+        default=int(bool(default)),
+        pv=press_version,
+        jv=journal_version,
+    )
+
+
+def _get_cached_setting_value(cache_key):
+    with _local_cache_lock:
+        entry = _local_cache.get(cache_key)
+        if entry is not None:
+            expires, setting_value = entry
+            if expires > time.monotonic():
+                _local_cache.move_to_end(cache_key)
+                # Callers are free to mutate the returned instance
+                return copy.copy(setting_value)
+            del _local_cache[cache_key]
+
+    setting_value = django_cache.get(cache_key, _CACHE_MISS)
+    if setting_value is not _CACHE_MISS:
+        _set_local_setting_value(cache_key, setting_value)
+        return copy.copy(setting_value)
+    return setting_value
+
+
+def _set_cached_setting_value(cache_key, setting_value):
+    django_cache.set(cache_key, setting_value, settings.SETTINGS_CACHE_TIMEOUT)
+    _set_local_setting_value(cache_key, copy.copy(setting_value))
+
+
+def _set_local_setting_value(cache_key, setting_value):
+    # Local entries expire like shared ones, since version bumps made by
+    # other processes only reach this one through a shared cache backend
+    expires = time.monotonic() + settings.SETTINGS_CACHE_TIMEOUT
+    with _local_cache_lock:
+        _local_cache[cache_key] = (expires, setting_value)
+        _local_cache.move_to_end(cache_key)
+        while len(_local_cache) > LOCAL_CACHE_MAX_ENTRIES:
+            _local_cache.popitem(last=False)
+
+
+def clear_local_settings_cache():
+    with _local_cache_lock:
+        _local_cache.clear()
+
+
 def get_requestless_setting(setting_group, setting, journal):
     logger.warning(
         "Function get_requestless_setting is deprecated in v1.4 "
@@ -41,6 +41,17 @@ def get_ip_address(request):
     return client_ip
 
 
+def get_counter_tracking_id(request):
+    """Returns the COUNTER identifier set by CounterCookieMiddleware
+
+    None is returned until the reader sends the cookie back, so clients that
+    never return it are identified by their IP address and user agent.
+    """
+    if getattr(request, "counter_tracking_is_new", False):
+        return None
+    return getattr(request, "counter_tracking_id", None)
+
+
 def clear_cache():
     cache.clear()
 
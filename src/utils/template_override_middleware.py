@@ -4,11 +4,13 @@ __license__ = "AGPL v3"
 __maintainer__ = "Birkbeck Centre for Technology and Publishing"
 
 import errno
+import glob
 import io
 import os
 import warnings
 
 from django.conf import settings
+from django.template.loaders.cached import Loader as DjangoCachedLoader
 from django.template.loaders.filesystem import Loader as FileSystemLoader
 
 from utils import setting_handler, function_cache, logic as utils_logic
@@ -16,12 +18,12 @@ from utils import setting_handler, function_cache, logic as utils_logic
 
 class Loader(FileSystemLoader):
     @staticmethod
-    @function_cache.cache(120)
+    @function_cache.cache(120, depends_on=["core.SettingValue"])
     def journal_theme(journal):
         return setting_handler.get_setting("general", "journal_theme", journal).value
 
     @staticmethod
-    @function_cache.cache(120)
+    @function_cache.cache(120, depends_on=["core.SettingValue"])
     def base_theme(journal):
         return setting_handler.get_setting(
             "general", "journal_base_theme", journal
@@ -93,3 +95,37 @@ class Loader(FileSystemLoader):
 
     def get_dirs(self):
         return self.get_theme_dirs()
+
+
+class CachedLoader(DjangoCachedLoader):
+    """Caches compiled templates for each chain of theme directories
+
+    Django's cached loader keys templates on their name alone, which would
+    serve the first journal's theme to every other journal. Here the theme
+    directories resolved for the current request are part of the key, so a
+    change to a journal's theme settings resolves to a fresh cache entry.
+    """
+
+    def get_theme_dirs(self):
+        return [
+            theme_dir
+            for loader in self.loaders
+            if isinstance(loader, Loader)
+            for theme_dir in loader.get_theme_dirs()
+        ]
+
+    def get_dirs(self):
+        # Lets the development autoreloader reset the cache on changes to any
+        # theme, not only those resolved outside of a request
+        yield from sorted(
+            glob.glob(os.path.join(settings.BASE_DIR, "themes", "*", "templates"))
+        )
+        yield from super().get_dirs()
+
+    def cache_key(self, template_name, skip=None):
+        return "-".join(
+            (
+                super().cache_key(template_name, skip),
+                self.generate_hash(self.get_theme_dirs()),
+            )
+        )
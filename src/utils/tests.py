@@ -7,30 +7,37 @@ import codecs
 import io
 import json
 import os
+import tempfile
 
 from bs4 import BeautifulSoup
 
 from django.apps import apps
 from django.conf import settings
-from django.http import QueryDict
-from django.test import TestCase, override_settings
+from django.http import HttpResponse, QueryDict
+from django.test import RequestFactory, TestCase, override_settings
 from django.utils import timezone, translation
 from django.core import mail
-from django.core.exceptions import ValidationError
+from django.core.exceptions import MiddlewareNotUsed, ValidationError
 from django.core.management import call_command
 from django.contrib.admin.sites import site
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from django.contrib.contenttypes.models import ContentType
+from django.template import engines
 from django.template.engine import Engine
 
 import mock
 from utils import (
+    email_outbox,
+    function_cache,
+    instrumentation,
     merge_settings,
     models,
     oidc,
     template_override_middleware,
     logic,
     migration_utils,
+    sitemaps,
 )
 from utils.orcid import (
     get_orcid_record_details,
@@ -47,6 +54,7 @@ from utils.forms import (
     plain_text_validator,
 )
 from utils.logic import generate_sitemap
+from utils.middleware import RequestInstrumentationMiddleware
 from utils.testing import helpers
 from utils.testing.context_managers import janeway_setting_override
 from utils.shared import clear_cache
@@ -57,6 +65,7 @@ from journal import (
     logic as journal_logic,
     forms as journal_forms,
 )
+from metrics import models as metrics_models
 from review import models as review_models
 from submission import models as submission_models
 from core import (
@@ -283,6 +292,46 @@ class SitemapTests(UtilsTests):
             self.article_one.title,
         )
 
+    @override_settings(URL_CONFIG="path")
+    def test_issue_sitemap_shards_skip_unchanged(self):
+        article_two = helpers.create_article(
+            self.journal_one,
+            title="A second article",
+            stage=submission_models.STAGE_PUBLISHED,
+            date_published=timezone.now() - timezone.timedelta(days=1),
+        )
+        self.issue_one.articles.add(article_two)
+
+        with (
+            tempfile.TemporaryDirectory() as base_dir,
+            override_settings(BASE_DIR=base_dir),
+            mock.patch.object(sitemaps, "MAX_SITEMAP_URLS", 1),
+        ):
+            self.assertEqual(logic.write_issue_sitemap(self.issue_one), (2, 0))
+            self.assertEqual(logic.write_issue_sitemap(self.issue_one), (0, 2))
+
+            article_two.title = "A renamed article"
+            article_two.save()
+            self.assertEqual(logic.write_issue_sitemap(self.issue_one), (1, 1))
+
+            shards = sitemaps.IssueSitemap(self.issue_one).get_shards()
+            self.assertEqual([shard["page"] for shard in shards], [1, 2])
+            labels = {}
+            for shard in shards:
+                file_name = sitemaps.ShardedSitemap.get_file_name(
+                    self.issue_one.pk, shard["page"]
+                )
+                path = os.path.join(
+                    base_dir, "files", "sitemaps", self.journal_one.code, file_name
+                )
+                with open(path) as file:
+                    soup = BeautifulSoup(file.read(), "xml")
+                label = soup.select("urlset url loc_label")[0].get_text(strip=True)
+                lastmod = soup.select("urlset url lastmod")[0].get_text(strip=True)
+                labels[label] = lastmod
+                self.assertEqual(lastmod, shard["lastmod"])
+            self.assertIn("A renamed article", labels)
+
 
 class TransactionalReviewEmailTests(UtilsTests):
     """
@@ -974,6 +1023,79 @@ class NotifyEmail(TestCase):
                 self.assertNotIn("\r", from_header)
                 from_header.encode("ascii")
 
+    @override_settings(ENABLE_EMAIL_OUTBOX=True)
+    def test_send_email_is_queued_and_sent_by_worker(self):
+        queued = notify_email.send_email(
+            "subject",
+            "to@example.com",
+            "html_body",
+            self.journal_one,
+            self.request,
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        log_entry = models.LogEntry.add_entry(
+            types="Email",
+            description="html_body",
+            level="Info",
+            is_email=True,
+        )
+        email_outbox.link_log_entry(queued, log_entry)
+
+        self.assertEqual(email_outbox.send_queued_emails(), (1, 0))
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["to@example.com"])
+        queued.refresh_from_db()
+        log_entry.refresh_from_db()
+        self.assertEqual(queued.status, models.OutboxEmail.OutboxEmailStatus.SENT)
+        self.assertEqual(
+            mail.outbox[0].message()["Message-ID"].strip("<>"),
+            log_entry.message_id,
+        )
+
+    @override_settings(ENABLE_EMAIL_OUTBOX=True, EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_queued_email_is_retried_with_backoff(self):
+        queued = notify_email.send_email(
+            "subject",
+            "to@example.com",
+            "html_body",
+            self.journal_one,
+            self.request,
+        )
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=ConnectionError("relay down"),
+        ):
+            self.assertEqual(email_outbox.send_queued_emails(), (0, 1))
+            queued.refresh_from_db()
+            self.assertEqual(queued.status, models.OutboxEmail.OutboxEmailStatus.QUEUED)
+            self.assertGreater(queued.next_attempt, timezone.now())
+
+            models.OutboxEmail.objects.update(next_attempt=timezone.now())
+            self.assertEqual(email_outbox.send_queued_emails(), (0, 1))
+            queued.refresh_from_db()
+            self.assertEqual(queued.status, models.OutboxEmail.OutboxEmailStatus.FAILED)
+
+    @override_settings(ENABLE_EMAIL_OUTBOX=True)
+    def test_claimed_email_is_only_retried_after_the_claim_times_out(self):
+        queued = notify_email.send_email(
+            "subject",
+            "to@example.com",
+            "html_body",
+            self.journal_one,
+            self.request,
+        )
+        # Claimed by a worker that stopped before sending it
+        [claimed] = email_outbox.claim_queued_emails(batch_size=10)
+        self.assertEqual(email_outbox.send_queued_emails(), (0, 0))
+
+        models.OutboxEmail.objects.update(next_attempt=timezone.now())
+        self.assertEqual(email_outbox.send_queued_emails(), (1, 0))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, models.OutboxEmail.OutboxEmailStatus.SENT)
+        self.assertEqual(queued.attempts, 2)
+        self.assertEqual(mail.outbox[0].message()["Message-ID"], claimed.message_id)
+
 
 class TestOIDC(TestCase):
     @override_settings(
@@ -1110,6 +1232,34 @@ class TestThemeMiddleware(TestCase):
                 ],
             )
 
+    def test_cached_loader_keys_templates_on_theme(self):
+        setting_handler.save_setting(
+            "general",
+            "journal_theme",
+            self.journal_one,
+            "LCARS",
+        )
+        clear_cache()
+        engine = Engine(
+            loaders=[
+                (
+                    "utils.template_override_middleware.CachedLoader",
+                    ["utils.template_override_middleware.Loader"],
+                )
+            ],
+        )
+        loader = engine.template_loaders[0]
+
+        keys = []
+        for journal in (self.journal_one, self.journal_two, self.journal_one):
+            request = helpers.Request()
+            request.journal = journal
+            with helpers.request_context(request):
+                keys.append(loader.cache_key("journal/index.html"))
+
+        self.assertNotEqual(keys[0], keys[1])
+        self.assertEqual(keys[0], keys[2])
+
 
 class PreprintsUtilsTests(TestCase):
     @classmethod
@@ -1721,3 +1871,129 @@ class DefaultSettingsIntegrityTests(TestCase):
             and item["setting"]["name"] == "author_affiliation_dates"
         ]
         self.assertEqual(len(matches), 1)
+
+
+class TestFunctionCache(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.press = helpers.create_press()
+        cls.journal_one, cls.journal_two = helpers.create_journals()
+        cls.article_one = helpers.create_article(cls.journal_one, title="Same title")
+        cls.article_two = helpers.create_article(cls.journal_one, title="Same title")
+
+    def setUp(self):
+        clear_cache()
+        function_cache.reset_cache_stats()
+
+    def test_model_instances_with_same_str_do_not_collide(self):
+        @function_cache.cache(600)
+        def get_pk(article):
+            return article.pk
+
+        self.assertEqual(get_pk(self.article_one), self.article_one.pk)
+        self.assertEqual(get_pk(self.article_two), self.article_two.pk)
+
+    def test_hits_and_misses_are_counted(self):
+        @function_cache.cache(600)
+        def get_title(article):
+            return article.title
+
+        get_title(self.article_one)
+        get_title(self.article_one)
+        stats = function_cache.get_cache_stats()[get_title.function_id]
+        self.assertEqual(stats, {"hits": 1, "misses": 1})
+
+    def test_none_results_are_cached(self):
+        calls = []
+
+        @function_cache.cache(600)
+        def get_nothing(article):
+            calls.append(article)
+            return None
+
+        get_nothing(self.article_one)
+        get_nothing(self.article_one)
+        self.assertEqual(len(calls), 1)
+
+    def test_saving_instance_evicts_entries(self):
+        @function_cache.cache(600)
+        def get_journal_code(journal):
+            return journal.code
+
+        get_journal_code(self.journal_one)
+        self.journal_one.code = "new_code"
+        self.journal_one.save()
+        self.assertEqual(get_journal_code(self.journal_one), "new_code")
+
+    def test_saving_dependency_evicts_entries(self):
+        self.assertFalse(self.article_one.pinned())
+        journal_models.PinnedArticle.objects.create(
+            journal=self.journal_one,
+            article=self.article_one,
+            sequence=0,
+        )
+        self.assertTrue(self.article_one.pinned())
+
+    def test_m2m_dependency_evicts_entries(self):
+        issue = helpers.create_issue(self.journal_one)
+        self.assertIsNone(self.article_one.issue)
+        issue.articles.add(self.article_one)
+        self.assertEqual(self.article_one.issue, issue)
+
+    def test_unrelated_saves_do_not_touch_the_cache(self):
+        with mock.patch.object(function_cache, "django_cache") as django_cache:
+            metrics_models.ArticleAccess.objects.create(
+                article=self.article_one,
+                type="view",
+                identifier="test",
+            )
+        self.assertEqual(django_cache.method_calls, [])
+
+
+@override_settings(ENABLE_REQUEST_INSTRUMENTATION=True, SLOW_REQUEST_THRESHOLD=None)
+class TestRequestInstrumentation(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.press = helpers.create_press()
+        cls.journal_one, cls.journal_two = helpers.create_journals()
+
+    @staticmethod
+    def view(request):
+        for _ in range(3):
+            list(journal_models.Journal.objects.filter(code="TST"))
+        template = engines["django"].from_string(
+            "{% for i in items %}{{ i }}{% endfor %}"
+        )
+        return HttpResponse(template.render({"items": range(100)}))
+
+    def test_metrics_are_recorded_per_request(self):
+        request = RequestFactory().get("/")
+        middleware = RequestInstrumentationMiddleware(self.view)
+        with mock.patch.object(middleware, "report") as report:
+            middleware(request)
+
+        metrics = report.call_args.args[2]
+        self.assertGreaterEqual(metrics.query_count, 3)
+        self.assertGreaterEqual(metrics.duplicate_queries, 2)
+        self.assertGreater(metrics.template_time, 0)
+        self.assertIsNone(instrumentation.current())
+
+    @override_settings(REQUEST_INSTRUMENTATION_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        request = RequestFactory().get("/")
+        request.user = helpers.create_user("staff@example.org", is_staff=True)
+        response = RequestInstrumentationMiddleware(self.view)(request)
+        self.assertIn("sql;dur=", response["Server-Timing"])
+        self.assertIn("template;dur=", response["Server-Timing"])
+
+    @override_settings(REQUEST_INSTRUMENTATION_SERVER_TIMING=True)
+    def test_server_timing_header_not_sent_to_anonymous_users(self):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        response = RequestInstrumentationMiddleware(self.view)(request)
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(ENABLE_REQUEST_INSTRUMENTATION=False)
+    def test_disabled_by_default(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestInstrumentationMiddleware(self.view)